@@ -1,3 +1,3 @@
 from . import main
 from . import routers
-from . import models
+from .core import models
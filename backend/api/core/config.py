@@ -60,6 +60,52 @@ class Settings(BaseSettings):
     debug: bool = os.getenv("QUIZMASTER_DEBUG", "false").lower() == "true"
     log_level: str = os.getenv("QUIZMASTER_LOG_LEVEL", "INFO")
     
+    # Flow execution queue settings
+    flow_worker_count: int = int(os.getenv("QUIZMASTER_FLOW_WORKER_COUNT", "2"))
+    flow_default_concurrency: int = int(os.getenv("QUIZMASTER_FLOW_DEFAULT_CONCURRENCY", "4"))
+    flow_concurrency_limits: str = os.getenv("QUIZMASTER_FLOW_CONCURRENCY_LIMITS", "")  # e.g. "book_flow=2,poem_flow=8"
+    flow_queue_poll_interval: float = float(os.getenv("QUIZMASTER_FLOW_QUEUE_POLL_INTERVAL", "1.0"))
+    flow_queue_stale_after: int = int(os.getenv("QUIZMASTER_FLOW_QUEUE_STALE_AFTER", "300"))  # seconds without heartbeat
+    flow_queue_shutdown_timeout: float = float(os.getenv("QUIZMASTER_FLOW_QUEUE_SHUTDOWN_TIMEOUT", "30"))  # seconds
+    flow_cancel_poll_interval: float = float(os.getenv("QUIZMASTER_FLOW_CANCEL_POLL_INTERVAL", "2.0"))  # seconds
+    flow_batch_max_size: int = int(os.getenv("QUIZMASTER_FLOW_BATCH_MAX_SIZE", "5000"))  # executions per batch request
+    
+    # Flow result cache settings
+    flow_cache_memory_bytes: int = int(os.getenv("QUIZMASTER_FLOW_CACHE_MEMORY_BYTES", str(64 * 1024 * 1024)))
+    flow_cache_memory_ttl: int = int(os.getenv("QUIZMASTER_FLOW_CACHE_MEMORY_TTL", "3600"))  # seconds, 0 = no expiry
+    flow_cache_disk_max_bytes: int = int(os.getenv("QUIZMASTER_FLOW_CACHE_DISK_MAX_BYTES", str(2 * 1024 ** 3)))  # 0 = unbounded
+    flow_cache_disk_max_age: int = int(os.getenv("QUIZMASTER_FLOW_CACHE_DISK_MAX_AGE", str(30 * 24 * 3600)))  # seconds, 0 = no expiry
+    flow_cache_gc_interval: int = int(os.getenv("QUIZMASTER_FLOW_CACHE_GC_INTERVAL", "3600"))  # seconds between GC runs
+    
+    # Flow log writer settings
+    flow_log_batch_size: int = int(os.getenv("QUIZMASTER_FLOW_LOG_BATCH_SIZE", "500"))  # lines per write
+    flow_log_flush_interval: float = float(os.getenv("QUIZMASTER_FLOW_LOG_FLUSH_INTERVAL", "0.25"))  # seconds
+    flow_log_copy_threshold: int = int(os.getenv("QUIZMASTER_FLOW_LOG_COPY_THRESHOLD", "200"))  # 0 = never use COPY
+    flow_log_queue_size: int = int(os.getenv("QUIZMASTER_FLOW_LOG_QUEUE_SIZE", "10000"))  # lines buffered per execution
+    flow_log_overflow_policy: str = os.getenv("QUIZMASTER_FLOW_LOG_OVERFLOW_POLICY", "drop_debug")  # "block", "drop_debug" or "coalesce"
+    flow_log_subscriber_queue_size: int = int(os.getenv("QUIZMASTER_FLOW_LOG_SUBSCRIBER_QUEUE_SIZE", "1000"))  # live lines buffered per viewer
+    flow_log_ring_size: int = int(os.getenv("QUIZMASTER_FLOW_LOG_RING_SIZE", "1000"))  # recent lines kept in memory per running execution, 0 = off
+    flow_log_debug_sample_rate: float = float(os.getenv("QUIZMASTER_FLOW_LOG_DEBUG_SAMPLE_RATE", "1.0"))  # fraction of DEBUG lines kept
+    flow_log_capture_loggers: str = os.getenv("QUIZMASTER_FLOW_LOG_CAPTURE_LOGGERS", "crewai,api.crews")  # comma-separated loggers copied into flow logs
+    flow_log_capture_level: str = os.getenv("QUIZMASTER_FLOW_LOG_CAPTURE_LEVEL", "INFO")  # minimum level of captured records, on top of each logger's own level
+    flow_log_partition_interval: str = os.getenv("QUIZMASTER_FLOW_LOG_PARTITION_INTERVAL", "day")  # "day" or "week"
+    flow_log_partitions_ahead: int = int(os.getenv("QUIZMASTER_FLOW_LOG_PARTITIONS_AHEAD", "7"))  # partitions created in advance
+    flow_log_retention_days: int = int(os.getenv("QUIZMASTER_FLOW_LOG_RETENTION_DAYS", "90"))  # applies to partitions and archives, 0 = keep forever
+    flow_log_maintenance_interval: int = int(os.getenv("QUIZMASTER_FLOW_LOG_MAINTENANCE_INTERVAL", "3600"))  # seconds
+    flow_log_archive_after_days: int = int(os.getenv("QUIZMASTER_FLOW_LOG_ARCHIVE_AFTER_DAYS", "7"))  # 0 = never archive
+    flow_log_archive_batch_size: int = int(os.getenv("QUIZMASTER_FLOW_LOG_ARCHIVE_BATCH_SIZE", "100"))  # executions per archival run
+    
+    # Crew execution settings
+    crew_execution_mode: str = os.getenv("QUIZMASTER_CREW_EXECUTION_MODE", "thread")  # "thread" or "process"
+    crew_process_workers: int = int(os.getenv("QUIZMASTER_CREW_PROCESS_WORKERS", "0"))  # 0 = CPU count
+    blueprint_generation_workers: int = int(os.getenv("QUIZMASTER_BLUEPRINT_GENERATION_WORKERS", "4"))  # generations run at once per process
+    blueprint_generation_user_workers: int = int(os.getenv("QUIZMASTER_BLUEPRINT_GENERATION_USER_WORKERS", "1"))  # generations of one user run at once
+    blueprint_generation_max_queued: int = int(os.getenv("QUIZMASTER_BLUEPRINT_GENERATION_MAX_QUEUED", "100"))  # generations waiting, across processes
+    blueprint_generation_user_max_queued: int = int(os.getenv("QUIZMASTER_BLUEPRINT_GENERATION_USER_MAX_QUEUED", "3"))  # generations of one user queued or running, across processes
+    blueprint_generation_estimated_seconds: float = float(os.getenv("QUIZMASTER_BLUEPRINT_GENERATION_ESTIMATED_SECONDS", "120"))  # wait estimate before any generation finished
+    crew_response_cache_bytes: int = int(os.getenv("QUIZMASTER_CREW_RESPONSE_CACHE_BYTES", str(16 * 1024 * 1024)))  # 0 = cache off
+    crew_response_cache_ttl: int = int(os.getenv("QUIZMASTER_CREW_RESPONSE_CACHE_TTL", str(24 * 3600)))  # seconds, 0 = no expiry
+    
     # Python encoding
     pythonioencoding: Optional[str] = None
     
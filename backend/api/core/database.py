@@ -12,7 +12,7 @@ from sqlalchemy import create_engine
 # Import all models
 from .models import (
     User, LLMProvider, Topic, Blueprint, TerminalObjective,
-    EnablingObjective, FlowExecution, IdempotencyKey, FlowLog,
+    EnablingObjective, FlowExecution, IdempotencyKey, FlowLog, FlowLogArchive,
     FlowExecutionStatus, CognitiveLevelEnum, LogLevel
 )
 
@@ -65,9 +65,12 @@ def get_session() -> AsyncSession:
 
 async def init_db():
     """Initialize the database and create tables"""
+    from .log_partitions import is_partitioned, ensure_partitions
     engine = get_engine()
     async with engine.begin() as conn:
         await conn.run_sync(Base.metadata.create_all)
+        if await is_partitioned(conn):
+            await ensure_partitions(conn)
 
 # Export functions and classes
 __all__ = ["get_db", "init_db", "get_session", "Base"]
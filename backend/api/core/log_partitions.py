@@ -0,0 +1,239 @@
+"""Time partitions of the flow_logs table.
+
+``flow_logs`` is range-partitioned on ``timestamp`` into daily or weekly
+partitions named ``flow_logs_pYYYYMMDD`` after their first day (UTC). A
+``flow_logs_default`` partition catches rows outside every range so inserts
+never fail, but maintenance keeps partitions created ahead of time.
+Retention drops whole partitions instead of deleting rows.
+"""
+
+import asyncio
+import logging
+import re
+from datetime import date, datetime, timedelta, timezone
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncConnection
+
+from .config import get_settings
+
+logger = logging.getLogger(__name__)
+
+PARENT_TABLE = "flow_logs"
+DEFAULT_PARTITION = f"{PARENT_TABLE}_default"
+PARTITION_PATTERN = re.compile(rf"^{PARENT_TABLE}_p(\d{{8}})$")
+INTERVALS = {"day": timedelta(days=1), "week": timedelta(weeks=1)}
+
+
+def partition_start(day: date, interval: str) -> date:
+    """First day of the partition containing day (weeks start on Monday)."""
+    if interval == "week":
+        return day - timedelta(days=day.weekday())
+    return day
+
+
+def partition_name(start: date) -> str:
+    return f"{PARENT_TABLE}_p{start:%Y%m%d}"
+
+
+def parse_partition_name(name: str) -> Optional[date]:
+    """Get the first day of a partition from its name, or None for other tables."""
+    match = PARTITION_PATTERN.match(name)
+    if not match:
+        return None
+    return datetime.strptime(match.group(1), "%Y%m%d").date()
+
+
+def planned_partitions(today: date, interval: str, ahead: int, since: Optional[date] = None) -> List[Tuple[str, date, date]]:
+    """Partitions that should exist: the current one and ``ahead`` after it.
+
+    Args:
+        since: Also cover every day from this one up to today
+
+    Returns:
+        List[Tuple[str, date, date]]: Name, first day and exclusive end day of each partition
+    """
+    if interval not in INTERVALS:
+        raise ValueError(f"Unknown flow log partition interval '{interval}', expected 'day' or 'week'")
+    step = INTERVALS[interval]
+    start = partition_start(min(since, today) if since else today, interval)
+    last = partition_start(today, interval) + ahead * step
+    partitions = []
+    while start <= last:
+        partitions.append((partition_name(start), start, start + step))
+        start += step
+    return partitions
+
+
+def expired_partitions(names: List[str], interval: str, retention_days: int, today: date) -> List[str]:
+    """Partitions whose whole range is older than the retention period."""
+    cutoff = today - timedelta(days=retention_days)
+    expired = []
+    for name in names:
+        start = parse_partition_name(name)
+        if start is not None and start + INTERVALS[interval] <= cutoff:
+            expired.append(name)
+    return sorted(expired)
+
+
+async def is_partitioned(conn: AsyncConnection) -> bool:
+    """Whether flow_logs exists as a partitioned table."""
+    result = await conn.execute(
+        text("SELECT c.relkind FROM pg_class c WHERE c.relname = :name AND pg_table_is_visible(c.oid)"),
+        {"name": PARENT_TABLE}
+    )
+    return result.scalar_one_or_none() == "p"
+
+
+async def list_partitions(conn: AsyncConnection) -> List[str]:
+    """Names of the partitions attached to flow_logs."""
+    result = await conn.execute(text(
+        "SELECT child.relname FROM pg_inherits "
+        "JOIN pg_class parent ON parent.oid = pg_inherits.inhparent "
+        "JOIN pg_class child ON child.oid = pg_inherits.inhrelid "
+        "WHERE parent.relname = :parent"
+    ), {"parent": PARENT_TABLE})
+    return [row[0] for row in result.all()]
+
+
+async def ensure_partitions(conn: AsyncConnection, today: Optional[date] = None, since: Optional[date] = None) -> List[str]:
+    """Create the default partition and any missing upcoming partitions.
+
+    Each partition is created in its own savepoint, so one that fails is logged
+    and skipped without aborting the rest of the maintenance transaction.
+
+    Args:
+        today: Day to plan from (defaults to the current UTC day)
+        since: Also create partitions back to this day
+
+    Returns:
+        List[str]: Names of the partitions created
+    """
+    settings = get_settings()
+    today = today or datetime.now(timezone.utc).date()
+    existing = set(await list_partitions(conn))
+    created = []
+    if DEFAULT_PARTITION not in existing:
+        await conn.execute(text(f"CREATE TABLE IF NOT EXISTS {DEFAULT_PARTITION} PARTITION OF {PARENT_TABLE} DEFAULT"))
+        created.append(DEFAULT_PARTITION)
+    planned = planned_partitions(today, settings.flow_log_partition_interval, settings.flow_log_partitions_ahead, since)
+    for name, start, end in planned:
+        if name in existing:
+            continue
+        try:
+            async with conn.begin_nested():
+                await create_partition(conn, name, start, end, has_default=DEFAULT_PARTITION in existing)
+        except Exception as e:
+            logger.error(f"Failed to create flow log partition {name}: {str(e)}")
+            continue
+        created.append(name)
+    if created:
+        logger.info(f"Created flow log partitions: {created}")
+    return created
+
+
+async def create_partition(conn: AsyncConnection, name: str, start: date, end: date, has_default: bool = True) -> None:
+    """Create one range partition, moving rows of its range out of the default partition.
+
+    Postgres refuses to create a partition while the default partition holds
+    rows of its range, which happens when maintenance fell behind. The default
+    is then detached, its rows of the range are moved into the new partition
+    and it is attached again.
+    """
+    bounds = f"FROM ('{start.isoformat()} 00:00:00+00') TO ('{end.isoformat()} 00:00:00+00')"
+    in_range = f"timestamp >= '{start.isoformat()} 00:00:00+00' AND timestamp < '{end.isoformat()} 00:00:00+00'"
+    stranded = 0
+    if has_default:
+        stranded = (await conn.execute(text(
+            f"SELECT count(*) FROM {DEFAULT_PARTITION} WHERE {in_range}"
+        ))).scalar_one()
+    if not stranded:
+        await conn.execute(text(f"CREATE TABLE IF NOT EXISTS {name} PARTITION OF {PARENT_TABLE} FOR VALUES {bounds}"))
+        return
+
+    from .models import FlowLog
+
+    logger.warning(f"Moving {stranded} flow log rows from {DEFAULT_PARTITION} into new partition {name}")
+    columns = ", ".join(column.name for column in FlowLog.__table__.columns)
+    await conn.execute(text(f"ALTER TABLE {PARENT_TABLE} DETACH PARTITION {DEFAULT_PARTITION}"))
+    await conn.execute(text(f"CREATE TABLE {name} PARTITION OF {PARENT_TABLE} FOR VALUES {bounds}"))
+    await conn.execute(text(f"INSERT INTO {name} ({columns}) SELECT {columns} FROM {DEFAULT_PARTITION} WHERE {in_range}"))
+    await conn.execute(text(f"DELETE FROM {DEFAULT_PARTITION} WHERE {in_range}"))
+    await conn.execute(text(f"ALTER TABLE {PARENT_TABLE} ATTACH PARTITION {DEFAULT_PARTITION} DEFAULT"))
+
+
+async def drop_expired_partitions(conn: AsyncConnection, today: Optional[date] = None) -> List[str]:
+    """Drop partitions older than the retention period.
+
+    Returns:
+        List[str]: Names of the partitions dropped
+    """
+    settings = get_settings()
+    if not settings.flow_log_retention_days:
+        return []
+    today = today or datetime.now(timezone.utc).date()
+    expired = expired_partitions(
+        await list_partitions(conn),
+        settings.flow_log_partition_interval,
+        settings.flow_log_retention_days,
+        today
+    )
+    for name in expired:
+        await conn.execute(text(f"DROP TABLE IF EXISTS {name}"))
+    if expired:
+        logger.info(f"Dropped expired flow log partitions: {expired}")
+    return expired
+
+
+async def maintain_partitions(conn: AsyncConnection) -> Dict[str, List[str]]:
+    """Create upcoming partitions and drop expired ones."""
+    if not await is_partitioned(conn):
+        logger.warning("flow_logs is not partitioned, run scripts/maintain_flow_log_partitions.py --convert")
+        return {"created": [], "dropped": []}
+    return {
+        "created": await ensure_partitions(conn),
+        "dropped": await drop_expired_partitions(conn),
+    }
+
+
+async def run_partition_maintenance() -> None:
+    """Maintain partitions every ``flow_log_maintenance_interval`` seconds until cancelled."""
+    from .database import get_engine
+
+    interval = get_settings().flow_log_maintenance_interval
+    while True:
+        try:
+            async with get_engine().begin() as conn:
+                await maintain_partitions(conn)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.error(f"Flow log partition maintenance failed: {str(e)}")
+        await asyncio.sleep(interval)
+
+
+async def convert_to_partitioned(conn: AsyncConnection) -> None:
+    """Replace an unpartitioned flow_logs table with a partitioned one holding the same rows.
+
+    The table is locked for the duration of the copy; run it in a maintenance window.
+    """
+    if await is_partitioned(conn):
+        return
+    from .models import FlowLog
+
+    legacy = f"{PARENT_TABLE}_unpartitioned"
+    await conn.execute(text(f"LOCK TABLE {PARENT_TABLE} IN ACCESS EXCLUSIVE MODE"))
+    await conn.execute(text(f"ALTER TABLE {PARENT_TABLE} RENAME TO {legacy}"))
+    # Index names are global, so the old ones must go before the new table creates its own
+    for index in FlowLog.__table__.indexes:
+        await conn.execute(text(f"DROP INDEX IF EXISTS {index.name}"))
+    await conn.execute(text(f"ALTER TABLE {legacy} RENAME CONSTRAINT {PARENT_TABLE}_pkey TO {legacy}_pkey"))
+    await conn.run_sync(lambda sync_conn: FlowLog.__table__.create(sync_conn))
+    oldest = (await conn.execute(text(f"SELECT min(timestamp) FROM {legacy}"))).scalar_one_or_none()
+    # Give existing rows real partitions so retention can drop them later
+    await ensure_partitions(conn, since=oldest.astimezone(timezone.utc).date() if oldest else None)
+    columns = ", ".join(column.name for column in FlowLog.__table__.columns)
+    await conn.execute(text(f"INSERT INTO {PARENT_TABLE} ({columns}) SELECT {columns} FROM {legacy}"))
+    await conn.execute(text(f"DROP TABLE {legacy}"))
+    logger.info("Converted flow_logs to a partitioned table")
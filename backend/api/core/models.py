@@ -5,7 +5,7 @@ from enum import Enum
 from typing import Optional, Dict, Any
 from sqlalchemy import (
     Column, String, Text, ForeignKey, DateTime, 
-    Enum as SQLAEnum, JSON, Integer, Index
+    Enum as SQLAEnum, JSON, Integer, LargeBinary, Index, and_
 )
 from sqlalchemy.dialects.postgresql import UUID, JSONB
 from sqlalchemy.orm import relationship
@@ -170,9 +170,54 @@ class FlowExecution(Base, TimestampMixin):
     cache_key = Column(String(255), nullable=True)
     user_id = Column(UUID(as_uuid=True), ForeignKey("users.user_id"), nullable=False)
     
+    # Work queue bookkeeping
+    queued_at = Column(DateTime(timezone=True), nullable=True)
+    worker_id = Column(String(255), nullable=True)
+    heartbeat_at = Column(DateTime(timezone=True), nullable=True)
+    
+    # Flow state and step outputs after the last completed step
+    checkpoint = Column(JSON, nullable=True)
+    
+    # Identical in-flight execution this one is attached to (single-flight)
+    leader_id = Column(UUID(as_uuid=True), ForeignKey("flow_executions.id", ondelete="SET NULL"), nullable=True)
+    
+    # Queue wait per run and timing and LLM usage per step
+    metrics = Column(JSON, nullable=True)
+    
+    # Batch this execution was submitted in, if any
+    batch_id = Column(UUID(as_uuid=True), nullable=True)
+    
+    # Indexes
+    __table_args__ = (
+        Index(
+            "idx_flow_executions_queue",
+            "queued_at",
+            postgresql_where=(status == FlowExecutionStatus.PENDING),
+        ),
+        Index("idx_flow_executions_status_flow_name", "status", "flow_name"),
+        # Only one leader per cache key may be PENDING or RUNNING at a time
+        Index(
+            "uq_flow_executions_in_flight_cache_key",
+            "cache_key",
+            unique=True,
+            postgresql_where=and_(
+                status.in_([FlowExecutionStatus.PENDING, FlowExecutionStatus.RUNNING]),
+                cache_key.isnot(None),
+                leader_id.is_(None),
+            ),
+        ),
+        Index("idx_flow_executions_leader_id", "leader_id"),
+        # Keyset pagination of a user's executions, optionally filtered by status or flow
+        Index("idx_flow_executions_user_created", "user_id", "created_at", "id"),
+        Index("idx_flow_executions_user_status_created", "user_id", "status", "created_at", "id"),
+        Index("idx_flow_executions_user_flow_created", "user_id", "flow_name", "created_at", "id"),
+        Index("idx_flow_executions_batch_id", "batch_id", postgresql_where=batch_id.isnot(None)),
+    )
+    
     # Relationships
     user = relationship("User", back_populates="flow_executions")
     logs = relationship("FlowLog", back_populates="flow_execution", cascade="all, delete-orphan")
+    log_archive = relationship("FlowLogArchive", back_populates="flow_execution", cascade="all, delete-orphan", uselist=False)
 
 class IdempotencyKey(Base, TimestampMixin):
     """Model for storing idempotency keys to prevent duplicate flow executions."""
@@ -199,11 +244,19 @@ class FlowLog(Base, TimestampMixin):
     
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     execution_id = Column(UUID(as_uuid=True), ForeignKey("flow_executions.id", ondelete="CASCADE"), nullable=False)
-    timestamp = Column(DateTime(timezone=True), nullable=False, server_default='now()')
+    # Part of the primary key because the table is partitioned on it
+    timestamp = Column(DateTime(timezone=True), primary_key=True, nullable=False, server_default='now()')
     level = Column(SQLAEnum(LogLevel, name='loglevel'), nullable=False)
     message = Column(Text, nullable=False)
     log_metadata = Column(JSONB)
     
+    # Indexes and time partitioning (partitions are managed by api.core.log_partitions)
+    __table_args__ = (
+        # Log history and cursor catch-up read an execution's lines in (timestamp, id) order
+        Index("idx_flow_logs_execution_timestamp_id", "execution_id", "timestamp", "id"),
+        {"postgresql_partition_by": "RANGE (timestamp)"},
+    )
+    
     # Relationships
     flow_execution = relationship("FlowExecution", back_populates="logs")
 
@@ -217,3 +270,19 @@ class FlowLog(Base, TimestampMixin):
             'message': self.message,
             'metadata': self.log_metadata
         }
+
+class FlowLogArchive(Base, TimestampMixin):
+    """Compressed log lines of a finished flow execution, moved out of flow_logs"""
+    __tablename__ = "flow_log_archives"
+    
+    execution_id = Column(UUID(as_uuid=True), ForeignKey("flow_executions.id", ondelete="CASCADE"), primary_key=True)
+    # Gzipped NDJSON, one FlowLog.to_dict() (plus cursor) per line in (timestamp, id) order;
+    # each archiving run appends its lines as another gzip member
+    data = Column(LargeBinary, nullable=False)
+    line_count = Column(Integer, nullable=False)
+    uncompressed_bytes = Column(Integer, nullable=False)
+    first_timestamp = Column(DateTime(timezone=True), nullable=True)
+    last_timestamp = Column(DateTime(timezone=True), nullable=True)
+    
+    # Relationships
+    flow_execution = relationship("FlowExecution", back_populates="log_archive")
@@ -1,20 +1,38 @@
 import json
 import logging
+from functools import lru_cache
 from pathlib import Path
 from typing import Dict, Any, Union
 from datetime import datetime
 import os
 import uuid
 import yaml
+from pydantic import ValidationError
 from crewai.agent import Agent
 from crewai.task import Task
 from crewai.crew import Crew
 from crewai.process import Process
 from api.schemas.pydantic_schemas import BlueprintPydantic
 from api.schemas.enums import CognitiveLevelEnum
+from api.crews.response_cache import get_response_cache, response_cache_key
 
 logger = logging.getLogger(__name__)
 
+CONFIG_DIR = os.path.join(os.path.dirname(__file__), 'config')
+
+@lru_cache(maxsize=None)
+def load_crew_config(config_name: str) -> Dict[str, Any]:
+    """Load a crew YAML config once per process.
+
+    Args:
+        config_name: Config file name without extension, e.g. 'agents'
+
+    Returns:
+        Dict[str, Any]: The parsed YAML config
+    """
+    with open(os.path.join(CONFIG_DIR, f'{config_name}.yaml'), 'r') as f:
+        return yaml.safe_load(f)
+
 class BlueprintCrew:
     """Blueprint crew for generating objective blueprints"""
 
@@ -29,12 +47,9 @@ class BlueprintCrew:
         self.logfolder = os.path.join(project_root, 'logs')
         os.makedirs(self.logfolder, exist_ok=True)
         
-        # Load YAML configurations
-        config_dir = os.path.join(os.path.dirname(__file__), 'config')
-        with open(os.path.join(config_dir, 'agents.yaml'), 'r') as f:
-            self.agents_config = yaml.safe_load(f)
-        with open(os.path.join(config_dir, 'tasks.yaml'), 'r') as f:
-            self.tasks_config = yaml.safe_load(f)
+        # Load YAML configurations (parsed once per process)
+        self.agents_config = load_crew_config('agents')
+        self.tasks_config = load_crew_config('tasks')
 
     def prepare_inputs(self, inputs: Dict[str, Any]):
         """Prepare the inputs for the crew."""
@@ -313,8 +328,43 @@ class BlueprintCrew:
         )
         return crew
 
+    def cache_key(self, agent: Agent, task: Task) -> str:
+        """Content address of the crew's LLM request.
+
+        Args:
+            agent: The rendered blueprint agent
+            task: The rendered blueprint design task
+
+        Returns:
+            str: Hash of the goal, backstory, task description, expected output and model
+        """
+        model = getattr(agent.llm, 'model', agent.llm)
+        return response_cache_key(
+            agent.goal,
+            agent.backstory,
+            task.description,
+            task.expected_output,
+            str(model) if model else None
+        )
+
+    def _cached_blueprint(self, cache, key: str) -> BlueprintPydantic | None:
+        """Get a blueprint from the response cache, dropping entries that no longer validate."""
+        cached = cache.get(key)
+        if cached is None:
+            return None
+        try:
+            return BlueprintPydantic.model_validate(cached)
+        except ValidationError as e:
+            logger.warning(f"Discarding cached blueprint response that no longer validates: {str(e)}")
+            cache.delete(key)
+            return None
+
     def run(self) -> BlueprintPydantic:
         """Run the blueprint generation crew and return the results.
+
+        Responses are cached by the rendered prompt and model, so a topic
+        generated before is served without an LLM call unless the inputs
+        set ``bypass_cache``.
         
         Returns:
             BlueprintPydantic: The generated blueprint
@@ -325,13 +375,23 @@ class BlueprintCrew:
         try:
             logger.info("Starting blueprint generation crew")
             crew = self.crew()
-            logger.info("Executing crew tasks")
-            result = crew.kickoff()
-            logger.info("Crew execution completed")
+            cache = None if self.inputs.get('bypass_cache') else get_response_cache()
+            key = self.cache_key(crew.agents[0], crew.tasks[0])
+            blueprint = self._cached_blueprint(cache, key) if cache is not None else None
+            if blueprint is not None:
+                logger.info(f"Serving blueprint from response cache ({key[:12]})")
+            else:
+                logger.info("Executing crew tasks")
+                result = crew.kickoff()
+                logger.info("Crew execution completed")
+                blueprint = self._extract_blueprint_from_result(result)
+                if cache is not None:
+                    # Cached before metadata and ids are assigned, which differ per request
+                    cache.set(key, blueprint.model_dump(mode="json"))
             
             # Process and finalize the results
             logger.info("Processing crew results")
-            blueprint = self.finalize_results(result)
+            blueprint = self.finalize_results(blueprint)
             logger.info("Blueprint generation completed successfully")
             
             return blueprint
@@ -0,0 +1,96 @@
+"""Push notifications of blueprint status changes.
+
+The generation job announces each status change (queued to generating,
+then completed or error) with ``NOTIFY blueprint_status`` in the
+transaction that stores it. Each process has one listener connection for
+the channel. It hands the changes to the status streams of the blueprint,
+so viewers are told of transitions instead of polling the status endpoint.
+The process making a change publishes it to its own streams right after
+commit and skips its own notification.
+"""
+
+import json
+import logging
+from typing import Any, Dict, Optional
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from api.flows.log_hub import PROCESS_ID, LogNotificationHub
+
+logger = logging.getLogger(__name__)
+
+CHANNEL = "blueprint_status"
+
+# Postgres rejects NOTIFY payloads of 8000 bytes or more; error descriptions can be long
+MAX_DESCRIPTION_CHARS = 2000
+
+# Status changes buffered per viewer; a stream only needs the latest
+SUBSCRIBER_QUEUE_SIZE = 16
+
+
+def status_event(
+    blueprint_id: Any,
+    status: str,
+    title: str,
+    description: str,
+    terminal_objectives_count: int = 0,
+    enabling_objectives_count: int = 0,
+) -> Dict[str, Any]:
+    """A status change in the shape of the status endpoint's response."""
+    return {
+        "id": str(blueprint_id),
+        "status": status,
+        "title": title,
+        "description": (description or "")[:MAX_DESCRIPTION_CHARS],
+        "terminal_objectives_count": terminal_objectives_count or 0,
+        "enabling_objectives_count": enabling_objectives_count or 0,
+    }
+
+
+class BlueprintStatusHub(LogNotificationHub):
+    """The log notification hub, listening on the blueprint status channel and keyed by blueprint id."""
+
+    def __init__(self, dsn: Optional[str] = None):
+        super().__init__(dsn=dsn, subscriber_queue_size=SUBSCRIBER_QUEUE_SIZE, ring_size=0, channel=CHANNEL)
+
+    def _on_notification(self, connection, pid: int, channel: str, payload: str) -> None:
+        self.notifications += 1
+        try:
+            notification = json.loads(payload)
+            if notification.get("origin") == PROCESS_ID:
+                # Already published by publish_status() after the commit
+                return
+            event = notification["event"]
+            self.publish(event["id"], event)
+        except (json.JSONDecodeError, KeyError, TypeError):
+            logger.warning(f"Invalid blueprint status notification: {payload[:200]}")
+
+
+_hub: Optional[BlueprintStatusHub] = None
+
+
+def get_blueprint_status_hub() -> BlueprintStatusHub:
+    """Get or create the process-wide blueprint status hub."""
+    global _hub
+    if _hub is None:
+        _hub = BlueprintStatusHub()
+    return _hub
+
+
+async def stop_blueprint_status_hub() -> None:
+    """Stop the process-wide blueprint status hub if it was created."""
+    if _hub is not None:
+        await _hub.stop()
+
+
+async def notify_status(session: AsyncSession, event: Dict[str, Any]) -> None:
+    """Queue a status change notification, sent when the session's transaction commits."""
+    payload = json.dumps({"origin": PROCESS_ID, "event": event}, default=str)
+    await session.execute(text("SELECT pg_notify(:channel, :payload)"), {"channel": CHANNEL, "payload": payload})
+
+
+def publish_status(event: Dict[str, Any]) -> None:
+    """Hand a committed status change to this process's streams of the blueprint."""
+    if _hub is not None:
+        _hub.publish(event["id"], event)
@@ -0,0 +1,339 @@
+"""Long-lived runner for blueprint generation jobs.
+
+Generation jobs run as tasks on the application's event loop and use the
+application's engine and session maker, so they share its connection pool
+instead of opening one per job. At most ``blueprint_generation_workers`` jobs
+run at once; the rest wait in the runner's queue. Blocking crew kickoffs go to
+the runner's own bounded thread pool, or to the crew process pool in process
+mode, never to the threadpool that serves ordinary requests.
+
+Admission is fair across users. Each user has their own queue and the
+workers take jobs from the users in turn (round robin), so a user with
+many jobs does not hold up the others. A user may run at most
+``blueprint_generation_user_workers`` jobs at once and have at most
+``blueprint_generation_user_max_queued`` jobs queued or running. The
+whole queue holds at most ``blueprint_generation_max_queued`` jobs.
+Submissions over a limit are rejected with a suggested retry delay.
+
+The per-user and whole-queue caps on queued jobs are also checked against
+the ``blueprints`` table when the blueprint is inserted, under an advisory
+lock, so they hold across API processes. The running limits, queue
+positions and wait estimates are per process.
+"""
+
+import asyncio
+import logging
+import math
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Any, Awaitable, Callable, Deque, Dict, List, Optional
+
+from sqlalchemy import Select, func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from api.core.config import get_settings
+from api.core.models import Blueprint
+
+logger = logging.getLogger(__name__)
+
+# Key of the advisory lock serializing admissions across processes
+ADMISSION_LOCK_NAME = "blueprint_generation_admission"
+
+# Blueprint statuses of a generation that is queued or running in some process
+IN_PROGRESS_STATUSES = ("queued", "generating")
+
+
+def admission_lock_statement() -> Select:
+    """Take the admission lock, held until the inserting transaction ends."""
+    return select(func.pg_advisory_xact_lock(func.hashtext(ADMISSION_LOCK_NAME)))
+
+
+def stored_jobs_query(since: datetime, user_id: Any = None) -> Select:
+    """Count generations stored as queued (or, for one user, queued or generating).
+
+    Rows whose generation started before ``since`` are left out, so jobs lost
+    with a crashed process do not count against the limits forever.
+    """
+    statuses = IN_PROGRESS_STATUSES if user_id is not None else ("queued",)
+    stmt = select(func.count()).select_from(Blueprint).where(
+        Blueprint.status.in_(statuses),
+        Blueprint.generation_started_at >= since
+    )
+    if user_id is not None:
+        stmt = stmt.where(Blueprint.created_by == user_id)
+    return stmt
+
+
+class GenerationRejected(Exception):
+    """A job was not admitted because a queue or concurrency limit was reached."""
+
+    def __init__(self, message: str, retry_after: int):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+class GenerationJob:
+    """A queued generation: an id, the submitting user and the coroutine function that runs it."""
+
+    def __init__(self, job_id: str, run: Callable[[], Awaitable[None]], user_id: Optional[str] = None):
+        self.job_id = str(job_id)
+        self.user_id = str(user_id)
+        self.run = run
+
+
+class GenerationRunner:
+    """Runs queued generation jobs with bounded concurrency on the app's event loop."""
+
+    def __init__(self, max_running: Optional[int] = None, max_running_per_user: Optional[int] = None,
+                 max_queued: Optional[int] = None, max_queued_per_user: Optional[int] = None):
+        """Initialize the runner.
+
+        Args:
+            max_running: Jobs run at once (defaults to settings, as do the other limits)
+            max_running_per_user: Jobs of one user run at once
+            max_queued: Jobs waiting in the queue
+            max_queued_per_user: Jobs of one user queued or running
+        """
+        settings = get_settings()
+        self._max_running = max(1, max_running or settings.blueprint_generation_workers)
+        self._max_running_per_user = max(1, max_running_per_user or settings.blueprint_generation_user_workers)
+        self._max_queued = max_queued or settings.blueprint_generation_max_queued
+        self._max_queued_per_user = max_queued_per_user or settings.blueprint_generation_user_max_queued
+        self._executor = ThreadPoolExecutor(max_workers=self._max_running, thread_name_prefix="blueprint-generation")
+        # Queued jobs per user, and the users with queued jobs in round-robin order
+        self._queues: Dict[str, Deque[GenerationJob]] = {}
+        self._turns: Deque[str] = deque()
+        self._running: Dict[str, GenerationJob] = {}
+        self._running_per_user: Dict[str, int] = {}
+        # Set when a job is queued or a running job ends
+        self._wakeup: Optional[asyncio.Event] = None
+        self._workers: List[asyncio.Task] = []
+        self._average_seconds: Optional[float] = None
+        self._default_seconds = settings.blueprint_generation_estimated_seconds
+        self.completed = 0
+        self.failed = 0
+        self.rejected = 0
+
+    @property
+    def max_running(self) -> int:
+        return self._max_running
+
+    @property
+    def queued(self) -> int:
+        return sum(len(queue) for queue in self._queues.values())
+
+    def check_admission(self, user_id: Any = None) -> None:
+        """Check that a user may submit another job.
+
+        Raises:
+            GenerationRejected: If the user or the queue is at its limit
+        """
+        user_id = str(user_id)
+        user_jobs = len(self._queues.get(user_id, ())) + self._running_per_user.get(user_id, 0)
+        if user_jobs >= self._max_queued_per_user:
+            self.rejected += 1
+            raise GenerationRejected(
+                f"At most {self._max_queued_per_user} blueprint generations per user may be queued or running",
+                self._retry_after(self.average_seconds)
+            )
+        if self.queued >= self._max_queued:
+            self.rejected += 1
+            raise GenerationRejected(
+                "The blueprint generation queue is full",
+                self._retry_after(self.estimated_wait(0))
+            )
+
+    async def check_stored_admission(self, session: AsyncSession, user_id: Any, since: datetime) -> None:
+        """Check the queued-job caps against the generations of all processes.
+
+        Call it in the transaction that inserts the blueprint; the admission
+        lock it takes keeps concurrent requests from passing the same check.
+
+        Raises:
+            GenerationRejected: If the user or the queue is at its limit
+        """
+        await session.execute(admission_lock_statement())
+        user_jobs = (await session.execute(stored_jobs_query(since, user_id))).scalar_one()
+        if user_jobs >= self._max_queued_per_user:
+            self.rejected += 1
+            raise GenerationRejected(
+                f"At most {self._max_queued_per_user} blueprint generations per user may be queued or running",
+                self._retry_after(self.average_seconds)
+            )
+        queued = (await session.execute(stored_jobs_query(since))).scalar_one()
+        if queued >= self._max_queued:
+            self.rejected += 1
+            raise GenerationRejected(
+                "The blueprint generation queue is full",
+                self._retry_after(self.estimated_wait(0))
+            )
+
+    def submit(self, job_id: Any, run: Callable[[], Awaitable[None]], user_id: Any = None) -> int:
+        """Queue a job, starting the workers if needed.
+
+        Raises:
+            GenerationRejected: If the user or the queue is at its limit
+
+        Returns:
+            int: Jobs that will be started before this one
+        """
+        self.check_admission(user_id)
+        self.start()
+        job = GenerationJob(job_id, run, user_id)
+        if job.user_id not in self._queues:
+            self._queues[job.user_id] = deque()
+            self._turns.append(job.user_id)
+        self._queues[job.user_id].append(job)
+        self._wakeup.set()
+        return self.position(job.job_id)
+
+    def position(self, job_id: Any) -> Optional[int]:
+        """Jobs that will be started before a queued job, or None if it is not queued.
+
+        Follows the round-robin order; per-user running limits can reorder it.
+        """
+        job_id = str(job_id)
+        queues = [list(self._queues[user_id]) for user_id in self._turns]
+        position = 0
+        for depth in range(max((len(queue) for queue in queues), default=0)):
+            for queue in queues:
+                if depth < len(queue):
+                    if queue[depth].job_id == job_id:
+                        return position
+                    position += 1
+        return None
+
+    @property
+    def average_seconds(self) -> float:
+        """Moving average duration of recent jobs, or the configured estimate before any finished."""
+        return self._average_seconds if self._average_seconds is not None else self._default_seconds
+
+    def estimated_wait(self, position: int) -> float:
+        """Estimated seconds until the job at a queue position starts."""
+        waves = position // self._max_running
+        if len(self._running) >= self._max_running:
+            waves += 1
+        return waves * self.average_seconds
+
+    @staticmethod
+    def _retry_after(seconds: float) -> int:
+        return max(1, math.ceil(seconds))
+
+    def is_running(self, job_id: Any) -> bool:
+        return str(job_id) in self._running
+
+    async def run_blocking(self, func: Callable[..., Any], *args: Any) -> Any:
+        """Run a blocking call, such as a crew kickoff, on the runner's thread pool."""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, func, *args)
+
+    def start(self) -> None:
+        """Start the worker tasks on the running event loop."""
+        self._workers = [worker for worker in self._workers if not worker.done()]
+        if self._wakeup is None:
+            self._wakeup = asyncio.Event()
+        while len(self._workers) < self._max_running:
+            self._workers.append(asyncio.create_task(self._work()))
+
+    async def stop(self) -> None:
+        """Cancel the workers and shut down the thread pool.
+
+        Queued jobs are discarded; their blueprints time out as stale generations.
+        """
+        for worker in self._workers:
+            worker.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+        if self.queued:
+            logger.warning(f"Discarding {self.queued} queued generation jobs on shutdown")
+            self._queues.clear()
+            self._turns.clear()
+        self._wakeup = None
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+    def _next_job(self) -> Optional[GenerationJob]:
+        """Take the next job in round-robin order from a user below their running limit."""
+        for _ in range(len(self._turns)):
+            user_id = self._turns[0]
+            self._turns.rotate(-1)
+            if self._running_per_user.get(user_id, 0) >= self._max_running_per_user:
+                continue
+            queue = self._queues[user_id]
+            job = queue.popleft()
+            if not queue:
+                del self._queues[user_id]
+                self._turns.remove(user_id)
+            return job
+        return None
+
+    async def _work(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            job = self._next_job()
+            if job is None:
+                self._wakeup.clear()
+                await self._wakeup.wait()
+                continue
+            self._running[job.job_id] = job
+            self._running_per_user[job.user_id] = self._running_per_user.get(job.user_id, 0) + 1
+            started = loop.time()
+            try:
+                await job.run()
+                self.completed += 1
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self.failed += 1
+                logger.error(f"Generation job {job.job_id} failed: {str(e)}", exc_info=True)
+            finally:
+                self._running.pop(job.job_id, None)
+                self._running_per_user[job.user_id] -= 1
+                if not self._running_per_user[job.user_id]:
+                    del self._running_per_user[job.user_id]
+                self._record_duration(loop.time() - started)
+                # The user's next job may be startable now
+                if self._wakeup is not None:
+                    self._wakeup.set()
+
+    def _record_duration(self, seconds: float) -> None:
+        if self._average_seconds is None:
+            self._average_seconds = seconds
+        else:
+            self._average_seconds = 0.8 * self._average_seconds + 0.2 * seconds
+
+    @property
+    def stats(self) -> Dict[str, Any]:
+        """Queue depth, running jobs, limits and totals."""
+        return {
+            "queued": self.queued,
+            "running": len(self._running),
+            "users_queued": len(self._queues),
+            "max_running": self._max_running,
+            "max_running_per_user": self._max_running_per_user,
+            "max_queued": self._max_queued,
+            "max_queued_per_user": self._max_queued_per_user,
+            "average_seconds": self.average_seconds,
+            "completed": self.completed,
+            "failed": self.failed,
+            "rejected": self.rejected,
+        }
+
+
+_runner: Optional[GenerationRunner] = None
+
+
+def get_generation_runner() -> GenerationRunner:
+    """Get or create the process-wide generation runner."""
+    global _runner
+    if _runner is None:
+        _runner = GenerationRunner()
+    return _runner
+
+
+async def shutdown_generation_runner() -> None:
+    """Stop the process-wide generation runner if it was created."""
+    global _runner
+    if _runner is not None:
+        await _runner.stop()
+        _runner = None
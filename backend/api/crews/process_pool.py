@@ -0,0 +1,141 @@
+"""Warm process pool for blocking CrewAI kickoffs.
+
+Crew runs are synchronous and spend much of their time holding the GIL (prompt
+building, Pydantic validation, JSON parsing). Running them in long-lived worker
+processes keeps the API event loop responsive and lets crew work use every core.
+Each worker imports crewai and parses the crew YAML configs once at boot.
+"""
+
+import asyncio
+import importlib
+import logging
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, Optional
+
+from api.core.config import get_settings
+from api.schemas.pydantic_schemas import BlueprintPydantic
+
+logger = logging.getLogger(__name__)
+
+
+def _init_worker() -> None:
+    """Warm a worker process: import crewai and load the crew configs."""
+    import crewai  # noqa: F401
+    from api.crews.blueprint_crew.blueprint_crew import load_crew_config
+
+    load_crew_config('agents')
+    load_crew_config('tasks')
+    logger.info(f"Crew worker process {os.getpid()} ready")
+
+
+def _ping() -> int:
+    """No-op task used to force worker processes to start."""
+    return os.getpid()
+
+
+def _run_blueprint_crew(inputs: Dict[str, Any]) -> Dict[str, Any]:
+    """Run a BlueprintCrew in a worker process and return the serialized blueprint."""
+    from api.crews.blueprint_crew.blueprint_crew import BlueprintCrew
+
+    blueprint = BlueprintCrew(inputs=inputs).run()
+    return blueprint.model_dump(mode="json")
+
+
+def _run_crew_kickoff(crew_path: str, inputs: Dict[str, Any]) -> Dict[str, Any]:
+    """Kick off a ``module:Class`` crew in a worker process and return its serialized output."""
+    module_name, _, class_name = crew_path.partition(":")
+    crew_class = getattr(importlib.import_module(module_name), class_name)
+    output = crew_class().crew().kickoff(inputs=inputs)
+    return {
+        "raw": output.raw,
+        "json_dict": output.json_dict,
+        "pydantic": output.pydantic.model_dump(mode="json") if output.pydantic else None,
+    }
+
+
+class CrewProcessPool:
+    """A pool of warm worker processes that run crews off the event loop."""
+
+    def __init__(self, max_workers: Optional[int] = None):
+        """Initialize the pool.
+
+        Args:
+            max_workers: Number of worker processes (defaults to settings, then CPU count)
+        """
+        settings = get_settings()
+        self._max_workers = max_workers or settings.crew_process_workers or os.cpu_count() or 1
+        # spawn avoids inheriting the parent's event loop, threads and DB connections
+        self._executor = ProcessPoolExecutor(
+            max_workers=self._max_workers,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_init_worker,
+        )
+
+    @property
+    def max_workers(self) -> int:
+        return self._max_workers
+
+    def warm(self) -> None:
+        """Start every worker process now instead of on first use."""
+        for _ in range(self._max_workers):
+            self._executor.submit(_ping)
+
+    async def run_blueprint(self, inputs: Dict[str, Any]) -> BlueprintPydantic:
+        """Run the blueprint crew in a worker process.
+
+        Args:
+            inputs: BlueprintCrew inputs
+
+        Returns:
+            BlueprintPydantic: The generated blueprint
+        """
+        loop = asyncio.get_running_loop()
+        data = await loop.run_in_executor(self._executor, _run_blueprint_crew, inputs)
+        return BlueprintPydantic.model_validate(data)
+
+    async def kickoff(self, crew_path: str, inputs: Dict[str, Any]) -> Dict[str, Any]:
+        """Kick off an importable crew class in a worker process.
+
+        Args:
+            crew_path: ``module:Class`` path to a crew exposing ``crew()``
+            inputs: Kickoff inputs
+
+        Returns:
+            Dict[str, Any]: ``raw``, ``json_dict`` and ``pydantic`` outputs of the crew
+        """
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, _run_crew_kickoff, crew_path, inputs)
+
+    def shutdown(self, wait: bool = True) -> None:
+        """Shut down the worker processes."""
+        self._executor.shutdown(wait=wait, cancel_futures=True)
+
+
+_pool: Optional[CrewProcessPool] = None
+_pool_lock = threading.Lock()
+
+
+def get_crew_pool() -> CrewProcessPool:
+    """Get or create the process-wide crew pool."""
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = CrewProcessPool()
+        return _pool
+
+
+def shutdown_crew_pool() -> None:
+    """Shut down the process-wide crew pool if it was created."""
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.shutdown()
+            _pool = None
+
+
+def use_process_pool() -> bool:
+    """Whether crew runs should go to the process pool."""
+    return get_settings().crew_execution_mode == "process"
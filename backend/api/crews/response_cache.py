@@ -0,0 +1,62 @@
+"""Content-addressed cache of crew responses.
+
+A crew run is keyed on what the LLM is actually sent: the rendered agent goal
+and backstory, the rendered task description and expected output, and the
+model. Generating a blueprint again for the same topic title and description,
+by the same or another user, is then served from memory instead of another
+LLM call. Entries live in a byte-bounded LRU with a TTL.
+
+The cache is per process. In process mode (``crew_execution_mode=process``)
+each crew worker process has its own.
+"""
+
+import hashlib
+import json
+import threading
+from typing import Any, Dict, Optional
+
+from api.core.config import get_settings
+from api.flows.result_cache import ResultMemoryCache
+
+_cache: Optional[ResultMemoryCache] = None
+_cache_lock = threading.Lock()
+
+
+def response_cache_key(goal: str, backstory: str, description: str, expected_output: str, model: Optional[str]) -> str:
+    """Hash the rendered prompt parts and model of a single-agent, single-task crew."""
+    payload = json.dumps(
+        {
+            "goal": goal,
+            "backstory": backstory,
+            "description": description,
+            "expected_output": expected_output,
+            "model": model,
+        },
+        ensure_ascii=False,
+        sort_keys=True,
+        separators=(",", ":"),
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def get_response_cache() -> Optional[ResultMemoryCache]:
+    """Get the process-wide response cache, or None if it is disabled."""
+    global _cache
+    settings = get_settings()
+    if not settings.crew_response_cache_bytes:
+        return None
+    with _cache_lock:
+        if _cache is None:
+            _cache = ResultMemoryCache(
+                max_bytes=settings.crew_response_cache_bytes,
+                ttl=settings.crew_response_cache_ttl or None
+            )
+        return _cache
+
+
+def response_cache_stats() -> Dict[str, Any]:
+    """Hit, miss and size counters of this process's response cache."""
+    cache = get_response_cache()
+    if cache is None:
+        return {"enabled": False}
+    return {"enabled": True, **cache.stats}
@@ -0,0 +1,202 @@
+"""Step-level checkpointing for CrewAI flows.
+
+After every ``@start``/``@listen``/``@router`` step finishes, the flow state and
+the step's output are persisted to ``flow_executions.checkpoint``. When a paused
+or failed execution runs again, completed steps are replayed from the checkpoint
+instead of re-running their LLM calls.
+
+Step outputs are saved with the import path of every Pydantic model in them,
+CrewOutput included, so replayed steps hand listeners the same types a live
+run would. Models that can no longer be imported or validated are replayed as
+plain JSON. Replay hooks into private ``Flow`` attributes of crewai 0.86.
+"""
+
+import asyncio
+import importlib
+import logging
+from datetime import datetime
+from typing import Any, Dict, Optional, Set
+from uuid import UUID
+
+import crewai
+
+from crewai.flow.flow import Flow
+from pydantic import BaseModel
+from sqlalchemy import select, update
+
+from api.core.models import FlowExecution as DBFlowExecution, FlowExecutionStatus
+from api.core.database import get_session_maker
+
+logger = logging.getLogger(__name__)
+
+# crewai release whose private Flow attributes the checkpointer wraps
+SUPPORTED_CREWAI_VERSION = "0.86.0"
+# Key marking a serialized Pydantic model in saved step outputs
+MODEL_KEY = "__model__"
+
+
+class FlowInterrupted(Exception):
+    """Raised between steps when an execution was paused or stopped while running."""
+
+    def __init__(self, status: FlowExecutionStatus):
+        super().__init__(f"Flow execution interrupted: {status.value}")
+        self.status = status
+
+
+def to_jsonable(value: Any) -> Any:
+    """Convert a step output or state into JSON-serializable data."""
+    if isinstance(value, BaseModel):
+        return value.model_dump(mode="json")
+    if isinstance(value, dict):
+        return {str(k): to_jsonable(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple, set)):
+        return [to_jsonable(v) for v in value]
+    if value is None or isinstance(value, (str, int, float, bool)):
+        return value
+    return str(value)
+
+
+def encode_output(value: Any) -> Any:
+    """Convert a step output into JSON, tagging Pydantic models with their import path.
+
+    Fields are encoded one by one, so models held in fields typed as a base
+    class (like ``CrewOutput.pydantic``) keep their own fields and type.
+    """
+    if isinstance(value, BaseModel):
+        cls = type(value)
+        return {
+            MODEL_KEY: f"{cls.__module__}:{cls.__qualname__}",
+            "fields": {name: encode_output(getattr(value, name)) for name in cls.model_fields},
+        }
+    if isinstance(value, dict):
+        return {str(k): encode_output(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple, set)):
+        return [encode_output(v) for v in value]
+    return to_jsonable(value)
+
+
+def decode_output(value: Any) -> Any:
+    """Rebuild a step output saved by ``encode_output``."""
+    if isinstance(value, list):
+        return [decode_output(v) for v in value]
+    if not isinstance(value, dict):
+        return value
+    if MODEL_KEY not in value:
+        return {k: decode_output(v) for k, v in value.items()}
+
+    fields = decode_output(value.get("fields", {}))
+    try:
+        module_name, _, qualname = value[MODEL_KEY].partition(":")
+        cls = importlib.import_module(module_name)
+        for part in qualname.split("."):
+            cls = getattr(cls, part)
+        if not (isinstance(cls, type) and issubclass(cls, BaseModel)):
+            raise TypeError(f"{value[MODEL_KEY]} is not a Pydantic model")
+        return cls.model_validate(fields)
+    except Exception as e:
+        logger.warning(f"Replaying checkpointed {value[MODEL_KEY]} as plain JSON: {str(e)}")
+        return fields
+
+
+def _to_thread(method):
+    """Wrap a sync flow method in a coroutine that runs it in a worker thread."""
+    async def run_in_thread(*args, **kwargs):
+        return await asyncio.to_thread(method, *args, **kwargs)
+    return run_in_thread
+
+
+class FlowCheckpointer:
+    """
+    Hooks a flow instance so each finished step is checkpointed and
+    steps completed in an earlier run are replayed instead of executed.
+    """
+
+    def __init__(self, execution_id: UUID, checkpoint: Optional[Dict[str, Any]] = None):
+        """Initialize the checkpointer.
+
+        Args:
+            execution_id: The execution whose row stores the checkpoint
+            checkpoint: Checkpoint saved by a previous run, if any
+        """
+        checkpoint = checkpoint or {}
+        self.execution_id = execution_id
+        self.outputs: Dict[str, Any] = dict(checkpoint.get("completed", {}))
+        self._restored: Set[str] = set(self.outputs)
+        self._restored_state = checkpoint.get("state")
+        self.error: Optional[BaseException] = None
+        self.interrupted: Optional[FlowExecutionStatus] = None
+        self._lock = asyncio.Lock()
+
+    @property
+    def resumed(self) -> bool:
+        """Whether this run continues from an earlier checkpoint."""
+        return bool(self._restored)
+
+    def attach(self, flow: Flow) -> None:
+        """Restore checkpointed state into the flow and wrap its step execution."""
+        if not (hasattr(flow, "_execute_method") and hasattr(flow, "_method_outputs")):
+            raise RuntimeError(
+                f"crewai {crewai.__version__} changed the Flow internals checkpointing relies on; "
+                f"it supports crewai {SUPPORTED_CREWAI_VERSION}"
+            )
+        if self._restored_state is not None:
+            if isinstance(flow.state, BaseModel):
+                flow._state = flow.state.__class__.model_validate(self._restored_state)
+            elif isinstance(flow.state, dict):
+                flow.state.update(self._restored_state)
+            logger.info(f"Resuming flow execution {self.execution_id} after steps: {sorted(self._restored)}")
+
+        execute_method = flow._execute_method
+
+        async def checkpointed_execute_method(method_name, method, *args, **kwargs):
+            if method_name in self._restored:
+                # Completed in an earlier run: replay its output without calling the LLM again
+                self._restored.discard(method_name)
+                result = decode_output(self.outputs[method_name])
+                flow._method_outputs.append(result)
+                return result
+
+            await self._check_interrupt()
+            if not asyncio.iscoroutinefunction(method):
+                # Run blocking crew steps off the event loop so the step can be cancelled
+                method = _to_thread(method)
+            try:
+                result = await execute_method(method_name, method, *args, **kwargs)
+            except Exception as e:
+                # CrewAI swallows listener errors, so remember the first one here
+                if self.error is None:
+                    self.error = e
+                raise
+            await self.save(flow, method_name, result)
+            return result
+
+        flow._execute_method = checkpointed_execute_method
+
+    async def _check_interrupt(self) -> None:
+        """Stop before the next step if the execution was paused or stopped."""
+        async with get_session_maker()() as session:
+            status = (await session.execute(
+                select(DBFlowExecution.status).where(DBFlowExecution.id == self.execution_id)
+            )).scalar_one_or_none()
+        if status != FlowExecutionStatus.RUNNING:
+            self.interrupted = status or FlowExecutionStatus.FAILED
+            raise FlowInterrupted(self.interrupted)
+
+    async def save(self, flow: Flow, method_name: str, result: Any) -> None:
+        """Persist the flow state and the outputs of every completed step."""
+        async with self._lock:
+            self.outputs[method_name] = encode_output(result)
+            checkpoint = {
+                "completed": dict(self.outputs),
+                "state": to_jsonable(flow.state),
+                "last_step": method_name,
+                "updated_at": datetime.utcnow().isoformat(),
+            }
+            async with get_session_maker()() as session:
+                await session.execute(
+                    update(DBFlowExecution)
+                    .where(DBFlowExecution.id == self.execution_id)
+                    .values(checkpoint=checkpoint)
+                )
+                await session.commit()
+        logger.debug(f"Checkpointed step '{method_name}' of flow execution {self.execution_id}")
@@ -1,90 +1,236 @@
 import asyncio
+import json
 import logging
-from datetime import datetime
-from typing import Optional, Dict, Any
-from uuid import UUID
-from sqlalchemy import insert
+import threading
+from datetime import datetime, timezone
+from typing import Optional, Dict, Any, List
+from uuid import UUID, uuid4
+from sqlalchemy import insert, text
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from api.core.config import get_settings
 from api.core.models import FlowLog, LogLevel
-from api.core.database import async_session_maker
+from api.core.database import get_session_maker
+from .log_buffer import LogBuffer
+from .log_hub import PROCESS_ID, get_log_hub
+from .pagination import encode_cursor
+
+logger = logging.getLogger(__name__)
+
+# Columns written by the batch writer, in COPY record order
+LOG_COLUMNS = ("id", "execution_id", "timestamp", "level", "message", "log_metadata")
+
+# Postgres rejects NOTIFY payloads of 8000 bytes or more
+MAX_NOTIFY_BYTES = 7900
+TRUNCATED_MESSAGE_CHARS = 1000
 
 class DatabaseLogger(logging.Logger):
-    """A logger that writes to both the database and standard output."""
+    """A logger that writes to both the database and standard output.
+    
+    Log lines are queued and written by a background worker in batches: it
+    drains up to ``flow_log_batch_size`` lines or waits at most
+    ``flow_log_flush_interval`` seconds, then writes the batch with a single
+    multi-row INSERT (or COPY for large batches) and one commit.
+    
+    The queue is bounded by ``flow_log_queue_size``; see LogBuffer for the
+    overflow policies and DEBUG sampling.
+    
+    Queued lines are also recorded in the log hub's ring for the execution,
+    which pushes them to viewers in this process before they are written.
+    Only lines the buffer accepts are recorded. A repeat coalesced into the
+    previous line updates that line's repeat count in the ring instead of
+    being pushed again, and a line evicted from the buffer is dropped from
+    the ring, so replays match what is stored.
+    """
     
     def __init__(self, name: str, execution_id: UUID):
         super().__init__(name)
+        settings = get_settings()
         self.execution_id = execution_id
-        self._log_queue = asyncio.Queue()
+        self._log_queue = LogBuffer(
+            settings.flow_log_queue_size,
+            policy=settings.flow_log_overflow_policy,
+            debug_sample_rate=settings.flow_log_debug_sample_rate,
+            on_evict=self._evicted
+        )
         self._stop_event = asyncio.Event()
         self._worker_task = None
+        self._batch_size = max(1, settings.flow_log_batch_size)
+        self._flush_interval = settings.flow_log_flush_interval
+        self._copy_threshold = settings.flow_log_copy_threshold
+        self._hub = get_log_hub()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._loop_thread: Optional[int] = None
+        self.written = 0
+        self.failed = 0
+
+    @property
+    def stats(self) -> Dict[str, int]:
+        """Counts of written, failed, dropped, coalesced and sampled-out lines."""
+        return {"written": self.written, "failed": self.failed, **self._log_queue.stats}
 
     async def start_worker(self):
         """Start the async worker that processes logs."""
+        self._hub.open_ring(self.execution_id)
+        self._loop = asyncio.get_running_loop()
+        self._loop_thread = threading.get_ident()
         self._worker_task = asyncio.create_task(self._process_logs())
 
     async def stop_worker(self):
-        """Stop the async worker."""
+        """Stop the async worker after it has written every queued log."""
         if self._worker_task:
             self._stop_event.set()
             await self._worker_task
+            self._worker_task = None
+        self._hub.close_ring(self.execution_id)
 
     async def _process_logs(self):
-        """Process logs from the queue and write to database."""
-        async with async_session_maker() as session:
-            while not self._stop_event.is_set():
-                try:
-                    # Process logs one at a time for real-time streaming
+        """Write queued logs to the database in batches until stopped and drained."""
+        while True:
+            batch = await self._next_batch()
+            if batch:
+                await self._write_batch(batch)
+            elif self._stop_event.is_set():
+                return
+
+    async def _next_batch(self) -> List[Dict[str, Any]]:
+        """Collect up to batch_size logs, waiting at most flush_interval after the first one."""
+        batch: List[Dict[str, Any]] = []
+        loop = asyncio.get_running_loop()
+        deadline = None
+        while len(batch) < self._batch_size:
+            try:
+                batch.append(self._log_queue.get_nowait())
+                continue
+            except asyncio.QueueEmpty:
+                pass
+            if self._stop_event.is_set():
+                # Final flush: take what is queued without waiting for more
+                break
+            if deadline is None:
+                deadline = loop.time() + self._flush_interval
+            remaining = deadline - loop.time()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(self._log_queue.get(), timeout=remaining))
+            except asyncio.TimeoutError:
+                break
+        return batch
+
+    async def _write_batch(self, batch: List[Dict[str, Any]]):
+        """Write a batch of logs in one transaction and notify subscribers on commit."""
+        try:
+            async with get_session_maker()() as session:
+                if self._copy_threshold and len(batch) >= self._copy_threshold:
                     try:
-                        log = await self._log_queue.get()
-                        # Insert single log
-                        await session.execute(
-                            insert(FlowLog),
-                            [log.dict()]
-                        )
-                        await session.commit()
-
-                        # Notify subscribers immediately
-                        await self._notify_subscribers(session, log)
-
-                    except asyncio.QueueEmpty:
-                        # Small delay when queue is empty
-                        await asyncio.sleep(0.1)
-                        continue
-
-                except Exception as e:
-                    print(f"Error processing log: {e}")
-                    await asyncio.sleep(1)  # Longer delay on error
-
-    async def _notify_subscribers(self, session: AsyncSession, log: FlowLog):
-        """Notify subscribers of new log entries using PostgreSQL NOTIFY."""
+                        await self._copy_batch(session, batch)
+                    except Exception as e:
+                        logger.warning(f"COPY of flow logs failed, falling back to INSERT: {e}")
+                        await session.rollback()
+                        self._copy_threshold = 0
+                        await session.execute(insert(FlowLog).values(batch))
+                else:
+                    await session.execute(insert(FlowLog).values(batch))
+                # NOTIFY is transactional, so subscribers hear of the lines only once they are stored
+                await self._notify_subscribers(session, batch)
+                await session.commit()
+            self.written += len(batch)
+        except Exception as e:
+            self.failed += len(batch)
+            logger.error(f"Error writing {len(batch)} logs for flow execution {self.execution_id}: {e}")
+        # Failed lines will not be written either, so the ring may let them go
+        self._hub.mark_persisted(self.execution_id, max((log["timestamp"], log["id"]) for log in batch))
+
+    async def _copy_batch(self, session: AsyncSession, batch: List[Dict[str, Any]]):
+        """Write a batch with asyncpg's binary COPY protocol."""
+        connection = await session.connection()
+        raw_connection = await connection.get_raw_connection()
+        records = [
+            (
+                log["id"],
+                log["execution_id"],
+                log["timestamp"],
+                # SQLAlchemy stores enum names as the database labels
+                log["level"].name,
+                log["message"],
+                json.dumps(log["log_metadata"]) if log["log_metadata"] is not None else None,
+            )
+            for log in batch
+        ]
+        await raw_connection.driver_connection.copy_records_to_table(
+            FlowLog.__tablename__,
+            records=records,
+            columns=list(LOG_COLUMNS)
+        )
+
+    @staticmethod
+    def _line(log: Dict[str, Any]) -> Dict[str, Any]:
+        """A queued log entry in the form the log API returns."""
+        return {
+            "id": str(log["id"]),
+            "cursor": encode_cursor(log["timestamp"], log["id"]),
+            "execution_id": str(log["execution_id"]),
+            "timestamp": log["timestamp"].isoformat(),
+            "level": log["level"].value,
+            "message": log["message"],
+            "metadata": log["log_metadata"]
+        }
+
+    @classmethod
+    def _notification(cls, log: Dict[str, Any]) -> str:
+        """Build the NOTIFY payload of a log line.
+        
+        Lines too large for a notification are sent shortened and flagged as
+        truncated; the log hub of each receiving process reads the full line from
+        the database before delivering it.
+        """
         notification = {
-            "execution_id": str(self.execution_id),
-            "log": {
-                "id": str(log.id) if log.id else None,
-                "execution_id": str(log.execution_id),
-                "timestamp": log.timestamp.isoformat(),
-                "level": log.level.value,
-                "message": log.message,
-                "metadata": log.log_metadata
-            }
+            "execution_id": str(log["execution_id"]),
+            "origin": PROCESS_ID,
+            "log": cls._line(log)
         }
-        import json
+        payload = json.dumps(notification, default=str)
+        if len(payload.encode("utf-8")) < MAX_NOTIFY_BYTES:
+            return payload
+        notification["log"].update(
+            message=log["message"][:TRUNCATED_MESSAGE_CHARS],
+            metadata=None,
+            truncated=True
+        )
+        return json.dumps(notification, default=str)
+
+    async def _notify_subscribers(self, session: AsyncSession, batch: List[Dict[str, Any]]):
+        """Notify subscribers of new log entries using PostgreSQL NOTIFY, one statement per batch."""
         await session.execute(
-            f"SELECT pg_notify('flow_logs', :payload)",
-            {"payload": json.dumps(notification)}
+            text("SELECT pg_notify('flow_logs', payload) FROM unnest(CAST(:payloads AS text[])) AS payload"),
+            {"payloads": [self._notification(log) for log in batch]}
         )
 
+    def _entry(self, level: LogLevel, msg: str, metadata: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+        return {
+            "id": uuid4(),
+            "execution_id": self.execution_id,
+            "timestamp": datetime.now(timezone.utc),
+            "level": level,
+            "message": msg,
+            "log_metadata": metadata
+        }
+
+    def _publish(self, entry: Dict[str, Any], queued: Optional[Dict[str, Any]]):
+        """Record a line the buffer accepted, or the line it was coalesced into."""
+        if queued is entry:
+            self._hub.record(self.execution_id, (entry["timestamp"], entry["id"]), self._line(entry))
+        elif queued is not None:
+            self._hub.update(self.execution_id, (queued["timestamp"], queued["id"]), {"metadata": queued["log_metadata"]})
+
+    def _evicted(self, entry: Dict[str, Any]):
+        self._hub.discard(self.execution_id, (entry["timestamp"], entry["id"]))
+
     async def alog(self, level: LogLevel, msg: str, metadata: Optional[Dict[str, Any]] = None):
-        """Async log method that queues logs for processing."""
-        log_entry = FlowLog(
-            execution_id=self.execution_id,
-            timestamp=datetime.utcnow(),
-            level=level,
-            message=msg,
-            log_metadata=metadata
-        )
-        await self._log_queue.put(log_entry)
+        """Async log method that queues logs for processing and publishes them at once."""
+        entry = self._entry(level, msg, metadata)
+        self._publish(entry, await self._log_queue.put(entry))
         # Also print to stdout for debugging
         print(f"[{level.value.upper()}] {msg}")
 
@@ -100,18 +246,26 @@ class DatabaseLogger(logging.Logger):
     async def aerror(self, msg: str, metadata: Optional[Dict[str, Any]] = None):
         await self.alog(LogLevel.ERROR, msg, metadata)
 
-    # Sync methods that create tasks for async logging
+    # Sync methods queue directly without waiting; calls from other threads are handed to the loop
     def log(self, level: LogLevel, msg: str, metadata: Optional[Dict[str, Any]] = None):
-        asyncio.create_task(self.alog(level, msg, metadata))
+        if self._loop is not None and threading.get_ident() != self._loop_thread:
+            try:
+                self._loop.call_soon_threadsafe(self.log, level, msg, metadata)
+            except RuntimeError:
+                logger.warning(f"Flow log line after the event loop closed: {msg}")
+            return
+        entry = self._entry(level, msg, metadata)
+        self._publish(entry, self._log_queue.put_nowait(entry))
+        print(f"[{level.value.upper()}] {msg}")
 
     def debug(self, msg: str, metadata: Optional[Dict[str, Any]] = None):
-        asyncio.create_task(self.adebug(msg, metadata))
+        self.log(LogLevel.DEBUG, msg, metadata)
 
     def info(self, msg: str, metadata: Optional[Dict[str, Any]] = None):
-        asyncio.create_task(self.ainfo(msg, metadata))
+        self.log(LogLevel.INFO, msg, metadata)
 
     def warning(self, msg: str, metadata: Optional[Dict[str, Any]] = None):
-        asyncio.create_task(self.awarning(msg, metadata))
+        self.log(LogLevel.WARNING, msg, metadata)
 
     def error(self, msg: str, metadata: Optional[Dict[str, Any]] = None):
-        asyncio.create_task(self.aerror(msg, metadata))
+        self.log(LogLevel.ERROR, msg, metadata)
@@ -0,0 +1,191 @@
+"""Sharded on-disk store for flow results.
+
+Layout: ``<cache_dir>/<key[0:2]>/<key[2:4]>/<key>.json.gz`` holding gzip-compressed
+compact JSON. Writes go to a temp file in the same shard and are renamed into
+place, so readers never see a partially written entry. Files of the old flat
+``<cache_dir>/<key>.json`` format are never read; their keys predate flow
+versions, so they are only removed by ``evict_variants`` and ``gc``.
+"""
+
+import gzip
+import json
+import logging
+import os
+import tempfile
+import time
+from typing import Any, Dict, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+ENTRY_SUFFIX = ".json.gz"
+TEMP_PREFIX = ".tmp-"
+
+
+def _file_mode() -> int:
+    """Mode of a regular file created under the process umask."""
+    umask = os.umask(0)
+    os.umask(umask)
+    return 0o666 & ~umask
+
+
+# mkstemp creates files readable by their owner only
+FILE_MODE = _file_mode()
+
+
+class FlowResultDiskStore:
+    """Compressed, sharded and atomically written flow result files."""
+
+    def __init__(self, cache_dir: str, compress_level: int = 6):
+        """Initialize the store.
+
+        Args:
+            cache_dir: Root directory of the cache
+            compress_level: gzip compression level
+        """
+        self._cache_dir = cache_dir
+        self._compress_level = compress_level
+        os.makedirs(cache_dir, exist_ok=True)
+
+    def path_for(self, cache_key: str) -> str:
+        """Get the sharded file path for a cache key."""
+        return os.path.join(self._cache_dir, cache_key[0:2], cache_key[2:4], f"{cache_key}{ENTRY_SUFFIX}")
+
+    def _legacy_path_for(self, cache_key: str) -> str:
+        return os.path.join(self._cache_dir, f"{cache_key}.json")
+
+    def exists(self, cache_key: str) -> bool:
+        """Check whether an entry exists."""
+        return os.path.exists(self.path_for(cache_key))
+
+    def load(self, cache_key: str) -> Optional[Tuple[Dict[str, Any], int]]:
+        """Load an entry.
+
+        Returns:
+            Optional[Tuple[Dict[str, Any], int]]: The entry and its uncompressed size in bytes, or None
+        """
+        try:
+            with open(self.path_for(cache_key), "rb") as f:
+                raw = gzip.decompress(f.read())
+        except FileNotFoundError:
+            return None
+        return json.loads(raw), len(raw)
+
+    def save(self, cache_key: str, data: Dict[str, Any]) -> int:
+        """Atomically write an entry.
+
+        Returns:
+            int: The uncompressed size of the entry in bytes
+        """
+        raw = json.dumps(data, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+        path = self.path_for(cache_key)
+        shard = os.path.dirname(path)
+        os.makedirs(shard, exist_ok=True)
+        fd, temp_path = tempfile.mkstemp(prefix=TEMP_PREFIX, dir=shard)
+        try:
+            os.fchmod(fd, FILE_MODE)
+            with os.fdopen(fd, "wb") as f:
+                f.write(gzip.compress(raw, compresslevel=self._compress_level))
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(temp_path, path)
+        except BaseException:
+            try:
+                os.remove(temp_path)
+            except OSError:
+                pass
+            raise
+        return len(raw)
+
+    def delete(self, cache_key: str) -> None:
+        """Delete an entry."""
+        try:
+            os.remove(self.path_for(cache_key))
+        except FileNotFoundError:
+            pass
+
+    def evict_variants(self, cache_key: str, prefix: str) -> int:
+        """Delete other entries in the key's shard whose key starts with prefix.
+
+        Used to drop entries cached for the same request under an older version.
+
+        Returns:
+            int: Number of entries removed
+        """
+        shard = os.path.dirname(self.path_for(cache_key))
+        keep = os.path.basename(self.path_for(cache_key))
+        removed = 0
+        try:
+            names = os.listdir(shard)
+        except FileNotFoundError:
+            names = []
+        for name in names:
+            if name != keep and name.startswith(prefix) and name.endswith(ENTRY_SUFFIX):
+                removed += self._remove_file(os.path.join(shard, name))
+        # Entries from the flat format predate versioning
+        removed += self._remove_file(self._legacy_path_for(prefix))
+        return removed
+
+    def gc(self, max_bytes: Optional[int] = None, max_age: Optional[float] = None) -> Dict[str, int]:
+        """Remove expired entries, then the oldest entries until the store fits in max_bytes.
+
+        Args:
+            max_bytes: Maximum total compressed size of the store, or None for no bound
+            max_age: Maximum entry age in seconds, or None for no bound
+
+        Returns:
+            Dict[str, int]: Counts of removed and remaining entries and bytes
+        """
+        now = time.time()
+        entries = []
+        removed = 0
+        removed_bytes = 0
+
+        for root, _, files in os.walk(self._cache_dir):
+            for name in files:
+                path = os.path.join(root, name)
+                try:
+                    stat = os.stat(path)
+                except FileNotFoundError:
+                    continue
+                age = now - stat.st_mtime
+                # Temp files left behind by a crashed writer
+                stale_temp = name.startswith(TEMP_PREFIX) and age > 3600
+                expired = max_age is not None and age > max_age and not name.startswith(TEMP_PREFIX)
+                if stale_temp or expired:
+                    if self._remove_file(path):
+                        removed += 1
+                        removed_bytes += stat.st_size
+                    continue
+                if name.endswith(ENTRY_SUFFIX) or (root == self._cache_dir and name.endswith(".json")):
+                    entries.append((stat.st_mtime, stat.st_size, path))
+
+        total = sum(size for _, size, _ in entries)
+        if max_bytes is not None and total > max_bytes:
+            entries.sort()
+            evicted = 0
+            for _, size, path in entries:
+                if total <= max_bytes:
+                    break
+                if self._remove_file(path):
+                    removed += 1
+                    removed_bytes += size
+                total -= size
+                evicted += 1
+            entries = entries[evicted:]
+
+        if removed:
+            logger.info(f"Flow cache GC removed {removed} files ({removed_bytes} bytes)")
+        return {
+            "removed": removed,
+            "removed_bytes": removed_bytes,
+            "entries": len(entries),
+            "bytes": total,
+        }
+
+    @staticmethod
+    def _remove_file(path: str) -> bool:
+        try:
+            os.remove(path)
+            return True
+        except OSError:
+            return False
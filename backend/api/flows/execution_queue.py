@@ -0,0 +1,383 @@
+"""Table-backed work queue for flow executions.
+
+Queued executions are PENDING rows in ``flow_executions`` with ``queued_at`` set.
+Workers claim them with ``SELECT ... FOR UPDATE SKIP LOCKED`` so any number of
+workers, in the API process or in separate worker processes, can drain the same
+table without handing the same row out twice.
+"""
+
+import asyncio
+import logging
+import os
+import socket
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Set
+from uuid import UUID
+
+from sqlalchemy import Select, Update, select, update, func
+
+from api.core.config import get_settings
+from api.core.models import FlowExecution as DBFlowExecution, FlowExecutionStatus
+from api.core.database import get_session_maker
+
+logger = logging.getLogger(__name__)
+
+# First key of the per-flow advisory locks, keeping them apart from other users of advisory locks
+FLOW_LOCK_NAMESPACE = "flow_execution_queue"
+
+
+def parse_concurrency_limits(raw: str) -> Dict[str, int]:
+    """Parse a ``flow_name=limit`` comma separated string into a dict.
+
+    Args:
+        raw: String such as ``"book_flow=2,poem_flow=8"``
+
+    Returns:
+        Dict[str, int]: Mapping of flow name to its maximum number of RUNNING executions
+    """
+    limits: Dict[str, int] = {}
+    for item in (raw or "").split(","):
+        item = item.strip()
+        if not item:
+            continue
+        name, _, value = item.partition("=")
+        try:
+            limits[name.strip()] = int(value)
+        except ValueError:
+            logger.warning(f"Ignoring invalid flow concurrency limit: {item}")
+    return limits
+
+
+def running_counts_query() -> Select:
+    """RUNNING executions per flow name."""
+    return (
+        select(DBFlowExecution.flow_name, func.count())
+        .where(DBFlowExecution.status == FlowExecutionStatus.RUNNING)
+        .group_by(DBFlowExecution.flow_name)
+    )
+
+
+def running_count_query(flow_name: str) -> Select:
+    """RUNNING executions of one flow."""
+    return select(func.count()).select_from(DBFlowExecution).where(
+        DBFlowExecution.status == FlowExecutionStatus.RUNNING,
+        DBFlowExecution.flow_name == flow_name,
+    )
+
+
+def claim_candidate_query(saturated: Set[str]) -> Select:
+    """Lock the oldest queued execution of a flow not known to be at its limit.
+
+    ``SKIP LOCKED`` passes over rows other workers are claiming.
+    """
+    stmt = select(DBFlowExecution).where(
+        DBFlowExecution.status == FlowExecutionStatus.PENDING,
+        DBFlowExecution.queued_at.isnot(None),
+    )
+    if saturated:
+        stmt = stmt.where(DBFlowExecution.flow_name.notin_(sorted(saturated)))
+    return stmt.order_by(DBFlowExecution.queued_at).limit(1).with_for_update(skip_locked=True)
+
+
+def flow_lock_statement(flow_name: str) -> Select:
+    """Take the advisory lock of a flow until the transaction ends."""
+    return select(func.pg_advisory_xact_lock(func.hashtext(FLOW_LOCK_NAMESPACE), func.hashtext(flow_name)))
+
+
+def stale_requeue_statement(cutoff: datetime) -> Update:
+    """Put queued RUNNING executions last heartbeated before the cutoff back to PENDING."""
+    return (
+        update(DBFlowExecution)
+        .where(
+            DBFlowExecution.status == FlowExecutionStatus.RUNNING,
+            DBFlowExecution.queued_at.isnot(None),
+            DBFlowExecution.heartbeat_at < cutoff,
+        )
+        .values(status=FlowExecutionStatus.PENDING, worker_id=None, heartbeat_at=None)
+    )
+
+
+def claimed_release_statement(worker_ids: List[str]) -> Update:
+    """Put RUNNING executions claimed by the given workers back to PENDING."""
+    return (
+        update(DBFlowExecution)
+        .where(
+            DBFlowExecution.status == FlowExecutionStatus.RUNNING,
+            DBFlowExecution.worker_id.in_(worker_ids),
+        )
+        .values(status=FlowExecutionStatus.PENDING, worker_id=None, heartbeat_at=None)
+    )
+
+
+class FlowExecutionQueue:
+    """
+    Pool of async workers that claim and run queued flow executions.
+    Concurrency limits are per ``flow_name`` and count RUNNING rows across every process.
+    """
+
+    def __init__(
+        self,
+        flow_wrapper,
+        worker_count: Optional[int] = None,
+        concurrency_limits: Optional[Dict[str, int]] = None,
+        default_limit: Optional[int] = None,
+        poll_interval: Optional[float] = None,
+        stale_after: Optional[int] = None,
+        shutdown_timeout: Optional[float] = None,
+    ):
+        """Initialize the queue.
+
+        Args:
+            flow_wrapper: The FlowWrapper whose registered flows the workers run
+            worker_count: Number of worker tasks in this process
+            concurrency_limits: Maximum RUNNING executions per flow name
+            default_limit: Limit for flows without an explicit entry
+            poll_interval: Seconds an idle worker waits before polling again
+            stale_after: Seconds without a heartbeat before a RUNNING row is requeued
+            shutdown_timeout: Seconds stop() waits for in-flight executions before cancelling them
+        """
+        settings = get_settings()
+        self._flow_wrapper = flow_wrapper
+        self._worker_count = worker_count if worker_count is not None else settings.flow_worker_count
+        self._limits = (
+            concurrency_limits
+            if concurrency_limits is not None
+            else parse_concurrency_limits(settings.flow_concurrency_limits)
+        )
+        self._default_limit = default_limit if default_limit is not None else settings.flow_default_concurrency
+        self._poll_interval = poll_interval if poll_interval is not None else settings.flow_queue_poll_interval
+        self._stale_after = stale_after if stale_after is not None else settings.flow_queue_stale_after
+        self._shutdown_timeout = (
+            shutdown_timeout if shutdown_timeout is not None else settings.flow_queue_shutdown_timeout
+        )
+        self._cancel_poll_interval = settings.flow_cancel_poll_interval
+        self._worker_prefix = f"{socket.gethostname()}:{os.getpid()}"
+        self._wakeup = asyncio.Event()
+        self._stop_event = asyncio.Event()
+        self._workers: List[asyncio.Task] = []
+        self._worker_ids: List[str] = []
+        self._running: Dict[UUID, str] = {}
+        self._tasks: Dict[UUID, asyncio.Task] = {}
+        self._last_reaped: Optional[datetime] = None
+
+    def limit_for(self, flow_name: str) -> int:
+        """Get the concurrency limit for a flow."""
+        return self._limits.get(flow_name, self._default_limit)
+
+    @property
+    def running(self) -> Dict[UUID, str]:
+        """Executions currently running in this process, keyed by execution ID."""
+        return dict(self._running)
+
+    async def start(self) -> None:
+        """Start the worker tasks."""
+        if self._workers:
+            return
+        self._stop_event.clear()
+        for index in range(self._worker_count):
+            worker_id = f"{self._worker_prefix}:{index}"
+            self._worker_ids.append(worker_id)
+            self._workers.append(asyncio.create_task(self._worker(worker_id)))
+        logger.info(f"Started {self._worker_count} flow queue workers ({self._worker_prefix})")
+
+    async def stop(self, timeout: Optional[float] = None) -> None:
+        """Stop the worker tasks.
+
+        In-flight executions get ``timeout`` seconds (the configured shutdown
+        timeout by default) to finish. Workers still busy after that are
+        cancelled without waiting on the flows, and the executions they
+        claimed are put back in the queue for another worker to resume.
+        """
+        timeout = timeout if timeout is not None else self._shutdown_timeout
+        self._stop_event.set()
+        self._wakeup.set()
+        workers, self._workers = self._workers, []
+        worker_ids, self._worker_ids = self._worker_ids, []
+        if not workers:
+            return
+        _, busy = await asyncio.wait(workers, timeout=timeout)
+        if not busy:
+            return
+
+        logger.warning(f"Cancelling {len(self._tasks)} flow executions still running after {timeout}s")
+        runs = list(self._tasks.values())
+        for task in [*busy, *runs]:
+            task.cancel()
+        # Cancelled runs release their own rows; a run stuck in a thread is not waited for
+        await asyncio.wait([*busy, *runs], timeout=timeout)
+        try:
+            async with get_session_maker()() as session:
+                result = await session.execute(claimed_release_statement(worker_ids))
+                await session.commit()
+            if result.rowcount:
+                logger.info(f"Requeued {result.rowcount} flow executions interrupted by shutdown")
+        except Exception as e:
+            # Left RUNNING, they are requeued once their heartbeat goes stale
+            logger.error(f"Failed to requeue flow executions on shutdown: {str(e)}")
+
+    def notify(self) -> None:
+        """Wake idle workers after a row was enqueued in this process."""
+        self._wakeup.set()
+
+    async def run_forever(self) -> None:
+        """Run the workers until cancelled; used by standalone worker processes."""
+        await self.start()
+        try:
+            await self._stop_event.wait()
+        finally:
+            await self.stop()
+
+    async def _worker(self, worker_id: str) -> None:
+        """Claim and run executions until stopped."""
+        while not self._stop_event.is_set():
+            try:
+                await self._requeue_stale()
+                execution_id = await self._claim_next(worker_id)
+            except Exception as e:
+                logger.error(f"Flow queue worker {worker_id} failed to claim: {str(e)}", exc_info=True)
+                execution_id = None
+
+            if execution_id is None:
+                self._wakeup.clear()
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), timeout=self._poll_interval)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+
+            self._running[execution_id] = worker_id
+            run = asyncio.create_task(self._flow_wrapper.run_execution(execution_id))
+            self._tasks[execution_id] = run
+            watcher = asyncio.create_task(self._watch(execution_id, worker_id, run))
+            try:
+                await asyncio.wait({run})
+                if run.cancelled():
+                    logger.info(f"Flow queue worker {worker_id} cancelled {execution_id}")
+                elif run.exception():
+                    logger.error(f"Flow queue worker {worker_id} failed running {execution_id}: {str(run.exception())}")
+            except asyncio.CancelledError:
+                run.cancel()
+                raise
+            finally:
+                watcher.cancel()
+                self._tasks.pop(execution_id, None)
+                self._running.pop(execution_id, None)
+                # A slot was freed, let other idle workers look again
+                self._wakeup.set()
+
+    def cancel(self, execution_id: UUID) -> bool:
+        """Cancel an execution running in this process.
+
+        Returns:
+            bool: True if the execution was running here and was cancelled
+        """
+        run = self._tasks.get(execution_id)
+        if run is None or run.done():
+            return False
+        run.cancel()
+        return True
+
+    async def _claim_next(self, worker_id: str) -> Optional[UUID]:
+        """Claim the oldest queued execution whose flow has spare capacity.
+
+        The candidate's flow is locked with a transaction-scoped advisory
+        lock before its RUNNING rows are counted, and the claim commits in
+        the same transaction. Workers claiming for one flow at the same time,
+        in any process, are serialized and never exceed its limit together.
+        """
+        async with get_session_maker()() as session:
+            async with session.begin():
+                running_counts = dict((await session.execute(running_counts_query())).all())
+                saturated = {
+                    flow_name for flow_name, count in running_counts.items()
+                    if count >= self.limit_for(flow_name)
+                }
+
+                while True:
+                    execution = (await session.execute(claim_candidate_query(saturated))).scalar_one_or_none()
+                    if not execution:
+                        return None
+                    await session.execute(flow_lock_statement(execution.flow_name))
+                    running = (await session.execute(running_count_query(execution.flow_name))).scalar_one()
+                    if running < self.limit_for(execution.flow_name):
+                        break
+                    # Another worker filled the flow after the counts were read
+                    saturated.add(execution.flow_name)
+
+                now = datetime.utcnow()
+                execution.status = FlowExecutionStatus.RUNNING
+                execution.started_at = now
+                execution.heartbeat_at = now
+                execution.worker_id = worker_id
+                logger.info(f"Worker {worker_id} claimed flow execution {execution.id} ({execution.flow_name})")
+                return execution.id
+
+    async def _watch(self, execution_id: UUID, worker_id: str, run: asyncio.Task) -> None:
+        """Heartbeat a running execution and cancel it once it is stopped or reassigned.
+
+        This is how cancellation reaches executions running in a different
+        process from the one that handled the stop request. A paused execution is
+        left running; the checkpointer stops it at the next step boundary, so the
+        step in progress is kept.
+        """
+        heartbeat_every = max(self._stale_after / 3, 1)
+        loop_time = asyncio.get_running_loop().time
+        last_heartbeat = loop_time()
+        while not run.done():
+            await asyncio.sleep(self._cancel_poll_interval)
+            try:
+                async with get_session_maker()() as session:
+                    if loop_time() - last_heartbeat >= heartbeat_every:
+                        stmt = (
+                            update(DBFlowExecution)
+                            .where(DBFlowExecution.id == execution_id)
+                            .values(heartbeat_at=datetime.utcnow())
+                            .returning(DBFlowExecution.status, DBFlowExecution.worker_id)
+                        )
+                        last_heartbeat = loop_time()
+                    else:
+                        stmt = select(DBFlowExecution.status, DBFlowExecution.worker_id).where(
+                            DBFlowExecution.id == execution_id
+                        )
+                    row = (await session.execute(stmt)).one_or_none()
+                    await session.commit()
+            except Exception as e:
+                logger.warning(f"Failed to check flow execution {execution_id}: {str(e)}")
+                continue
+
+            if row is None or row.status == FlowExecutionStatus.FAILED or row.worker_id != worker_id:
+                # Stopped executions are marked FAILED; a stale requeue or a new claim changes the worker
+                logger.info(f"Cancelling flow execution {execution_id}: {row.status.value if row else 'deleted'}")
+                run.cancel()
+                return
+
+    async def _requeue_stale(self) -> None:
+        """Put RUNNING executions whose worker stopped heartbeating back in the queue."""
+        now = datetime.utcnow()
+        if self._last_reaped and (now - self._last_reaped).total_seconds() < self._stale_after / 3:
+            return
+        self._last_reaped = now
+        async with get_session_maker()() as session:
+            result = await session.execute(stale_requeue_statement(now - timedelta(seconds=self._stale_after)))
+            await session.commit()
+            if result.rowcount:
+                logger.warning(f"Requeued {result.rowcount} stale flow executions")
+
+    async def get_stats(self) -> Dict[str, Dict[str, int]]:
+        """Get queued and running counts per flow name."""
+        async with get_session_maker()() as session:
+            stmt = (
+                select(DBFlowExecution.flow_name, DBFlowExecution.status, func.count())
+                .where(
+                    DBFlowExecution.status.in_([FlowExecutionStatus.PENDING, FlowExecutionStatus.RUNNING]),
+                    DBFlowExecution.queued_at.isnot(None),
+                )
+                .group_by(DBFlowExecution.flow_name, DBFlowExecution.status)
+            )
+            rows = (await session.execute(stmt)).all()
+
+        stats: Dict[str, Dict[str, int]] = {}
+        for flow_name, status, count in rows:
+            entry = stats.setdefault(flow_name, {"queued": 0, "running": 0, "limit": self.limit_for(flow_name)})
+            entry["queued" if status == FlowExecutionStatus.PENDING else "running"] = count
+        return stats
@@ -1,8 +1,12 @@
 import os
+import glob
 import hashlib
+import inspect
 import json
 import logging
 import asyncio
+import threading
+import time
 from typing import Any, Dict, Optional, Type, List, get_args
 from uuid import UUID, uuid4
 from datetime import datetime
@@ -11,16 +15,35 @@ from pydantic import BaseModel, UUID4
 
 from crewai.flow.flow import Flow
 from fastapi import HTTPException
-from sqlalchemy import select, insert
+from sqlalchemy import select, insert, update, func, inspect as sa_inspect
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from api.core.models import FlowExecution as DBFlowExecution, FlowExecutionStatus, FlowLog, LogLevel
-from api.core.database import async_session_maker
+from api.core.config import get_settings
+from api.core.database import get_session_maker
 from .db_logger import DatabaseLogger
+from .log_bridge import LogBridge, bind_log_bridge, unbind_log_bridge
+from .execution_queue import FlowExecutionQueue
+from .result_cache import ResultMemoryCache
+from .disk_cache import FlowResultDiskStore
+from .checkpoint import FlowCheckpointer, FlowInterrupted, to_jsonable
+from .metrics import FlowMetricsRecorder
+from .pagination import clamp_page_size, paginate_executions, split_page
 
 # Set up logging
 logger = logging.getLogger(__name__)
 
+# Statuses during which identical executions are deduplicated
+IN_FLIGHT_STATUSES = (FlowExecutionStatus.PENDING, FlowExecutionStatus.RUNNING)
+
+# Separates the request hash from the flow version in cache keys
+CACHE_VERSION_SEPARATOR = "-"
+
+# Rows per multi-row INSERT, keeps batches well under the bind parameter limit
+BATCH_INSERT_CHUNK = 1000
+
 class FlowStatus(str, Enum):
     PENDING = "pending"
     RUNNING = "running"
@@ -35,16 +58,55 @@ class FlowExecution(BaseModel):
     state: Optional[Dict[str, Any]] = None
     error: Optional[str] = None
     created_at: datetime
+    updated_at: Optional[datetime] = None
     started_at: Optional[datetime] = None
     completed_at: Optional[datetime] = None
     log_file: Optional[str] = None
     cache_key: Optional[str] = None
+    queued_at: Optional[datetime] = None
+    leader_id: Optional[UUID4] = None
+    batch_id: Optional[UUID4] = None
+    completed_steps: List[str] = []
+    metrics: Optional[Dict[str, Any]] = None
+
+class FlowExecutionPage(BaseModel):
+    items: List[FlowExecution]
+    next_cursor: Optional[str] = None
 
 class FlowExecutionCreate(BaseModel):
     flow_name: str
     initial_state: Optional[Dict[str, Any]] = None
     use_cache: bool = True
 
+class FlowBatchCreate(BaseModel):
+    flow_name: str
+    initial_states: List[Dict[str, Any]]
+    use_cache: bool = True
+
+class FlowBatchProgress(BaseModel):
+    batch_id: UUID4
+    total: int
+    counts: Dict[str, int]
+    finished: int
+    progress: float
+    done: bool
+
+    @classmethod
+    def from_counts(cls, batch_id: UUID4, counts: Dict[str, int]) -> "FlowBatchProgress":
+        total = sum(counts.values())
+        finished = counts.get(FlowStatus.COMPLETED.value, 0) + counts.get(FlowStatus.FAILED.value, 0)
+        return cls(
+            batch_id=batch_id,
+            total=total,
+            counts=counts,
+            finished=finished,
+            progress=finished / total if total else 1.0,
+            done=finished == total
+        )
+
+class FlowBatch(FlowBatchProgress):
+    execution_ids: List[UUID4]
+
 class FlowWrapper:
     """
     A wrapper class for managing CrewAI flow executions.
@@ -54,48 +116,211 @@ class FlowWrapper:
     def __init__(self, enable_caching: bool = True):
         """Initialize the flow wrapper."""
         self._flows: Dict[str, Type[Flow]] = {}
+        self._flow_versions: Dict[str, str] = {}
         self._project_root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(__file__))))
         self._cache_dir = os.path.join(self._project_root, "cache", "flows")
         self._enable_caching = enable_caching
-        self._cache: Dict[str, Any] = {}
+        settings = get_settings()
+        self._cache = ResultMemoryCache(
+            max_bytes=settings.flow_cache_memory_bytes,
+            ttl=settings.flow_cache_memory_ttl or None
+        )
+        self._queue: Optional[FlowExecutionQueue] = None
+        self._disk_cache = FlowResultDiskStore(self._cache_dir) if enable_caching else None
+        self._last_cache_gc: Optional[float] = None
+    
+    @staticmethod
+    def _to_flow_execution(db_execution: DBFlowExecution, summary: bool = False) -> FlowExecution:
+        """Convert a database row into the FlowExecution response model.
         
-        if enable_caching:
-            os.makedirs(self._cache_dir, exist_ok=True)
+        With summary=True only the columns loaded for list views are read, so
+        deferred columns are never lazy-loaded. ``updated_at`` is set by the
+        database on update and left out while it is expired.
+        """
+        execution = FlowExecution(
+            id=db_execution.id,
+            flow_name=db_execution.flow_name,
+            status=db_execution.status.value,
+            created_at=db_execution.created_at,
+            updated_at=sa_inspect(db_execution).dict.get("updated_at"),
+            started_at=db_execution.started_at,
+            completed_at=db_execution.completed_at,
+            cache_key=db_execution.cache_key,
+            queued_at=db_execution.queued_at,
+            leader_id=db_execution.leader_id,
+            batch_id=db_execution.batch_id
+        )
+        if not summary:
+            execution.state = db_execution.state
+            execution.error = db_execution.error
+            execution.log_file = db_execution.log_file
+            execution.completed_steps = list((db_execution.checkpoint or {}).get("completed", {}))
+            execution.metrics = db_execution.metrics
+        return execution
+    
+    @property
+    def queue(self) -> Optional[FlowExecutionQueue]:
+        """The in-process execution queue, if workers were started."""
+        return self._queue
+    
+    async def start_workers(self, worker_count: Optional[int] = None) -> FlowExecutionQueue:
+        """Start in-process queue workers for this wrapper's registered flows."""
+        if self._queue is None:
+            self._queue = FlowExecutionQueue(self, worker_count=worker_count)
+        await self._queue.start()
+        return self._queue
+    
+    async def stop_workers(self) -> None:
+        """Stop in-process queue workers."""
+        if self._queue is not None:
+            await self._queue.stop()
     
     def _generate_cache_key(self, flow_name: str, initial_state: Dict[str, Any]) -> str:
-        """Generate a cache key based on flow name and initial state."""
+        """Generate a cache key based on flow name, flow version and initial state.
+        
+        The key is ``<state hash>-<flow version>``: the hash prefix identifies the
+        request and picks the cache shard, the suffix changes whenever the flow's
+        config files or model change.
+        """
+        return f"{self._generate_state_hash(flow_name, initial_state)}{CACHE_VERSION_SEPARATOR}{self.get_flow_version(flow_name)}"
+    
+    def _generate_state_hash(self, flow_name: str, initial_state: Dict[str, Any]) -> str:
+        """Hash the flow name and initial state."""
         sorted_state = dict(sorted(initial_state.items())) if initial_state else {}
         state_str = json.dumps(sorted_state, sort_keys=True)
         hash_input = f"{flow_name}:{state_str}"
         return hashlib.sha256(hash_input.encode()).hexdigest()
     
+    @staticmethod
+    def _discover_config_paths(flow_class: Type[Flow]) -> List[str]:
+        """Find the flow's source file and the crew YAML configs that ship with it.
+        
+        Follows the CrewAI project layout: ``config/*.yaml`` next to the flow module
+        and ``crews/<crew>/config/*.yaml`` below it.
+        """
+        try:
+            module_file = inspect.getfile(flow_class)
+        except (TypeError, OSError):
+            return []
+        module_dir = os.path.dirname(module_file)
+        paths = [module_file]
+        patterns = [
+            os.path.join(module_dir, "config", "*.y*ml"),
+            os.path.join(module_dir, "crews", "**", "config", "*.y*ml"),
+        ]
+        for pattern in patterns:
+            paths.extend(glob.glob(pattern, recursive=True))
+        return sorted(set(paths))
+    
+    @staticmethod
+    def _fingerprint_flow(config_paths: List[str], model: str) -> str:
+        """Hash the contents of a flow's config files together with its model name."""
+        digest = hashlib.sha256(model.encode())
+        for path in sorted(config_paths):
+            digest.update(os.path.basename(path).encode())
+            try:
+                with open(path, 'rb') as f:
+                    digest.update(f.read())
+            except OSError as e:
+                logger.warning(f"Could not fingerprint flow config {path}: {str(e)}")
+        return digest.hexdigest()[:12]
+    
+    def get_flow_version(self, name: str) -> str:
+        """Get the config/model fingerprint of a registered flow."""
+        return self._flow_versions.get(name, "")
+    
     def _get_cache_path(self, cache_key: str) -> str:
         """Get the cache file path for a given cache key."""
-        return os.path.join(self._cache_dir, f"{cache_key}.json")
+        return self._disk_cache.path_for(cache_key)
     
     def _load_from_cache(self, cache_key: str) -> Optional[Dict[str, Any]]:
-        """Load cached flow results if they exist."""
-        cache_path = self._get_cache_path(cache_key)
-        if os.path.exists(cache_path):
-            try:
-                with open(cache_path, 'r', encoding='utf-8') as f:
-                    return json.load(f)
-            except Exception as e:
-                print(f"Warning: Failed to load cache: {str(e)}")
-        return None
+        """Load cached flow results if they exist, checking memory before disk."""
+        if (cached := self._cache.get(cache_key)) is not None:
+            return cached
+        if self._disk_cache is None:
+            return None
+        try:
+            loaded = self._disk_cache.load(cache_key)
+        except Exception as e:
+            print(f"Warning: Failed to load cache: {str(e)}")
+            return None
+        if loaded is None:
+            # Drop entries cached under an older version of this flow
+            self._evict_stale_versions(cache_key)
+            return None
+        data, size = loaded
+        self._cache.set(cache_key, data, size=size)
+        return data
     
     def _save_to_cache(self, cache_key: str, data: Dict[str, Any]) -> None:
         """Save flow results to cache."""
-        cache_path = self._get_cache_path(cache_key)
+        if self._disk_cache is None:
+            return
         try:
-            with open(cache_path, 'w', encoding='utf-8') as f:
-                json.dump(data, f, indent=2, ensure_ascii=False)
+            size = self._disk_cache.save(cache_key, data)
+            self._cache.set(cache_key, data, size=size)
         except Exception as e:
             print(f"Warning: Failed to save to cache: {str(e)}")
+        self._maybe_collect_cache_garbage()
+    
+    def _evict_stale_versions(self, cache_key: str) -> None:
+        """Remove cache entries for the same request made under other flow versions."""
+        state_hash, separator, _ = cache_key.partition(CACHE_VERSION_SEPARATOR)
+        if not separator:
+            return
+        try:
+            removed = self._disk_cache.evict_variants(cache_key, state_hash)
+            if removed:
+                logger.info(f"Evicted {removed} stale cache entries for key: {cache_key}")
+        except Exception as e:
+            logger.warning(f"Failed to evict stale cache entries: {str(e)}")
+    
+    def collect_cache_garbage(self) -> Dict[str, int]:
+        """Prune the on-disk cache by age and total size."""
+        if self._disk_cache is None:
+            return {}
+        settings = get_settings()
+        return self._disk_cache.gc(
+            max_bytes=settings.flow_cache_disk_max_bytes or None,
+            max_age=settings.flow_cache_disk_max_age or None
+        )
+    
+    def _maybe_collect_cache_garbage(self) -> None:
+        """Run cache GC in a background thread at most once per GC interval."""
+        interval = get_settings().flow_cache_gc_interval
+        now = time.monotonic()
+        if self._last_cache_gc is not None and now - self._last_cache_gc < interval:
+            return
+        self._last_cache_gc = now
+        threading.Thread(target=self.collect_cache_garbage, name="flow-cache-gc", daemon=True).start()
+    
+    @property
+    def cache_stats(self) -> Dict[str, int]:
+        """Hit/miss and size counters of the in-memory cache tier."""
+        return self._cache.stats
     
-    def register_flow(self, name: str, flow_class: Type[Flow]) -> None:
-        """Register a flow class with a given name."""
+    def register_flow(
+        self,
+        name: str,
+        flow_class: Type[Flow],
+        config_paths: Optional[List[str]] = None,
+        model: Optional[str] = None
+    ) -> None:
+        """Register a flow class with a given name.
+        
+        Args:
+            name: Name the flow is executed under
+            flow_class: The CrewAI flow class
+            config_paths: Prompt/config files that affect the flow's output; discovered
+                from the flow's package when omitted
+            model: LLM model the flow runs on; defaults to the CrewAI model environment variables
+        """
         self._flows[name] = flow_class
+        if config_paths is None:
+            config_paths = self._discover_config_paths(flow_class)
+        model = model or os.getenv("OPENAI_MODEL_NAME") or os.getenv("MODEL") or ""
+        self._flow_versions[name] = self._fingerprint_flow(config_paths, model)
+        logger.info(f"Registered flow '{name}' version {self._flow_versions[name]}")
     
     def get_flow_class(self, name: str) -> Type[Flow]:
         """Get a flow class by name."""
@@ -105,7 +330,7 @@ class FlowWrapper:
     
     async def get_execution(self, execution_id: UUID4, user_id: UUID4) -> FlowExecution:
         """Get flow execution status and details."""
-        async with async_session_maker() as session:
+        async with get_session_maker()() as session:
             stmt = select(DBFlowExecution).where(
                 DBFlowExecution.id == execution_id,
                 DBFlowExecution.user_id == user_id
@@ -116,18 +341,7 @@ class FlowWrapper:
             if not db_execution:
                 raise HTTPException(status_code=404, detail="Flow execution not found")
             
-            return FlowExecution(
-                id=db_execution.id,
-                flow_name=db_execution.flow_name,
-                status=db_execution.status.value,
-                state=db_execution.state,
-                error=db_execution.error,
-                created_at=db_execution.created_at,
-                started_at=db_execution.started_at,
-                completed_at=db_execution.completed_at,
-                log_file=db_execution.log_file,
-                cache_key=db_execution.cache_key
-            )
+            return self._to_flow_execution(db_execution)
     
     async def create_execution(self, flow_create: FlowExecutionCreate, user_id: UUID4) -> FlowExecution:
         """Create a new flow execution."""
@@ -167,30 +381,213 @@ class FlowWrapper:
                 user_id=user_id
             )
         
-        async with async_session_maker() as session:
+        async with get_session_maker()() as session:
+            if db_execution.status == FlowExecutionStatus.PENDING and cache_key:
+                db_execution = await self._add_single_flight(session, db_execution)
+            else:
+                session.add(db_execution)
+                await session.commit()
+            await session.refresh(db_execution)
+        
+        return self._to_flow_execution(db_execution)
+    
+    async def create_batch(self, batch_create: FlowBatchCreate, user_id: UUID4) -> FlowBatch:
+        """Create and queue one execution per initial state in a handful of statements.
+        
+        Cache hits are stored as COMPLETED rows, identical states share one leader
+        and states already in flight attach to the existing leader, following the
+        same single-flight rules as create_execution. The whole batch is inserted
+        in one transaction with multi-row INSERTs and the queue is notified once.
+        """
+        self.get_flow_class(batch_create.flow_name)
+        max_size = get_settings().flow_batch_max_size
+        if not batch_create.initial_states:
+            raise HTTPException(status_code=400, detail="Batch must contain at least one initial state")
+        if len(batch_create.initial_states) > max_size:
+            raise HTTPException(status_code=400, detail=f"Batch exceeds the maximum of {max_size} executions")
+        
+        batch_id = uuid4()
+        now = datetime.utcnow()
+        use_cache = self._enable_caching and batch_create.use_cache
+        rows: List[Dict[str, Any]] = []
+        # cache key -> id of the row that will run it
+        leaders: Dict[str, UUID] = {}
+        
+        for initial_state in batch_create.initial_states:
+            row = {
+                "id": uuid4(),
+                "flow_name": batch_create.flow_name,
+                "status": FlowExecutionStatus.PENDING,
+                "state": initial_state,
+                "cache_key": None,
+                "user_id": user_id,
+                "batch_id": batch_id,
+                "queued_at": now,
+                "started_at": None,
+                "completed_at": None,
+                "leader_id": None,
+            }
+            if use_cache:
+                cache_key = self._generate_cache_key(batch_create.flow_name, initial_state)
+                row["cache_key"] = cache_key
+                if cache_key in leaders:
+                    row.update(leader_id=leaders[cache_key], queued_at=None)
+                elif cached_data := self._load_from_cache(cache_key):
+                    row.update(
+                        status=FlowExecutionStatus.COMPLETED,
+                        state=cached_data.get("state_dict"),
+                        queued_at=None,
+                        started_at=now,
+                        completed_at=now
+                    )
+                else:
+                    leaders[cache_key] = row["id"]
+            rows.append(row)
+        
+        async with get_session_maker()() as session:
+            # Attach to identical executions that are already in flight
+            in_flight = await self._find_in_flight_many(session, list(leaders))
+            self._attach_rows(rows, leaders, in_flight)
+            
+            followers = [row for row in rows if row["leader_id"] is not None]
+            others = [row for row in rows if row["leader_id"] is None]
+            inserted = set()
+            for start in range(0, len(others), BATCH_INSERT_CHUNK):
+                result = await session.execute(
+                    pg_insert(DBFlowExecution)
+                    .values(others[start:start + BATCH_INSERT_CHUNK])
+                    .on_conflict_do_nothing()
+                    .returning(DBFlowExecution.id)
+                )
+                inserted.update(result.scalars().all())
+            
+            # Leaders that lost the in-flight unique index to a concurrent request
+            lost = {row["cache_key"]: row["id"] for row in others if row["id"] not in inserted}
+            if lost:
+                in_flight = await self._find_in_flight_many(session, list(lost))
+                if len(in_flight) < len(lost):
+                    await session.rollback()
+                    raise HTTPException(status_code=409, detail="Could not register flow batch, please retry")
+                self._attach_rows(rows, lost, in_flight)
+                followers = [row for row in rows if row["leader_id"] is not None]
+            
+            for start in range(0, len(followers), BATCH_INSERT_CHUNK):
+                await session.execute(insert(DBFlowExecution).values(followers[start:start + BATCH_INSERT_CHUNK]))
+            await session.commit()
+        
+        logger.info(f"Created flow batch {batch_id} with {len(rows)} executions ({len(followers)} attached)")
+        if self._queue is not None:
+            self._queue.notify()
+        
+        counts: Dict[str, int] = {}
+        for row in rows:
+            counts[row["status"].value] = counts.get(row["status"].value, 0) + 1
+        progress = FlowBatchProgress.from_counts(batch_id, counts)
+        return FlowBatch(**progress.model_dump(), execution_ids=[row["id"] for row in rows])
+    
+    @staticmethod
+    def _attach_rows(rows: List[Dict[str, Any]], leaders: Dict[str, UUID], in_flight: Dict[str, UUID]) -> None:
+        """Point batch rows whose planned leader is superseded by an in-flight execution at it."""
+        superseded = {leaders[key]: leader_id for key, leader_id in in_flight.items() if key in leaders}
+        for row in rows:
+            if row["id"] in superseded:
+                row.update(leader_id=superseded[row["id"]], queued_at=None)
+            elif row["leader_id"] in superseded:
+                row["leader_id"] = superseded[row["leader_id"]]
+    
+    async def _find_in_flight_many(self, session: AsyncSession, cache_keys: List[str]) -> Dict[str, UUID]:
+        """Find the PENDING or RUNNING leader execution of each cache key in one query."""
+        if not cache_keys:
+            return {}
+        result = await session.execute(
+            select(DBFlowExecution.cache_key, DBFlowExecution.id).where(
+                DBFlowExecution.cache_key.in_(cache_keys),
+                DBFlowExecution.status.in_(IN_FLIGHT_STATUSES),
+                DBFlowExecution.leader_id.is_(None)
+            )
+        )
+        return {cache_key: execution_id for cache_key, execution_id in result.all()}
+    
+    async def get_batch(self, batch_id: UUID4, user_id: UUID4) -> FlowBatchProgress:
+        """Get aggregate progress of a batch as execution counts per status."""
+        async with get_session_maker()() as session:
+            result = await session.execute(
+                select(DBFlowExecution.status, func.count())
+                .where(DBFlowExecution.batch_id == batch_id, DBFlowExecution.user_id == user_id)
+                .group_by(DBFlowExecution.status)
+            )
+            counts = {status.value: count for status, count in result.all()}
+        
+        if not counts:
+            raise HTTPException(status_code=404, detail="Flow batch not found")
+        return FlowBatchProgress.from_counts(batch_id, counts)
+    
+    async def _find_in_flight(self, session: AsyncSession, cache_key: str) -> Optional[DBFlowExecution]:
+        """Find the PENDING or RUNNING leader execution for a cache key."""
+        stmt = select(DBFlowExecution).where(
+            DBFlowExecution.cache_key == cache_key,
+            DBFlowExecution.status.in_(IN_FLIGHT_STATUSES),
+            DBFlowExecution.leader_id.is_(None)
+        )
+        result = await session.execute(stmt)
+        return result.scalar_one_or_none()
+    
+    async def _add_single_flight(self, session: AsyncSession, db_execution: DBFlowExecution) -> DBFlowExecution:
+        """Insert a PENDING execution unless an identical one is already in flight.
+        
+        At most one leader per cache key can be PENDING or RUNNING; the unique partial
+        index on ``cache_key`` enforces this across processes. A request for the same
+        user shares the leader's row, other users get a follower row that is completed
+        with the leader's result.
+        """
+        for _ in range(3):
+            leader = await self._find_in_flight(session, db_execution.cache_key)
+            if leader is None:
+                session.add(db_execution)
+                try:
+                    await session.commit()
+                    return db_execution
+                except IntegrityError:
+                    # Another process inserted the leader first, attach to it instead
+                    await session.rollback()
+                    continue
+            
+            if leader.user_id == db_execution.user_id:
+                logger.info(f"Sharing in-flight execution {leader.id} for key: {db_execution.cache_key}")
+                return leader
+            
+            logger.info(f"Attaching execution {db_execution.id} to in-flight execution {leader.id}")
+            db_execution.leader_id = leader.id
             session.add(db_execution)
             await session.commit()
-            await session.refresh(db_execution)
+            return db_execution
         
-        return FlowExecution(
-            id=db_execution.id,
-            flow_name=db_execution.flow_name,
-            status=db_execution.status.value,
-            state=db_execution.state,
-            error=db_execution.error,
-            created_at=db_execution.created_at,
-            started_at=db_execution.started_at,
-            completed_at=db_execution.completed_at,
-            log_file=db_execution.log_file,
-            cache_key=db_execution.cache_key
+        raise HTTPException(status_code=409, detail="Could not register flow execution, please retry")
+    
+    async def _complete_followers(self, session: AsyncSession, execution: DBFlowExecution) -> None:
+        """Copy a finished leader's outcome onto the executions attached to it."""
+        await session.execute(
+            update(DBFlowExecution)
+            .where(
+                DBFlowExecution.leader_id == execution.id,
+                DBFlowExecution.status.in_(IN_FLIGHT_STATUSES)
+            )
+            .values(
+                status=execution.status,
+                state=execution.state,
+                error=execution.error,
+                started_at=execution.started_at,
+                completed_at=execution.completed_at
+            )
         )
+        await session.commit()
     
-    async def start_execution(self, execution_id: UUID4, user_id: UUID4) -> None:
-        """Start a flow execution."""
+    async def start_execution(self, execution_id: UUID4, user_id: UUID4) -> FlowExecution:
+        """Queue a flow execution for the workers to run."""
         logger.info(f"Starting flow execution: {execution_id}")
         
         try:
-            async with async_session_maker() as session:
+            async with get_session_maker()() as session:
                 # Get execution
                 stmt = select(DBFlowExecution).where(
                     DBFlowExecution.id == execution_id,
@@ -202,6 +599,10 @@ class FlowWrapper:
                 if not execution:
                     raise HTTPException(status_code=404, detail="Flow execution not found")
                     
+                # Shared and attached executions are already started by their leader
+                if execution.status == FlowExecutionStatus.RUNNING or execution.leader_id:
+                    return self._to_flow_execution(execution)
+                    
                 # Check if execution is in correct state
                 if execution.status != FlowExecutionStatus.PENDING:
                     logger.error(f"Flow execution {execution_id} is not in pending state: {execution.status}")
@@ -214,80 +615,189 @@ class FlowWrapper:
                             execution.status = FlowExecutionStatus.COMPLETED
                             execution.completed_at = datetime.utcnow()
                             await session.commit()
-                            return
+                            return self._to_flow_execution(execution)
                     raise HTTPException(status_code=400, detail=f"Flow execution is not in pending state: {execution.status}")
                 
-                # Update status to running
-                execution.status = FlowExecutionStatus.RUNNING
-                execution.started_at = datetime.utcnow()
-                await session.commit()
+                # Hand the execution to the queue; a worker moves it to RUNNING
+                if execution.queued_at is None:
+                    execution.queued_at = datetime.utcnow()
+                    await session.commit()
                 
-                try:
-                    # Get flow class
-                    flow_class = self.get_flow_class(execution.flow_name)
-                    if not flow_class:
-                        raise ValueError(f"Flow {execution.flow_name} not found")
-                        
-                    # Initialize flow with state
-                    flow = flow_class(state=execution.state)
-                    
-                    # Run flow
-                    await flow.run()
+            if self._queue is not None:
+                self._queue.notify()
+            return self._to_flow_execution(execution)
                     
-                    # Update status to completed
-                    execution.status = FlowExecutionStatus.COMPLETED
-                    execution.completed_at = datetime.utcnow()
-                    await session.commit()
+        except HTTPException:
+            raise
+        except Exception as e:
+            logger.error(f"Error starting flow execution {execution_id}: {str(e)}", exc_info=True)
+            raise HTTPException(status_code=500, detail=str(e))
+    
+    async def run_execution(self, execution_id: UUID4) -> None:
+        """Run a flow execution that a queue worker has already claimed.
+        
+        Steps completed by an earlier, paused or failed run are replayed from the
+        execution's checkpoint instead of being executed again.
+        """
+        async with get_session_maker()() as session:
+            execution = await session.get(DBFlowExecution, execution_id)
+            if not execution:
+                logger.warning(f"Claimed flow execution {execution_id} no longer exists")
+                return
+            
+            checkpointer = FlowCheckpointer(execution.id, execution.checkpoint)
+            recorder = FlowMetricsRecorder(execution.metrics)
+            recorder.start_run(execution.queued_at, execution.started_at)
+            db_logger = DatabaseLogger(f"flow.{execution.flow_name}", execution.id)
+            recorder.track_logs(lambda: db_logger.stats)
+            try:
+                # Get flow class
+                flow_class = self.get_flow_class(execution.flow_name)
+                if not flow_class:
+                    raise ValueError(f"Flow {execution.flow_name} not found")
                     
+                # Initialize flow with state, restoring completed steps
+                flow = flow_class(state=execution.state)
+                # Attached first so replayed steps are not timed
+                recorder.attach(flow)
+                checkpointer.attach(flow)
+                
+                # Run flow, copying crew logging and verbose output into the flow log
+                await db_logger.start_worker()
+                log_bridge = LogBridge(db_logger)
+                bridge_token = bind_log_bridge(log_bridge)
+                try:
+                    resumed = " from checkpoint" if checkpointer.resumed else ""
+                    await db_logger.ainfo(f"Running flow {execution.flow_name}{resumed}")
+                    output = await flow.kickoff_async()
+                    if checkpointer.interrupted:
+                        raise FlowInterrupted(checkpointer.interrupted)
+                    if checkpointer.error:
+                        raise checkpointer.error
+                    await db_logger.ainfo("Flow execution completed")
+                except FlowInterrupted as e:
+                    await db_logger.ainfo(f"Flow execution interrupted: {e.status.value}")
+                    raise
                 except Exception as e:
-                    logger.error(f"Error running flow execution {execution_id}: {str(e)}", exc_info=True)
-                    execution.status = FlowExecutionStatus.FAILED
-                    execution.error = str(e)
-                    execution.completed_at = datetime.utcnow()
-                    await session.commit()
+                    await db_logger.aerror(f"Flow execution failed: {str(e)}")
                     raise
-                    
+                finally:
+                    unbind_log_bridge(bridge_token)
+                    log_bridge.flush()
+                    # Writes every queued line before the run's metrics are saved
+                    await db_logger.stop_worker()
+                
+                # Update status to completed
+                await session.refresh(execution)
+                state_dict = to_jsonable(flow.state)
+                execution.state = state_dict
+                execution.checkpoint = None
+                execution.metrics = recorder.to_dict()
+                execution.status = FlowExecutionStatus.COMPLETED
+                execution.completed_at = datetime.utcnow()
+                await session.commit()
+                
+                if self._enable_caching and execution.cache_key:
+                    self._save_to_cache(execution.cache_key, {
+                        "raw_output": str(output),
+                        "raw_state": str(flow.state),
+                        "state_dict": state_dict,
+                        "created_at": datetime.utcnow().isoformat()
+                    })
+                
+            except FlowInterrupted as e:
+                # Status was already set by whoever interrupted the run; release the row
+                logger.info(f"Flow execution {execution_id} stopped between steps: {e.status.value}")
+                await self._save_metrics(session, execution.id, recorder)
+                await self._release(session, execution)
+                return
+            
+            except asyncio.CancelledError:
+                logger.info(f"Flow execution {execution_id} cancelled")
+                await self._save_metrics(session, execution.id, recorder)
+                await self._release(session, execution)
+                raise
+                
+            except Exception as e:
+                logger.error(f"Error running flow execution {execution_id}: {str(e)}", exc_info=True)
+                await session.refresh(execution)
+                execution.status = FlowExecutionStatus.FAILED
+                execution.error = str(e)
+                execution.metrics = recorder.to_dict()
+                execution.worker_id = None
+                execution.completed_at = datetime.utcnow()
+                await session.commit()
+            
+            await self._complete_followers(session, execution)
+    
+    async def _save_metrics(self, session: AsyncSession, execution_id: UUID4, recorder: FlowMetricsRecorder) -> None:
+        """Persist the metrics of an interrupted run."""
+        try:
+            await session.execute(
+                update(DBFlowExecution)
+                .where(DBFlowExecution.id == execution_id)
+                .values(metrics=recorder.to_dict())
+            )
+            await session.commit()
         except Exception as e:
-            logger.error(f"Error starting flow execution {execution_id}: {str(e)}", exc_info=True)
-            raise HTTPException(status_code=500, detail=str(e))
+            await session.rollback()
+            logger.warning(f"Failed to save metrics of flow execution {execution_id}: {str(e)}")
+    
+    async def _release(self, session: AsyncSession, execution: DBFlowExecution) -> None:
+        """Detach an interrupted execution from its worker so it can be resumed."""
+        try:
+            await session.refresh(execution)
+            if execution.status == FlowExecutionStatus.RUNNING:
+                # Cancelled without a stop request, e.g. the worker is shutting down
+                execution.status = FlowExecutionStatus.PENDING
+            execution.worker_id = None
+            await session.commit()
+        except Exception as e:
+            logger.warning(f"Failed to release flow execution {execution.id}: {str(e)}")
     
     async def list_executions(self, 
                             status: Optional[FlowStatus] = None,
                             flow_name: Optional[str] = None,
-                            user_id: Optional[UUID4] = None) -> list[FlowExecution]:
-        """List flow executions with optional filtering."""
-        async with async_session_maker() as session:
-            stmt = select(DBFlowExecution)
-            if status:
-                stmt = stmt.where(DBFlowExecution.status == status)
-            if flow_name:
-                stmt = stmt.where(DBFlowExecution.flow_name == flow_name)
-            if user_id:
-                stmt = stmt.where(DBFlowExecution.user_id == user_id)
-            result = await session.execute(stmt)
-            db_executions = result.scalars().all()
+                            user_id: Optional[UUID4] = None,
+                            limit: Optional[int] = None,
+                            cursor: Optional[str] = None,
+                            summary: bool = True) -> FlowExecutionPage:
+        """List flow executions newest first, one keyset page at a time.
         
-        executions = []
-        for db_execution in db_executions:
-            execution = FlowExecution(
-                id=db_execution.id,
-                flow_name=db_execution.flow_name,
-                status=db_execution.status.value,
-                state=db_execution.state,
-                error=db_execution.error,
-                created_at=db_execution.created_at,
-                started_at=db_execution.started_at,
-                completed_at=db_execution.completed_at,
-                log_file=db_execution.log_file,
-                cache_key=db_execution.cache_key
-            )
-            executions.append(execution)
+        Args:
+            status: Only return executions in this status
+            flow_name: Only return executions of this flow
+            user_id: Only return executions owned by this user
+            limit: Page size
+            cursor: ``next_cursor`` of the previous page
+            summary: Skip loading state, error and checkpoint columns
+        """
+        limit = clamp_page_size(limit)
+        stmt = select(DBFlowExecution)
+        if status:
+            stmt = stmt.where(DBFlowExecution.status == FlowExecutionStatus(status))
+        if flow_name:
+            stmt = stmt.where(DBFlowExecution.flow_name == flow_name)
+        if user_id:
+            stmt = stmt.where(DBFlowExecution.user_id == user_id)
+        try:
+            stmt = paginate_executions(stmt, limit, cursor=cursor, summary=summary)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+
+        async with get_session_maker()() as session:
+            result = await session.execute(stmt)
+            db_executions, next_cursor = split_page(result.scalars().all(), limit)
+            items = [
+                self._to_flow_execution(db_execution, summary=summary)
+                for db_execution in db_executions
+            ]
         
-        return executions
+        return FlowExecutionPage(items=items, next_cursor=next_cursor)
     
     async def delete_execution(self, execution_id: UUID4, user_id: UUID4) -> None:
         """Delete a flow execution."""
-        async with async_session_maker() as session:
+        async with get_session_maker()() as session:
             stmt = select(DBFlowExecution).where(
                 DBFlowExecution.id == execution_id,
                 DBFlowExecution.user_id == user_id
@@ -295,58 +805,133 @@ class FlowWrapper:
             result = await session.execute(stmt)
             db_execution = result.scalar_one_or_none()
             if db_execution:
+                # Executions attached to this one would otherwise wait forever
+                await session.execute(
+                    update(DBFlowExecution)
+                    .where(
+                        DBFlowExecution.leader_id == db_execution.id,
+                        DBFlowExecution.status.in_(IN_FLIGHT_STATUSES)
+                    )
+                    .values(
+                        status=FlowExecutionStatus.FAILED,
+                        error="Shared flow execution was deleted",
+                        completed_at=datetime.utcnow()
+                    )
+                )
                 await session.delete(db_execution)
                 await session.commit()
             
     async def stop_execution(self, execution_id: UUID4, user_id: UUID4) -> FlowExecution:
-        """Stop a running flow execution."""
-        execution = await self.get_execution(execution_id, user_id)
+        """Stop a queued, running or paused flow execution.
+        
+        The row is marked FAILED right away, which frees its concurrency slot. The
+        worker running it cancels the flow immediately when it is in this process,
+        otherwise within ``flow_cancel_poll_interval`` seconds.
+        """
+        async with get_session_maker()() as session:
+            execution = await self._get_owned_execution(session, execution_id, user_id)
+            if execution.status not in (*IN_FLIGHT_STATUSES, FlowExecutionStatus.PAUSED):
+                raise HTTPException(status_code=400, detail="Flow execution is not running")
+                
+            execution.status = FlowExecutionStatus.FAILED
+            execution.error = "Flow execution stopped by user"
+            execution.completed_at = datetime.utcnow()
+            await session.commit()
+            if not execution.leader_id:
+                await self._complete_followers(session, execution)
+        
+        if self._queue is not None:
+            self._queue.cancel(execution.id)
+        return self._to_flow_execution(execution)
+        
+    async def _get_owned_execution(self, session: AsyncSession, execution_id: UUID4, user_id: UUID4) -> DBFlowExecution:
+        """Load an execution row owned by the user or raise 404."""
+        stmt = select(DBFlowExecution).where(
+            DBFlowExecution.id == execution_id,
+            DBFlowExecution.user_id == user_id
+        )
+        result = await session.execute(stmt)
+        execution = result.scalar_one_or_none()
         if not execution:
             raise HTTPException(status_code=404, detail="Flow execution not found")
-            
-        if execution.status != FlowStatus.RUNNING:
-            raise HTTPException(status_code=400, detail="Flow execution is not running")
-            
-        execution.status = FlowStatus.FAILED
-        execution.error = "Flow execution stopped by user"
-        execution.completed_at = datetime.utcnow()
-        async with async_session_maker() as session:
-            session.merge(execution)
-            await session.commit()
         return execution
+    
+    async def _requeue(self, session: AsyncSession, execution: DBFlowExecution) -> FlowExecution:
+        """Put an execution back in the queue; it resumes from its checkpoint.
+
+        If an identical execution was started while this one was paused or failed,
+        the unique in-flight index rejects a second leader and this execution is
+        attached to the one in flight instead.
+        """
+        cache_key = execution.cache_key
+        execution.status = FlowExecutionStatus.PENDING
+        execution.error = None
+        execution.completed_at = None
+        execution.queued_at = datetime.utcnow()
+        try:
+            await session.commit()
+        except IntegrityError:
+            await session.rollback()
+            await session.refresh(execution)
+            leader = await self._find_in_flight(session, cache_key)
+            if leader is None:
+                # The other leader finished between the insert and the lookup
+                raise HTTPException(status_code=409, detail="Could not requeue flow execution, please retry")
+
+            logger.info(f"Attaching execution {execution.id} to in-flight execution {leader.id}")
+            execution.leader_id = leader.id
+            execution.status = FlowExecutionStatus.PENDING
+            execution.error = None
+            execution.completed_at = None
+            execution.queued_at = None
+            await session.commit()
+            return self._to_flow_execution(execution)
+
+        if self._queue is not None:
+            self._queue.notify()
+        return self._to_flow_execution(execution)
         
     async def pause_execution(self, execution_id: UUID4, user_id: UUID4) -> FlowExecution:
-        """Pause a running flow execution."""
-        execution = await self.get_execution(execution_id, user_id)
-        if not execution:
-            raise HTTPException(status_code=404, detail="Flow execution not found")
-            
-        if execution.status != FlowStatus.RUNNING:
-            raise HTTPException(status_code=400, detail="Flow execution is not running")
-            
-        execution.status = FlowStatus.PAUSED
-        async with async_session_maker() as session:
-            session.merge(execution)
+        """Pause a queued or running flow execution.
+        
+        A running flow stops before its next step; completed steps stay checkpointed.
+        """
+        async with get_session_maker()() as session:
+            execution = await self._get_owned_execution(session, execution_id, user_id)
+            if execution.status not in IN_FLIGHT_STATUSES or execution.leader_id:
+                raise HTTPException(status_code=400, detail="Flow execution is not running")
+                
+            execution.status = FlowExecutionStatus.PAUSED
             await session.commit()
-        return execution
+            return self._to_flow_execution(execution)
         
     async def resume_execution(self, execution_id: UUID4, user_id: UUID4) -> FlowExecution:
-        """Resume a paused flow execution."""
-        execution = await self.get_execution(execution_id, user_id)
-        if not execution:
-            raise HTTPException(status_code=404, detail="Flow execution not found")
-            
-        if execution.status != FlowStatus.PAUSED:
-            raise HTTPException(status_code=400, detail="Flow execution is not paused")
-            
-        execution.status = FlowStatus.RUNNING
-        async with async_session_maker() as session:
-            session.merge(execution)
-            await session.commit()
-        return execution
+        """Resume a paused flow execution from its last completed step."""
+        async with get_session_maker()() as session:
+            execution = await self._get_owned_execution(session, execution_id, user_id)
+            if execution.status != FlowExecutionStatus.PAUSED:
+                raise HTTPException(status_code=400, detail="Flow execution is not paused")
+            if execution.worker_id:
+                # The worker has not reached the next step boundary yet
+                raise HTTPException(status_code=409, detail="Flow execution is still pausing, please retry")
+                
+            return await self._requeue(session, execution)
+    
+    async def retry_execution(self, execution_id: UUID4, user_id: UUID4) -> FlowExecution:
+        """Retry a failed flow execution from its last completed step."""
+        async with get_session_maker()() as session:
+            execution = await self._get_owned_execution(session, execution_id, user_id)
+            if execution.status != FlowExecutionStatus.FAILED or execution.leader_id:
+                raise HTTPException(status_code=400, detail="Flow execution has not failed")
+                
+            return await self._requeue(session, execution)
         
     async def get_execution_metrics(self, execution_id: UUID4, user_id: UUID4) -> Dict[str, Any]:
-        """Get metrics for a flow execution."""
+        """Get metrics for a flow execution.
+        
+        Besides wall-clock duration this returns the queue wait of every run and,
+        per step, its timing, LLM call count, token usage and retries.
+        """
         execution = await self.get_execution(execution_id, user_id)
         if not execution:
             raise HTTPException(status_code=404, detail="Flow execution not found")
@@ -355,12 +940,36 @@ class FlowWrapper:
         duration = None
         if execution.completed_at and execution.created_at:
             duration = (execution.completed_at - execution.created_at).total_seconds()
-            
+        
+        metrics = execution.metrics or {}
+        runs = metrics.get("runs", [])
         return {
             "status": execution.status,
             "created_at": execution.created_at,
             "completed_at": execution.completed_at,
             "duration_seconds": duration,
             "error": execution.error,
-            "cache_hit": bool(execution.cache_key and os.path.exists(self._get_cache_path(execution.cache_key)))
+            # Completed at creation from the result cache, without ever being run
+            "cache_hit": bool(
+                execution.status == FlowStatus.COMPLETED
+                and execution.cache_key
+                and execution.leader_id is None
+                and not runs
+            ),
+            "queue_wait_seconds": metrics.get("totals", {}).get("queue_wait_seconds"),
+            "runs": runs,
+            "steps": metrics.get("steps", []),
+            "totals": metrics.get("totals", {}),
+            # Log lines dropped, coalesced or sampled out under log backpressure
+            "logging": metrics.get("logging", {})
         }
+
+_flow_wrapper: Optional[FlowWrapper] = None
+
+
+def get_flow_wrapper() -> FlowWrapper:
+    """Get or create the process-wide flow wrapper that flows are registered on."""
+    global _flow_wrapper
+    if _flow_wrapper is None:
+        _flow_wrapper = FlowWrapper()
+    return _flow_wrapper
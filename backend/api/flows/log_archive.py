@@ -0,0 +1,263 @@
+"""Archival of cold flow logs.
+
+Once an execution has been COMPLETED or FAILED for
+``flow_log_archive_after_days`` its lines are rarely read again. The archiver
+rolls them up into one gzipped NDJSON blob per execution in
+``flow_log_archives`` and deletes the rows from ``flow_logs``, which keeps the
+hot table and its index small. Rows found by a later run are appended to the
+blob as another gzip member; gzip readers treat the members as one stream. Readers merge archived and live lines, so
+archival is invisible to log clients.
+
+Archives follow the same ``flow_log_retention_days`` as the partitions of
+``flow_logs``: a blob is deleted once its newest line is past retention.
+"""
+
+import asyncio
+import gzip
+import io
+import json
+import logging
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, Iterable, Iterator, Optional, Set, Tuple
+from uuid import UUID
+
+from sqlalchemy import Delete, delete, exists, func, select, tuple_
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from api.core.config import get_settings
+from api.core.database import get_session_maker
+from api.core.models import FlowExecution as DBFlowExecution, FlowExecutionStatus, FlowLog, FlowLogArchive
+from .pagination import encode_cursor
+
+logger = logging.getLogger(__name__)
+
+ARCHIVABLE_STATUSES = (FlowExecutionStatus.COMPLETED, FlowExecutionStatus.FAILED)
+# Log rows fetched per round trip while archiving
+ARCHIVE_FETCH_SIZE = 1000
+
+
+def archived_line(log: FlowLog) -> Dict[str, Any]:
+    """The archived form of a log row: what the log API returns for it."""
+    return {**log.to_dict(), "cursor": encode_cursor(log.timestamp, log.id)}
+
+
+def compress_logs(lines: Iterable[Dict[str, Any]]) -> Tuple[bytes, int, int]:
+    """Gzip log lines as NDJSON.
+
+    Returns:
+        Tuple[bytes, int, int]: The blob, the number of lines and the uncompressed size
+    """
+    buffer = io.BytesIO()
+    count = 0
+    size = 0
+    with gzip.GzipFile(fileobj=buffer, mode="wb") as archive:
+        for line in lines:
+            size += archive.write(_encode_line(line))
+            count += 1
+    return buffer.getvalue(), count, size
+
+
+def _encode_line(line: Dict[str, Any]) -> bytes:
+    return (json.dumps(line, default=str) + "\n").encode("utf-8")
+
+
+def iter_archived_logs(data: bytes) -> Iterator[Dict[str, Any]]:
+    """Decompress an archive blob one line at a time."""
+    with gzip.GzipFile(fileobj=io.BytesIO(data), mode="rb") as archive:
+        for raw in archive:
+            if raw.strip():
+                yield json.loads(raw)
+
+
+def _as_utc(value: Optional[datetime]) -> Optional[datetime]:
+    # Postgres reads naive filter times as UTC; archived timestamps are aware
+    if value is not None and value.tzinfo is None:
+        return value.replace(tzinfo=timezone.utc)
+    return value
+
+
+def filter_archived_logs(
+    lines: Iterable[Dict[str, Any]],
+    position: Optional[Tuple[datetime, UUID]] = None,
+    levels: Optional[Set[str]] = None,
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+    through: Optional[Tuple[datetime, UUID]] = None
+) -> Iterator[Dict[str, Any]]:
+    """Apply the log query filters to archived lines, which are already in (timestamp, id) order.
+
+    Args:
+        position: Only lines after this (timestamp, id)
+        levels: Level values to keep, or None for all
+        since: Only lines logged at or after this time
+        until: Only lines logged before this time
+        through: Only lines up to this (timestamp, id)
+    """
+    if position is not None:
+        position = (_as_utc(position[0]), position[1])
+    if through is not None:
+        through = (_as_utc(through[0]), through[1])
+    since, until = _as_utc(since), _as_utc(until)
+    for line in lines:
+        timestamp = datetime.fromisoformat(line["timestamp"])
+        if position is not None and (timestamp, UUID(line["id"])) <= position:
+            continue
+        if through is not None and (timestamp, UUID(line["id"])) > through:
+            break
+        if levels is not None and line["level"] not in levels:
+            continue
+        if since is not None and timestamp < since:
+            continue
+        if until is not None and timestamp >= until:
+            continue
+        yield line
+
+
+async def load_archive(db: AsyncSession, execution_id: str) -> Optional[bytes]:
+    """Get the archive blob of an execution, if its logs have been archived."""
+    result = await db.execute(select(FlowLogArchive.data).where(FlowLogArchive.execution_id == execution_id))
+    return result.scalar_one_or_none()
+
+
+async def archive_execution_logs(db: AsyncSession, execution_id: UUID) -> int:
+    """Move an execution's log rows into its archive blob and delete them.
+
+    Rows are streamed into a new gzip member that is appended to the blob in
+    the database, so neither the rows nor the earlier archive are held in
+    memory and lines already archived are not recompressed. The caller commits.
+
+    Returns:
+        int: Number of rows moved
+    """
+    stream = await db.stream_scalars(
+        select(FlowLog)
+        .where(FlowLog.execution_id == execution_id)
+        .order_by(FlowLog.timestamp, FlowLog.id)
+        .execution_options(yield_per=ARCHIVE_FETCH_SIZE)
+    )
+    buffer = io.BytesIO()
+    count = 0
+    size = 0
+    first: Optional[FlowLog] = None
+    last: Optional[FlowLog] = None
+    with gzip.GzipFile(fileobj=buffer, mode="wb") as member:
+        async for log in stream:
+            size += member.write(_encode_line(archived_line(log)))
+            count += 1
+            first = first or log
+            last = log
+    if last is None:
+        return 0
+
+    stmt = pg_insert(FlowLogArchive).values(
+        execution_id=execution_id,
+        data=buffer.getvalue(),
+        line_count=count,
+        uncompressed_bytes=size,
+        first_timestamp=first.timestamp,
+        last_timestamp=last.timestamp,
+    )
+    await db.execute(stmt.on_conflict_do_update(
+        index_elements=[FlowLogArchive.execution_id],
+        set_={
+            "data": FlowLogArchive.data.op("||")(stmt.excluded.data),
+            "line_count": FlowLogArchive.line_count + stmt.excluded.line_count,
+            "uncompressed_bytes": FlowLogArchive.uncompressed_bytes + stmt.excluded.uncompressed_bytes,
+            "first_timestamp": func.coalesce(FlowLogArchive.first_timestamp, stmt.excluded.first_timestamp),
+            "last_timestamp": stmt.excluded.last_timestamp,
+        }
+    ))
+    # Only delete what was archived, never a line written after the select
+    await db.execute(
+        delete(FlowLog).where(
+            FlowLog.execution_id == execution_id,
+            tuple_(FlowLog.timestamp, FlowLog.id) <= tuple_(last.timestamp, last.id)
+        )
+    )
+    return count
+
+
+async def archive_cold_logs(older_than_days: Optional[int] = None, limit: Optional[int] = None) -> Dict[str, int]:
+    """Archive the logs of executions that finished more than ``older_than_days`` ago.
+
+    Each execution is archived in its own transaction, so a failure only
+    leaves that execution's rows in place for the next run.
+
+    Returns:
+        Dict[str, int]: Number of executions archived and rows moved
+    """
+    settings = get_settings()
+    older_than_days = settings.flow_log_archive_after_days if older_than_days is None else older_than_days
+    limit = limit or settings.flow_log_archive_batch_size
+    if not older_than_days:
+        return {"executions": 0, "rows": 0}
+    cutoff = datetime.now(timezone.utc) - timedelta(days=older_than_days)
+
+    session_maker = get_session_maker()
+    async with session_maker() as db:
+        result = await db.execute(
+            select(DBFlowExecution.id)
+            .where(
+                DBFlowExecution.status.in_(ARCHIVABLE_STATUSES),
+                DBFlowExecution.completed_at < cutoff,
+                exists().where(FlowLog.execution_id == DBFlowExecution.id)
+            )
+            .order_by(DBFlowExecution.completed_at)
+            .limit(limit)
+        )
+        execution_ids = result.scalars().all()
+
+    stats = {"executions": 0, "rows": 0}
+    for execution_id in execution_ids:
+        try:
+            async with session_maker() as db:
+                rows = await archive_execution_logs(db, execution_id)
+                await db.commit()
+        except Exception as e:
+            logger.error(f"Failed to archive logs of execution {execution_id}: {str(e)}")
+            continue
+        stats["executions"] += 1
+        stats["rows"] += rows
+    if stats["executions"]:
+        logger.info(f"Archived {stats['rows']} log lines of {stats['executions']} executions")
+    return stats
+
+
+def expired_archives_statement(cutoff: datetime) -> Delete:
+    """Delete the archives whose newest line was logged before the cutoff."""
+    return delete(FlowLogArchive).where(FlowLogArchive.last_timestamp < cutoff)
+
+
+async def drop_expired_archives(retention_days: Optional[int] = None) -> int:
+    """Delete archives past ``flow_log_retention_days``, as partition retention does for live rows.
+
+    Returns:
+        int: Number of archives deleted
+    """
+    retention_days = get_settings().flow_log_retention_days if retention_days is None else retention_days
+    if not retention_days:
+        return 0
+    cutoff = datetime.now(timezone.utc) - timedelta(days=retention_days)
+    async with get_session_maker()() as db:
+        result = await db.execute(expired_archives_statement(cutoff))
+        await db.commit()
+    if result.rowcount:
+        logger.info(f"Deleted {result.rowcount} expired flow log archives")
+    return result.rowcount
+
+
+async def run_log_archival() -> None:
+    """Archive cold logs and drop expired archives every ``flow_log_maintenance_interval`` seconds until cancelled."""
+    interval = get_settings().flow_log_maintenance_interval
+    while True:
+        try:
+            # Keep going while full batches are found, then wait for the next round
+            while (await archive_cold_logs())["executions"] >= get_settings().flow_log_archive_batch_size:
+                pass
+            await drop_expired_archives()
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.error(f"Flow log archival failed: {str(e)}")
+        await asyncio.sleep(interval)
@@ -0,0 +1,194 @@
+"""Bridge from stdlib logging and CrewAI output into flow execution logs.
+
+Crews log through ``logging`` and print their ``verbose=True`` output, often
+from worker threads, so none of it reaches a DatabaseLogger, which must be
+fed on its event loop. A process-wide handler routes each record to the
+bridge of the execution running in the current context. The bridge collects
+records from any thread and hands them to the loop in batches with
+``call_soon_threadsafe``, so logging threads never wait on the writer.
+
+The bridge is found through a ContextVar, which ``asyncio.to_thread`` copies
+into worker threads. Records from threads CrewAI starts itself
+(``async_execution=True`` tasks) or from crew worker processes are not
+captured. Printed verbose output is picked up by wrapping CrewAI's
+``Printer.print`` only while at least one run is bound.
+"""
+
+import asyncio
+import functools
+import logging
+import re
+import threading
+from collections import deque
+from contextvars import ContextVar, Token
+from typing import Any, Callable, Deque, Dict, Optional, Tuple
+
+from api.core.config import get_settings
+from api.core.models import LogLevel
+
+logger = logging.getLogger(__name__)
+
+_current_bridge: ContextVar[Optional["LogBridge"]] = ContextVar("flow_log_bridge", default=None)
+_install_lock = threading.Lock()
+_handler: Optional["DatabaseLogHandler"] = None
+# Bound runs, and CrewAI's Printer.print while it is wrapped for them
+_verbose_runs = 0
+_original_print: Optional[Callable[..., Any]] = None
+
+# Never captured: the log pipeline's own loggers and the database drivers it uses
+EXCLUDED_LOGGERS = ("api.flows.db_logger", "api.flows.log_hub", "api.flows.log_bridge", "sqlalchemy", "asyncpg")
+
+# Carries printed crew output; not propagated, the text is already on stdout
+VERBOSE_LOGGER = "flow.crew_output"
+
+ANSI_ESCAPE = re.compile(r"\x1b\[[0-9;]*m")
+
+
+def level_for(levelno: int) -> LogLevel:
+    """Map a stdlib logging level to the closest flow log level."""
+    if levelno >= logging.ERROR:
+        return LogLevel.ERROR
+    if levelno >= logging.WARNING:
+        return LogLevel.WARNING
+    if levelno >= logging.INFO:
+        return LogLevel.INFO
+    return LogLevel.DEBUG
+
+
+class LogBridge:
+    """Moves log records of one execution from any thread onto its DatabaseLogger's loop."""
+
+    def __init__(self, db_logger, loop: Optional[asyncio.AbstractEventLoop] = None,
+                 maxsize: Optional[int] = None):
+        """Initialize the bridge.
+
+        Args:
+            db_logger: DatabaseLogger of the execution, fed on ``loop``
+            loop: Event loop of the DatabaseLogger (defaults to the running loop)
+            maxsize: Records held for the loop at most; older ones are dropped
+        """
+        self._db_logger = db_logger
+        self._loop = loop or asyncio.get_running_loop()
+        self._pending: Deque[Tuple[LogLevel, str, Dict[str, Any]]] = deque()
+        self._maxsize = maxsize or get_settings().flow_log_queue_size
+        self._lock = threading.Lock()
+        self._scheduled = False
+        self.dropped = 0
+
+    def submit(self, level: LogLevel, message: str, metadata: Dict[str, Any]) -> None:
+        """Queue a record for the DatabaseLogger without blocking, from any thread."""
+        with self._lock:
+            if len(self._pending) >= self._maxsize:
+                self._pending.popleft()
+                self.dropped += 1
+            self._pending.append((level, message, metadata))
+            if self._scheduled:
+                return
+            self._scheduled = True
+        try:
+            # One wake-up of the loop per batch of records, not per record
+            self._loop.call_soon_threadsafe(self.flush)
+        except RuntimeError:
+            # The loop has closed; the run is over
+            with self._lock:
+                self.dropped += len(self._pending)
+                self._pending.clear()
+
+    def flush(self) -> None:
+        """Hand every pending record to the DatabaseLogger. Runs on its loop."""
+        with self._lock:
+            records = list(self._pending)
+            self._pending.clear()
+            self._scheduled = False
+        for level, message, metadata in records:
+            self._db_logger.log(level, message, metadata)
+
+
+class DatabaseLogHandler(logging.Handler):
+    """Routes log records to the bridge of the execution running in the current context."""
+
+    def emit(self, record: logging.LogRecord) -> None:
+        bridge = _current_bridge.get()
+        if bridge is None or record.name.startswith(EXCLUDED_LOGGERS):
+            return
+        try:
+            message = ANSI_ESCAPE.sub("", self.format(record))
+            bridge.submit(level_for(record.levelno), message, {
+                "logger": record.name,
+                "thread": record.threadName,
+            })
+        except Exception:
+            self.handleError(record)
+
+
+def _start_verbose_capture() -> None:
+    """Wrap CrewAI's ``Printer.print`` so printed ``verbose=True`` output is also logged.
+
+    Runs are counted; the first bound run installs the wrapper and the last one
+    to finish restores the original method, so nothing stays patched between runs.
+    """
+    global _verbose_runs, _original_print
+    with _install_lock:
+        _verbose_runs += 1
+        if _verbose_runs > 1:
+            return
+        try:
+            from crewai.utilities.printer import Printer
+        except ImportError:
+            logger.warning("crewai is not installed, verbose crew output will not be captured")
+            return
+
+        print_method = _original_print = Printer.print
+        verbose_logger = logging.getLogger(VERBOSE_LOGGER)
+
+        @functools.wraps(print_method)
+        def print_and_log(self, content, *args, **kwargs):
+            print_method(self, content, *args, **kwargs)
+            # Prints of other threads and contexts are left alone
+            if _current_bridge.get() is not None:
+                verbose_logger.info(str(content))
+
+        Printer.print = print_and_log
+
+
+def _stop_verbose_capture() -> None:
+    """Restore CrewAI's ``Printer.print`` once no run is bound any more."""
+    global _verbose_runs, _original_print
+    with _install_lock:
+        _verbose_runs = max(0, _verbose_runs - 1)
+        if _verbose_runs or _original_print is None:
+            return
+        from crewai.utilities.printer import Printer
+
+        Printer.print = _original_print
+        _original_print = None
+
+
+def install_log_bridge() -> None:
+    """Attach the bridge handler to the captured loggers once per process."""
+    global _handler
+    with _install_lock:
+        if _handler is not None:
+            return
+        settings = get_settings()
+        _handler = DatabaseLogHandler(level=settings.flow_log_capture_level.upper())
+        names = [name.strip() for name in settings.flow_log_capture_loggers.split(",") if name.strip()]
+        # Levels of the captured loggers are left alone; records also have to pass them
+        for name in names:
+            logging.getLogger(name).addHandler(_handler)
+        verbose_logger = logging.getLogger(VERBOSE_LOGGER)
+        verbose_logger.addHandler(_handler)
+        verbose_logger.setLevel(_handler.level)
+        verbose_logger.propagate = False
+
+
+def bind_log_bridge(bridge: LogBridge) -> Token:
+    """Route records logged in this context (and threads it starts) to the bridge."""
+    install_log_bridge()
+    _start_verbose_capture()
+    return _current_bridge.set(bridge)
+
+
+def unbind_log_bridge(token: Token) -> None:
+    _current_bridge.reset(token)
+    _stop_verbose_capture()
@@ -0,0 +1,194 @@
+"""Bounded buffer between flow code and the flow log writer.
+
+A runaway flow can produce log lines much faster than they can be written.
+The buffer holds at most ``maxsize`` lines and applies an overflow policy
+when it is full:
+
+``block``
+    Async producers wait for space. Sync producers cannot wait on the event
+    loop, so their line is dropped.
+``drop_debug``
+    Drop DEBUG lines first (queued ones oldest first, then the incoming
+    line), then INFO lines the same way, then the incoming line.
+``coalesce``
+    Merge an incoming line into the newest queued line if it has the same
+    level and message, counting repeats in its metadata; otherwise fall
+    back to ``drop_debug``.
+
+DEBUG lines can also be sampled before they are queued. Every line that is
+dropped, coalesced or sampled out is counted. Producers are told which
+queued line holds their entry, and ``on_evict`` is called with queued lines
+dropped to make room, so whatever showed the lines early can follow suit.
+"""
+
+import asyncio
+import random
+from collections import deque
+from typing import Any, Callable, Deque, Dict, Optional
+
+OVERFLOW_POLICIES = ("block", "drop_debug", "coalesce")
+
+# Levels that may be dropped on overflow, cheapest first
+DROP_ORDER = ("debug", "info")
+
+
+def _level(entry: Dict[str, Any]) -> str:
+    level = entry["level"]
+    return getattr(level, "value", level)
+
+
+class LogBuffer:
+    """A bounded FIFO of log entries with overflow policies and drop accounting."""
+
+    def __init__(self, maxsize: int, policy: str = "drop_debug", debug_sample_rate: float = 1.0,
+                 rng: Optional[random.Random] = None,
+                 on_evict: Optional[Callable[[Dict[str, Any]], None]] = None):
+        """Initialize the buffer.
+
+        Args:
+            maxsize: Maximum number of queued lines
+            policy: One of OVERFLOW_POLICIES
+            debug_sample_rate: Fraction of DEBUG lines to keep, 1.0 keeps all
+            rng: Random source for sampling
+            on_evict: Called with each queued line dropped to make room
+        """
+        if policy not in OVERFLOW_POLICIES:
+            raise ValueError(f"Unknown log overflow policy '{policy}', expected one of {OVERFLOW_POLICIES}")
+        self._maxsize = max(1, maxsize)
+        self._policy = policy
+        self._debug_sample_rate = debug_sample_rate
+        self._rng = rng or random.Random()
+        self._on_evict = on_evict
+        self._entries: Deque[Dict[str, Any]] = deque()
+        self._level_counts: Dict[str, int] = {}
+        self._not_empty = asyncio.Event()
+        self._not_full = asyncio.Event()
+        self._not_full.set()
+        self.dropped = 0
+        self.coalesced = 0
+        self.sampled_out = 0
+
+    def qsize(self) -> int:
+        return len(self._entries)
+
+    def empty(self) -> bool:
+        return not self._entries
+
+    def full(self) -> bool:
+        return len(self._entries) >= self._maxsize
+
+    def put_nowait(self, entry: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """Queue a line without waiting.
+
+        Returns:
+            The queued line holding the entry (the entry itself, or the line it
+            was coalesced into), or None if it was dropped or sampled out
+        """
+        if not self._sample(entry):
+            return None
+        return self._offer(entry)
+
+    async def put(self, entry: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """Queue a line, waiting for space under the block policy.
+
+        Returns:
+            The queued line holding the entry, or None as for put_nowait
+        """
+        if not self._sample(entry):
+            return None
+        while self._policy == "block" and self.full():
+            self._not_full.clear()
+            await self._not_full.wait()
+        return self._offer(entry)
+
+    def get_nowait(self) -> Dict[str, Any]:
+        """Take the oldest line.
+
+        Raises:
+            asyncio.QueueEmpty: If no line is queued
+        """
+        if not self._entries:
+            raise asyncio.QueueEmpty
+        entry = self._entries.popleft()
+        self._count(entry, -1)
+        self._not_full.set()
+        return entry
+
+    async def get(self) -> Dict[str, Any]:
+        """Take the oldest line, waiting until one is queued."""
+        while not self._entries:
+            self._not_empty.clear()
+            await self._not_empty.wait()
+        return self.get_nowait()
+
+    @property
+    def stats(self) -> Dict[str, int]:
+        """Queue depth and counts of lines that were not written one for one."""
+        return {
+            "queued": len(self._entries),
+            "dropped": self.dropped,
+            "coalesced": self.coalesced,
+            "sampled_out": self.sampled_out,
+        }
+
+    def _sample(self, entry: Dict[str, Any]) -> bool:
+        if self._debug_sample_rate >= 1.0 or _level(entry) != "debug":
+            return True
+        if self._rng.random() < self._debug_sample_rate:
+            return True
+        self.sampled_out += 1
+        return False
+
+    def _offer(self, entry: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        if self.full():
+            if self._policy == "coalesce":
+                merged = self._coalesce(entry)
+                if merged is not None:
+                    return merged
+            if not self._make_room(entry):
+                self.dropped += 1
+                return None
+        self._entries.append(entry)
+        self._count(entry, 1)
+        self._not_empty.set()
+        return entry
+
+    def _coalesce(self, entry: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """Merge the line into the newest queued line if they repeat each other.
+
+        Returns:
+            The newest queued line if the entry was merged into it
+        """
+        newest = self._entries[-1]
+        if _level(newest) != _level(entry) or newest["message"] != entry["message"]:
+            return None
+        metadata = dict(newest.get("log_metadata") or {})
+        metadata["repeated"] = metadata.get("repeated", 1) + 1
+        newest["log_metadata"] = metadata
+        self.coalesced += 1
+        return newest
+
+    def _make_room(self, entry: Dict[str, Any]) -> bool:
+        """Evict a queued line of a cheaper or equal droppable level.
+
+        Returns:
+            bool: Whether there is room for the entry now
+        """
+        incoming = _level(entry)
+        for level in DROP_ORDER:
+            if self._level_counts.get(level):
+                for index, queued in enumerate(self._entries):
+                    if _level(queued) == level:
+                        del self._entries[index]
+                        self._count(queued, -1)
+                        self.dropped += 1
+                        if self._on_evict is not None:
+                            self._on_evict(queued)
+                        return True
+            if incoming == level:
+                return False
+        return False
+
+    def _count(self, entry: Dict[str, Any], delta: int) -> None:
+        level = _level(entry)
+        self._level_counts[level] = self._level_counts.get(level, 0) + delta
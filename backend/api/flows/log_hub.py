@@ -0,0 +1,364 @@
+"""Process-wide fan-out of flow log notifications.
+
+Log writers publish every stored line with ``NOTIFY flow_logs``. Instead of each
+log WebSocket checking a pooled connection out to ``LISTEN`` on its own, the
+hub keeps one dedicated listener connection per process and hands each
+notification to the in-memory subscribers of that line's execution. Viewers
+therefore cost a queue each, not a database connection.
+
+Executions running in this process also keep a ring of their recent lines.
+The log writer records each line in it, and hands it to local subscribers,
+as soon as the line is logged. The batch write and the NOTIFY happen
+later. New viewers replay recent history from the ring instead of
+Postgres. Notifications of lines this process already published are
+ignored.
+
+Lines too long for a notification arrive shortened and flagged as
+``truncated``. The hub reads the full line from the database before
+delivering it, and holds back later lines of that execution until then, so
+viewers get every line whole and in order.
+"""
+
+import asyncio
+import json
+import logging
+from collections import deque
+from datetime import datetime, timezone
+from typing import Any, Deque, Dict, List, Optional, Set, Tuple
+from uuid import UUID, uuid4
+
+import asyncpg
+from sqlalchemy.engine import make_url
+
+from api.core.config import get_settings
+from api.core.database import get_database_url, get_session_maker
+from api.core.models import FlowLog
+from .pagination import encode_cursor
+
+logger = logging.getLogger(__name__)
+
+CHANNEL = "flow_logs"
+
+# Tags this process's notifications so the hub can skip lines it already published
+PROCESS_ID = uuid4().hex
+
+# (timestamp, id) of a log line, the order lines are stored and replayed in
+LogPosition = Tuple[datetime, UUID]
+
+
+class LogRing:
+    """
+    Recent lines of an execution logged in this process.
+    Holds at least ``maxsize`` lines, and any lines not yet written to the database.
+    """
+
+    def __init__(self, maxsize: int):
+        self.maxsize = maxsize
+        self._lines: Deque[Tuple[LogPosition, Dict[str, Any]]] = deque()
+        # Every line after this position is in the ring. Earlier runs logged
+        # before the ring opened, and trimmed lines are in the database.
+        self.floor: LogPosition = (datetime.now(timezone.utc), UUID(int=0))
+        self._persisted: Optional[LogPosition] = None
+
+    def __len__(self) -> int:
+        return len(self._lines)
+
+    def append(self, position: LogPosition, line: Dict[str, Any]) -> None:
+        self._lines.append((position, line))
+        self._trim()
+
+    def update(self, position: LogPosition, changes: Dict[str, Any]) -> None:
+        """Change fields of the line at a position, if it is still in the ring."""
+        for line_position, line in reversed(self._lines):
+            if line_position == position:
+                line.update(changes)
+                return
+
+    def discard(self, position: LogPosition) -> None:
+        """Forget the line at a position, one that will never be written."""
+        for index, (line_position, _) in enumerate(self._lines):
+            if line_position == position:
+                del self._lines[index]
+                return
+
+    def mark_persisted(self, position: LogPosition) -> None:
+        """Record that every line up to this position has been written."""
+        if self._persisted is None or position > self._persisted:
+            self._persisted = position
+        self._trim()
+
+    def _trim(self) -> None:
+        # Unwritten lines stay so the ring and the database never leave a gap
+        while (len(self._lines) > self.maxsize and self._persisted is not None
+               and self._lines[0][0] <= self._persisted):
+            self.floor, _ = self._lines.popleft()
+
+    def after(self, position: Optional[LogPosition]) -> List[Dict[str, Any]]:
+        """Lines after a position, oldest first."""
+        return [line for line_position, line in self._lines if position is None or line_position > position]
+
+
+class LogSubscription:
+    """A viewer's queue of live log lines for one execution."""
+
+    def __init__(self, hub: "LogNotificationHub", execution_id: str, maxsize: int):
+        self.execution_id = execution_id
+        self._hub = hub
+        self._queue: asyncio.Queue = asyncio.Queue(maxsize)
+        # Lines discarded because the viewer fell behind
+        self.lagged = 0
+
+    def deliver(self, log: Dict[str, Any]) -> None:
+        """Queue a line, discarding the oldest one if the viewer is too slow."""
+        if self._queue.full():
+            self._queue.get_nowait()
+            self.lagged += 1
+        self._queue.put_nowait(log)
+
+    async def get(self) -> Dict[str, Any]:
+        """Wait for the next live line."""
+        return await self._queue.get()
+
+    def close(self) -> None:
+        """Stop receiving lines."""
+        self._hub.unsubscribe(self)
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self) -> Dict[str, Any]:
+        return await self.get()
+
+
+class LogNotificationHub:
+    """
+    Owns the process's LISTEN connection and demultiplexes notifications
+    to per-execution subscriber sets. Reconnects if the connection drops.
+    """
+
+    def __init__(self, dsn: Optional[str] = None, subscriber_queue_size: Optional[int] = None,
+                 reconnect_delay: float = 1.0, ring_size: Optional[int] = None, channel: str = CHANNEL):
+        """Initialize the hub.
+
+        Args:
+            dsn: Postgres DSN for the listener connection (defaults to the app database)
+            subscriber_queue_size: Live lines buffered per viewer
+            reconnect_delay: Initial delay before reconnecting, doubled up to 30 seconds
+            ring_size: Recent lines kept in memory per running execution
+            channel: Notification channel to listen on
+        """
+        settings = get_settings()
+        self._dsn = dsn
+        self._channel = channel
+        self._subscriber_queue_size = subscriber_queue_size or settings.flow_log_subscriber_queue_size
+        self._ring_size = settings.flow_log_ring_size if ring_size is None else ring_size
+        self._reconnect_delay = reconnect_delay
+        self._subscribers: Dict[str, Set[LogSubscription]] = {}
+        self._rings: Dict[str, LogRing] = {}
+        self._connection: Optional[asyncpg.Connection] = None
+        self._task: Optional[asyncio.Task] = None
+        # Lines per execution waiting behind a truncated line being read in full
+        self._backlogs: Dict[str, Deque[Dict[str, Any]]] = {}
+        self._loaders: Set[asyncio.Task] = set()
+        self.notifications = 0
+
+    def _listener_dsn(self) -> str:
+        if self._dsn:
+            return self._dsn
+        # asyncpg takes a plain postgresql:// URL, not the SQLAlchemy driver form
+        url = make_url(get_database_url()).set(drivername="postgresql")
+        return url.render_as_string(hide_password=False)
+
+    @property
+    def connected(self) -> bool:
+        return self._connection is not None and not self._connection.is_closed()
+
+    def subscribe(self, execution_id: str) -> LogSubscription:
+        """Subscribe to the live log lines of an execution, starting the listener if needed."""
+        self.start()
+        subscription = LogSubscription(self, str(execution_id), self._subscriber_queue_size)
+        self._subscribers.setdefault(subscription.execution_id, set()).add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: LogSubscription) -> None:
+        subscribers = self._subscribers.get(subscription.execution_id)
+        if subscribers is None:
+            return
+        subscribers.discard(subscription)
+        if not subscribers:
+            del self._subscribers[subscription.execution_id]
+
+    def publish(self, execution_id: str, log: Dict[str, Any]) -> int:
+        """Hand a line to every local subscriber of its execution.
+
+        Returns:
+            int: Number of subscribers the line was delivered to
+        """
+        subscribers = self._subscribers.get(str(execution_id))
+        if not subscribers:
+            return 0
+        for subscription in list(subscribers):
+            subscription.deliver(log)
+        return len(subscribers)
+
+    def open_ring(self, execution_id: str) -> None:
+        """Start keeping recent lines of an execution logged in this process."""
+        if self._ring_size > 0:
+            self._rings.setdefault(str(execution_id), LogRing(self._ring_size))
+
+    def close_ring(self, execution_id: str) -> None:
+        """Forget an execution's recent lines once they are all written."""
+        self._rings.pop(str(execution_id), None)
+
+    def record(self, execution_id: str, position: LogPosition, log: Dict[str, Any]) -> int:
+        """Keep a just-logged line in its execution's ring and publish it right away.
+
+        Returns:
+            int: Number of subscribers the line was delivered to
+        """
+        ring = self._rings.get(str(execution_id))
+        if ring is not None:
+            ring.append(position, log)
+        return self.publish(execution_id, log)
+
+    def update(self, execution_id: str, position: LogPosition, changes: Dict[str, Any]) -> None:
+        """Change a recorded line, so replays show it as it will be written."""
+        ring = self._rings.get(str(execution_id))
+        if ring is not None:
+            ring.update(position, changes)
+
+    def discard(self, execution_id: str, position: LogPosition) -> None:
+        """Drop a recorded line that will not be written from replays."""
+        ring = self._rings.get(str(execution_id))
+        if ring is not None:
+            ring.discard(position)
+
+    def mark_persisted(self, execution_id: str, position: LogPosition) -> None:
+        """Record that an execution's lines up to this position have been written."""
+        ring = self._rings.get(str(execution_id))
+        if ring is not None:
+            ring.mark_persisted(position)
+
+    def replay(self, execution_id: str, position: Optional[LogPosition] = None) -> Optional[Tuple[LogPosition, List[Dict[str, Any]]]]:
+        """Recent lines of an execution logged in this process.
+
+        Returns:
+            The ring's floor and the lines after ``position``, or None if no ring is open.
+            Lines up to the floor have to be read from the database.
+        """
+        ring = self._rings.get(str(execution_id))
+        if ring is None:
+            return None
+        return ring.floor, ring.after(position)
+
+    def start(self) -> None:
+        """Start the listener task on the running event loop."""
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._listen())
+
+    async def stop(self) -> None:
+        """Stop the listener task and close its connection."""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _listen(self) -> None:
+        """Keep one LISTEN connection open, reconnecting with backoff."""
+        delay = self._reconnect_delay
+        while True:
+            closed = asyncio.Event()
+            try:
+                self._connection = await asyncpg.connect(self._listener_dsn())
+                self._connection.add_termination_listener(lambda _: closed.set())
+                await self._connection.add_listener(self._channel, self._on_notification)
+                logger.info(f"Listening for notifications on '{self._channel}'")
+                delay = self._reconnect_delay
+                await closed.wait()
+                logger.warning(f"Listener connection of '{self._channel}' closed, reconnecting")
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Listener error on '{self._channel}': {str(e)}")
+            finally:
+                if self._connection is not None and not self._connection.is_closed():
+                    await self._connection.close()
+                self._connection = None
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, 30.0)
+
+    def _on_notification(self, connection, pid: int, channel: str, payload: str) -> None:
+        self.notifications += 1
+        try:
+            notification = json.loads(payload)
+            if notification.get("origin") == PROCESS_ID:
+                # Already published by record() when the line was logged
+                return
+            self._deliver(str(notification["execution_id"]), notification["log"])
+        except (json.JSONDecodeError, KeyError, TypeError):
+            logger.warning(f"Invalid flow log notification: {payload[:200]}")
+
+    def _deliver(self, execution_id: str, log: Dict[str, Any]) -> None:
+        """Publish a notified line, reading truncated lines in full first without reordering."""
+        backlog = self._backlogs.get(execution_id)
+        if backlog is not None:
+            backlog.append(log)
+            return
+        if not log.get("truncated"):
+            self.publish(execution_id, log)
+            return
+        self._backlogs[execution_id] = deque([log])
+        task = asyncio.get_running_loop().create_task(self._drain_backlog(execution_id))
+        self._loaders.add(task)
+        task.add_done_callback(self._loaders.discard)
+
+    async def _drain_backlog(self, execution_id: str) -> None:
+        backlog = self._backlogs[execution_id]
+        try:
+            while backlog:
+                log = backlog[0]
+                if log.get("truncated"):
+                    log = await self._load_full_line(execution_id, log)
+                backlog.popleft()
+                self.publish(execution_id, log)
+        finally:
+            del self._backlogs[execution_id]
+
+    async def _load_full_line(self, execution_id: str, log: Dict[str, Any]) -> Dict[str, Any]:
+        """Read a truncated line from the database, or keep it truncated if that fails."""
+        try:
+            async with get_session_maker()() as session:
+                row = await session.get(FlowLog, (UUID(log["id"]), datetime.fromisoformat(log["timestamp"])))
+        except Exception as e:
+            logger.warning(f"Failed to load truncated log line {log.get('id')} of {execution_id}: {str(e)}")
+            return log
+        if row is None:
+            return log
+        return {**row.to_dict(), "cursor": encode_cursor(row.timestamp, row.id)}
+
+    @property
+    def stats(self) -> Dict[str, Any]:
+        """Listener state and subscriber counts."""
+        return {
+            "connected": self.connected,
+            "executions": len(self._subscribers),
+            "subscribers": sum(len(subscribers) for subscribers in self._subscribers.values()),
+            "notifications": self.notifications,
+            "lagged": sum(s.lagged for subscribers in self._subscribers.values() for s in subscribers),
+            "rings": len(self._rings),
+            "ring_lines": sum(len(ring) for ring in self._rings.values()),
+        }
+
+
+_hub: Optional[LogNotificationHub] = None
+
+
+def get_log_hub() -> LogNotificationHub:
+    """Get or create the process-wide log notification hub."""
+    global _hub
+    if _hub is None:
+        _hub = LogNotificationHub()
+    return _hub
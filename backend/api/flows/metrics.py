@@ -0,0 +1,196 @@
+"""Per-step timing and LLM usage for flow executions.
+
+Every flow step run through a recorder gets a StepMetrics record that is
+current for the duration of the step, including in the worker thread a
+synchronous step is offloaded to. LLM calls made by crews inside the step are
+counted against it by a wrapper around ``litellm.completion``, which every
+CrewAI ``LLM.call`` goes through.
+
+Tasks with ``async_execution=True`` run on threads CrewAI creates itself, so
+their LLM calls are not attributed to a step.
+"""
+
+import functools
+import logging
+import threading
+import time
+from contextvars import ContextVar
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+_current_step: ContextVar[Optional["StepMetrics"]] = ContextVar("flow_step_metrics", default=None)
+_install_lock = threading.Lock()
+_installed = False
+
+
+def current_step() -> Optional["StepMetrics"]:
+    """Get the metrics record of the flow step running in this context, if any."""
+    return _current_step.get()
+
+
+def install_llm_instrumentation() -> None:
+    """Wrap ``litellm.completion`` once per process so LLM calls are counted per step."""
+    global _installed
+    with _install_lock:
+        if _installed:
+            return
+        try:
+            import litellm
+        except ImportError:
+            logger.warning("litellm is not installed, LLM usage will not be recorded")
+            _installed = True
+            return
+
+        completion = litellm.completion
+
+        @functools.wraps(completion)
+        def instrumented_completion(*args, **kwargs):
+            step = _current_step.get()
+            if step is None:
+                return completion(*args, **kwargs)
+            try:
+                response = completion(*args, **kwargs)
+            except Exception:
+                step.record_failure()
+                raise
+            step.record_call(getattr(response, "usage", None))
+            return response
+
+        litellm.completion = instrumented_completion
+        _installed = True
+
+
+class StepMetrics:
+    """Timing and LLM usage of one flow step."""
+
+    def __init__(self, name: str, run: int):
+        self.name = name
+        self.run = run
+        self.started_at = datetime.utcnow()
+        self.ended_at: Optional[datetime] = None
+        self.llm_calls = 0
+        self.prompt_tokens = 0
+        self.completion_tokens = 0
+        self.retries = 0
+        self.error: Optional[str] = None
+        self._start = time.perf_counter()
+        self._duration: Optional[float] = None
+        # Crews may call the LLM from several threads of the same step
+        self._lock = threading.Lock()
+
+    def record_call(self, usage: Any = None) -> None:
+        """Count a successful LLM call and its token usage."""
+        with self._lock:
+            self.llm_calls += 1
+            if usage is not None:
+                self.prompt_tokens += getattr(usage, "prompt_tokens", 0) or 0
+                self.completion_tokens += getattr(usage, "completion_tokens", 0) or 0
+
+    def record_failure(self) -> None:
+        """Count a failed LLM call; the agent retries it."""
+        with self._lock:
+            self.retries += 1
+
+    def finish(self, error: Optional[BaseException] = None) -> None:
+        """Mark the step as ended."""
+        self.ended_at = datetime.utcnow()
+        self._duration = time.perf_counter() - self._start
+        if error is not None:
+            self.error = type(error).__name__
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "name": self.name,
+            "run": self.run,
+            "started_at": self.started_at.isoformat(),
+            "ended_at": self.ended_at.isoformat() if self.ended_at else None,
+            "duration_seconds": self._duration,
+            "llm_calls": self.llm_calls,
+            "prompt_tokens": self.prompt_tokens,
+            "completion_tokens": self.completion_tokens,
+            "retries": self.retries,
+            "error": self.error,
+        }
+
+
+class FlowMetricsRecorder:
+    """
+    Collects per-run queue wait and per-step metrics of an execution.
+    Metrics from earlier runs of a resumed or retried execution are kept.
+    """
+
+    def __init__(self, previous: Optional[Dict[str, Any]] = None):
+        """Initialize the recorder.
+
+        Args:
+            previous: Metrics persisted by earlier runs of the execution, if any
+        """
+        previous = previous or {}
+        self._runs: List[Dict[str, Any]] = list(previous.get("runs", []))
+        self._previous_steps: List[Dict[str, Any]] = list(previous.get("steps", []))
+        self._steps: List[StepMetrics] = []
+        self._run = len(self._runs)
+        self._previous_logging: Dict[str, int] = dict(previous.get("logging", {}))
+        self._log_stats: Optional[Callable[[], Dict[str, int]]] = None
+
+    def start_run(self, queued_at: Optional[datetime], started_at: Optional[datetime]) -> None:
+        """Record the start of a run and how long it waited in the queue."""
+        queue_wait = None
+        if queued_at and started_at:
+            queue_wait = max((started_at - queued_at).total_seconds(), 0.0)
+        self._runs.append({
+            "run": self._run,
+            "queued_at": queued_at.isoformat() if queued_at else None,
+            "started_at": started_at.isoformat() if started_at else None,
+            "queue_wait_seconds": queue_wait,
+        })
+
+    def track_logs(self, log_stats: Callable[[], Dict[str, int]]) -> None:
+        """Include the counters of this run's log writer (written, dropped, coalesced, ...)."""
+        self._log_stats = log_stats
+
+    def attach(self, flow) -> None:
+        """Time every step the flow executes from now on."""
+        install_llm_instrumentation()
+        execute_method = flow._execute_method
+
+        async def timed_execute_method(method_name, method, *args, **kwargs):
+            step = StepMetrics(method_name, self._run)
+            self._steps.append(step)
+            token = _current_step.set(step)
+            try:
+                result = await execute_method(method_name, method, *args, **kwargs)
+            except BaseException as e:
+                step.finish(error=e)
+                raise
+            finally:
+                _current_step.reset(token)
+            step.finish()
+            return result
+
+        flow._execute_method = timed_execute_method
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Serialize all runs and steps with totals."""
+        steps = self._previous_steps + [step.to_dict() for step in self._steps]
+        queue_waits = [run["queue_wait_seconds"] for run in self._runs if run.get("queue_wait_seconds") is not None]
+        logging_counts = dict(self._previous_logging)
+        if self._log_stats is not None:
+            for name, count in self._log_stats().items():
+                if name != "queued":
+                    logging_counts[name] = logging_counts.get(name, 0) + count
+        return {
+            "runs": self._runs,
+            "steps": steps,
+            "logging": logging_counts,
+            "totals": {
+                "queue_wait_seconds": sum(queue_waits),
+                "step_seconds": sum(step["duration_seconds"] or 0.0 for step in steps),
+                "llm_calls": sum(step["llm_calls"] for step in steps),
+                "prompt_tokens": sum(step["prompt_tokens"] for step in steps),
+                "completion_tokens": sum(step["completion_tokens"] for step in steps),
+                "retries": sum(step["retries"] for step in steps),
+            },
+        }
@@ -0,0 +1,92 @@
+"""Keyset pagination for flow execution listings.
+
+Pages are ordered newest first by ``(created_at, id)``. The cursor is the
+position of the last row of a page, so fetching the next page is an index
+range scan no matter how deep the client has paged, unlike ``OFFSET``.
+"""
+
+import base64
+import binascii
+from datetime import datetime
+from typing import Optional, Tuple
+from uuid import UUID
+
+from sqlalchemy import Select, tuple_
+from sqlalchemy.orm import load_only
+
+from api.core.models import FlowExecution as DBFlowExecution
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 200
+
+# Columns loaded for list views; state, error, checkpoint and logs stay in the database
+SUMMARY_COLUMNS = (
+    DBFlowExecution.id,
+    DBFlowExecution.flow_name,
+    DBFlowExecution.status,
+    DBFlowExecution.created_at,
+    DBFlowExecution.updated_at,
+    DBFlowExecution.queued_at,
+    DBFlowExecution.started_at,
+    DBFlowExecution.completed_at,
+    DBFlowExecution.cache_key,
+    DBFlowExecution.leader_id,
+    DBFlowExecution.batch_id,
+    DBFlowExecution.user_id,
+)
+
+
+def encode_cursor(created_at: datetime, execution_id: UUID) -> str:
+    """Encode the position of a row as an opaque cursor."""
+    raw = f"{created_at.isoformat()}|{execution_id}"
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii")
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, UUID]:
+    """Decode a cursor produced by encode_cursor.
+
+    Raises:
+        ValueError: If the cursor is malformed
+    """
+    try:
+        raw = base64.urlsafe_b64decode(cursor.encode("ascii")).decode("utf-8")
+        created_at, _, execution_id = raw.partition("|")
+        return datetime.fromisoformat(created_at), UUID(execution_id)
+    except (binascii.Error, UnicodeError, ValueError) as e:
+        raise ValueError(f"Invalid cursor: {cursor}") from e
+
+
+def clamp_page_size(limit: Optional[int]) -> int:
+    """Bound a requested page size to 1..MAX_PAGE_SIZE."""
+    if not limit:
+        return DEFAULT_PAGE_SIZE
+    return max(1, min(limit, MAX_PAGE_SIZE))
+
+
+def paginate_executions(stmt: Select, limit: int, cursor: Optional[str] = None, summary: bool = True) -> Select:
+    """Apply keyset ordering, the cursor predicate and the projection to an execution query.
+
+    One extra row is fetched so callers can tell whether another page exists.
+
+    Args:
+        stmt: A select of DBFlowExecution with filters already applied
+        limit: Page size
+        cursor: Cursor of the previous page's last row, if any
+        summary: Load only SUMMARY_COLUMNS instead of full rows
+    """
+    if cursor:
+        created_at, execution_id = decode_cursor(cursor)
+        # Row comparison matches the (..., created_at, id) index order, so this is a range scan
+        stmt = stmt.where(tuple_(DBFlowExecution.created_at, DBFlowExecution.id) < tuple_(created_at, execution_id))
+    if summary:
+        stmt = stmt.options(load_only(*SUMMARY_COLUMNS))
+    return stmt.order_by(DBFlowExecution.created_at.desc(), DBFlowExecution.id.desc()).limit(limit + 1)
+
+
+def split_page(rows: list, limit: int) -> Tuple[list, Optional[str]]:
+    """Split the rows fetched by paginate_executions into a page and the next cursor."""
+    if len(rows) <= limit:
+        return rows, None
+    page = rows[:limit]
+    last = page[-1]
+    return page, encode_cursor(last.created_at, last.id)
@@ -0,0 +1,117 @@
+"""In-process cache tier for flow results.
+
+Sits in front of the on-disk flow cache so repeat hits are served from memory
+instead of a filesystem round trip and a full JSON parse.
+"""
+
+import json
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+
+class ResultMemoryCache:
+    """
+    A byte-bounded LRU cache with optional TTL and hit/miss counters.
+    Cached values are shared between callers and must be treated as read-only.
+    """
+
+    def __init__(self, max_bytes: int, ttl: Optional[float] = None):
+        """Initialize the cache.
+
+        Args:
+            max_bytes: Upper bound on the estimated size of all cached values
+            ttl: Seconds an entry stays valid, or None to keep entries until evicted
+        """
+        self._max_bytes = max_bytes
+        self._ttl = ttl
+        # key -> (value, size in bytes, expiry timestamp or None)
+        self._entries: "OrderedDict[str, Tuple[Dict[str, Any], int, Optional[float]]]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @staticmethod
+    def estimate_size(value: Dict[str, Any]) -> int:
+        """Estimate the size of a value by its compact JSON encoding."""
+        return len(json.dumps(value, ensure_ascii=False, separators=(",", ":"), default=str).encode("utf-8"))
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """Get a cached value, refreshing its LRU position."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            value, size, expires_at = entry
+            if expires_at is not None and expires_at <= time.monotonic():
+                self._remove(key)
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key: str, value: Dict[str, Any], size: Optional[int] = None) -> None:
+        """Cache a value, evicting least recently used entries to stay within the byte bound.
+
+        Args:
+            key: Cache key
+            value: Value to cache
+            size: Size of the value in bytes if already known (e.g. the file size it was read from)
+        """
+        if size is None:
+            size = self.estimate_size(value)
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            if size > self._max_bytes:
+                # Never let one oversized result flush the whole tier
+                return
+            expires_at = time.monotonic() + self._ttl if self._ttl else None
+            self._entries[key] = (value, size, expires_at)
+            self._bytes += size
+            while self._bytes > self._max_bytes:
+                oldest_key = next(iter(self._entries))
+                self._remove(oldest_key)
+                self.evictions += 1
+
+    def delete(self, key: str) -> None:
+        """Remove a value from the cache."""
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+
+    def clear(self) -> None:
+        """Remove every value from the cache."""
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def _remove(self, key: str) -> None:
+        _, size, _ = self._entries.pop(key)
+        self._bytes -= size
+
+    def __contains__(self, key: str) -> bool:
+        with self._lock:
+            entry = self._entries.get(key)
+            return entry is not None and (entry[2] is None or entry[2] > time.monotonic())
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @property
+    def stats(self) -> Dict[str, int]:
+        """Hit, miss and size counters."""
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "max_bytes": self._max_bytes,
+            }
@@ -3,13 +3,21 @@
 from fastapi import FastAPI, Depends, status, WebSocket, WebSocketDisconnect, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.security import OAuth2PasswordBearer, OAuth2PasswordRequestForm
+import asyncio
 from contextlib import asynccontextmanager
 from sqlalchemy.ext.asyncio import AsyncSession
 from typing import Dict, Any
 
 from .core.config import get_settings, Settings
 from .core.database import init_db, get_db
+from .core.log_partitions import run_partition_maintenance
 from .auth import verify_token, get_current_user
+from .crews.blueprint_status import stop_blueprint_status_hub
+from .crews.generation_runner import shutdown_generation_runner
+from .crews.process_pool import get_crew_pool, shutdown_crew_pool, use_process_pool
+from .flows.flow_wrapper import get_flow_wrapper
+from .flows.log_archive import run_log_archival
+from .flows.log_hub import get_log_hub
 from .core.models import User
 from .routers import (
     topics,
@@ -17,6 +25,7 @@ from .routers import (
     blueprints,
     user_settings,
     flow_execution,
+    flow_logs,
     environment,
     dev
 )
@@ -30,9 +39,28 @@ def create_app() -> FastAPI:
         """Lifespan context manager for FastAPI app"""
         # Startup: Initialize database models
         await init_db()
+        if use_process_pool():
+            # Boot crew worker processes up front so the first generation is warm
+            get_crew_pool().warm()
+        # Create upcoming log partitions, drop expired ones and archive cold logs in the background
+        maintenance = []
+        if settings.flow_log_maintenance_interval:
+            maintenance = [
+                asyncio.create_task(run_partition_maintenance()),
+                asyncio.create_task(run_log_archival()),
+            ]
+        # Run queued flow executions in this process unless workers run separately
+        if settings.flow_worker_count:
+            await get_flow_wrapper().start_workers()
         yield
-        # Cleanup (if needed)
-        pass
+        # Cleanup
+        await get_flow_wrapper().stop_workers()
+        for task in maintenance:
+            task.cancel()
+        await get_log_hub().stop()
+        await stop_blueprint_status_hub()
+        await shutdown_generation_runner()
+        shutdown_crew_pool()
 
     # Define OpenAPI tags metadata
     tags_metadata = [
@@ -85,6 +113,7 @@ def create_app() -> FastAPI:
     app.include_router(blueprints.router, prefix="/api")
     app.include_router(user_settings.router, prefix="/api")
     app.include_router(flow_execution.router, prefix="/api")
+    app.include_router(flow_logs.router)  # No prefix since its paths include /api
     app.include_router(dev.router)  # No prefix since it already has /dev prefix
 
     # Add token endpoint
@@ -1,20 +1,27 @@
-from typing import Optional
-from uuid import UUID
-from datetime import datetime, timezone
+import asyncio
+from functools import partial
+from typing import List, Optional, Tuple
+from uuid import UUID, uuid4
+from datetime import datetime, timedelta, timezone
 import logging
-from sqlalchemy import select, and_
+import traceback
+from pydantic import ValidationError
+from sqlalchemy import select, and_, insert, update
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import selectinload
 
-from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, status
-from fastapi.responses import JSONResponse
-from starlette.concurrency import run_in_threadpool
+from fastapi import APIRouter, Depends, HTTPException, Request, status
+from fastapi.responses import JSONResponse, StreamingResponse
 
 from ..core.models import User, Topic, Blueprint, TerminalObjective, EnablingObjective
 from ..auth import get_current_user
-from ..core.database import get_db
+from ..core.database import get_db, get_session_maker
 from ..schemas.pydantic_schemas import BlueprintPydantic, BlueprintStatusResponse
 from ..crews.blueprint_crew.blueprint_crew import BlueprintCrew
+from ..crews.generation_runner import IN_PROGRESS_STATUSES, GenerationRejected, get_generation_runner
+from ..crews.process_pool import get_crew_pool, use_process_pool
+from ..crews.response_cache import response_cache_stats
+from ..crews.blueprint_status import get_blueprint_status_hub, notify_status, publish_status, status_event
 
 # Set up logging
 logger = logging.getLogger(__name__)
@@ -23,37 +30,84 @@ router = APIRouter(
     tags=["blueprint_generation"]
 )
 
+# Generations still queued or generating after this long are considered lost
+GENERATION_TIMEOUT_SECONDS = 600
+
+# Seconds between keepalives and queue position refreshes of a status stream
+STATUS_STREAM_REFRESH_SECONDS = 5
+
+def _generation_timed_out(blueprint: Blueprint) -> bool:
+    """Whether an unfinished generation has outlived the timeout.
+
+    Jobs still waiting in this process's queue are never timed out; the
+    timeout starts when their generation starts.
+    """
+    if blueprint.status not in IN_PROGRESS_STATUSES or not blueprint.generation_started_at:
+        return False
+    if blueprint.status == "queued" and get_generation_runner().position(blueprint.blueprint_id) is not None:
+        return False
+    time_elapsed = datetime.now(timezone.utc) - blueprint.generation_started_at
+    return time_elapsed.total_seconds() > GENERATION_TIMEOUT_SECONDS
+
+def _blueprint_event(blueprint: Blueprint) -> dict:
+    return status_event(
+        blueprint.blueprint_id,
+        blueprint.status,
+        blueprint.title,
+        blueprint.description,
+        blueprint.terminal_objectives_count,
+        blueprint.enabling_objectives_count,
+    )
+
+async def _fail_timed_out_generation(db: AsyncSession, blueprint: Blueprint) -> None:
+    """Mark a lost generation as failed and tell its status streams."""
+    blueprint.status = "error"
+    blueprint.description = "Blueprint generation timed out after 10 minutes"
+    event = _blueprint_event(blueprint)
+    await notify_status(db, event)
+    await db.commit()
+    publish_status(event)
+
+def _too_many_generations(e: GenerationRejected) -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+        detail=str(e),
+        headers={"Retry-After": str(e.retry_after)}
+    )
+
 @router.post("/topics/{topic_id}/blueprints/generate", response_model=BlueprintPydantic)
 async def generate_blueprint(
     topic_id: UUID,
-    background_tasks: BackgroundTasks,
+    bypass_cache: bool = False,
     db: AsyncSession = Depends(get_db),
-    current_user_id: UUID = Depends(get_current_user),
+    current_user: User = Depends(get_current_user),
 ):
-    """Generate a blueprint using AI for the specified topic."""
+    """Generate a blueprint using AI for the specified topic.
+
+    The generation is queued fairly among users. Users over their limit,
+    or requests arriving while the queue is full, get a 429 with Retry-After.
+    A topic generated before is served from the crew response cache unless
+    ``bypass_cache`` is set.
+    """
     try:
-        # Check for existing blueprints in generating state
+        # Check for existing blueprints being queued or generated
         stmt = select(Blueprint).where(
             and_(
                 Blueprint.topic_id == topic_id,
-                Blueprint.status == "generating"
+                Blueprint.status.in_(IN_PROGRESS_STATUSES)
             )
         )
         result = await db.execute(stmt)
-        existing_blueprint = result.scalar_one_or_none()
+        existing_blueprint = result.scalars().first()
 
         if existing_blueprint:
             # Check if generation has timed out
-            if existing_blueprint.generation_started_at:
-                time_elapsed = datetime.now(timezone.utc) - existing_blueprint.generation_started_at
-                if time_elapsed.total_seconds() > 600:  # 10 minutes
-                    existing_blueprint.status = "error"
-                    existing_blueprint.description = "Blueprint generation timed out after 10 minutes"
-                    await db.commit()
-                    raise HTTPException(
-                        status_code=status.HTTP_400_BAD_REQUEST,
-                        detail="Previous blueprint generation timed out. Please try again."
-                    )
+            if _generation_timed_out(existing_blueprint):
+                await _fail_timed_out_generation(db, existing_blueprint)
+                raise HTTPException(
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    detail="Previous blueprint generation timed out. Please try again."
+                )
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail="A blueprint is already being generated for this topic"
@@ -67,27 +121,46 @@ async def generate_blueprint(
                 detail="Topic not found"
             )
 
+        # Reject early when the user or the queue is at its limit, here and across processes
+        runner = get_generation_runner()
+        runner.check_admission(current_user.user_id)
+        await runner.check_stored_admission(
+            db,
+            current_user.user_id,
+            datetime.now(timezone.utc) - timedelta(seconds=GENERATION_TIMEOUT_SECONDS)
+        )
+
         # Create a new blueprint
         blueprint = Blueprint(
             topic_id=topic_id,
-            created_by=current_user_id,
+            created_by=current_user.user_id,
             title=f"{topic.title} Blueprint",
-            description="Generating blueprint...",
-            status="generating",
+            description="Waiting to start generation...",
+            status="queued",
             generation_started_at=datetime.now(timezone.utc)
         )
         db.add(blueprint)
         await db.commit()
         await db.refresh(blueprint)
 
-        # Start background task
-        background_tasks.add_task(
-            generate_blueprint_background,
-            blueprint.blueprint_id,
-            topic.title,
-            topic.description,
-            current_user_id
-        )
+        # Queue the generation on the process's generation runner
+        try:
+            runner.submit(
+                blueprint.blueprint_id,
+                partial(
+                    run_blueprint_generation,
+                    blueprint.blueprint_id,
+                    topic.title,
+                    topic.description,
+                    bypass_cache=bypass_cache
+                ),
+                user_id=current_user.user_id
+            )
+        except GenerationRejected:
+            # Another request took the last slot while the blueprint was being created
+            await db.delete(blueprint)
+            await db.commit()
+            raise
 
         return BlueprintPydantic(
             blueprint_id=blueprint.blueprint_id,
@@ -100,6 +173,10 @@ async def generate_blueprint(
             status=blueprint.status
         )
 
+    except GenerationRejected as e:
+        raise _too_many_generations(e)
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Error in generate_blueprint: {str(e)}")
         raise HTTPException(
@@ -107,185 +184,315 @@ async def generate_blueprint(
             detail=str(e)
         )
 
+def _with_queue_position(current: BlueprintStatusResponse) -> BlueprintStatusResponse:
+    """Fill in the queue position of a queued generation.
+
+    Queue position is only known to the process that queued the generation.
+    """
+    queue_position = None
+    estimated_wait_seconds = None
+    if current.status == "queued":
+        runner = get_generation_runner()
+        queue_position = runner.position(current.id)
+        if queue_position is not None:
+            estimated_wait_seconds = runner.estimated_wait(queue_position)
+    return current.model_copy(update={
+        "queue_position": queue_position,
+        "estimated_wait_seconds": estimated_wait_seconds,
+    })
+
+async def _read_blueprint_status(db: AsyncSession, topic_id: UUID, blueprint_id: UUID) -> BlueprintStatusResponse:
+    """Read a blueprint's status, failing generations that have timed out.
+
+    Raises:
+        HTTPException: 404 if the topic or the blueprint does not exist
+    """
+    # First verify that the topic exists
+    topic = await db.get(Topic, topic_id)
+    if not topic:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Topic not found"
+        )
+
+    # Then get the blueprint, ensuring it belongs to the topic
+    blueprint = await db.get(Blueprint, blueprint_id)
+    if not blueprint:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Blueprint not found"
+        )
+        
+    if blueprint.topic_id != topic_id:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Blueprint not found for this topic"
+        )
+
+    # Check for timeout if the generation has not finished
+    if _generation_timed_out(blueprint):
+        await _fail_timed_out_generation(db, blueprint)
+
+    return _with_queue_position(BlueprintStatusResponse(
+        id=blueprint.blueprint_id,
+        status=blueprint.status,
+        title=blueprint.title,
+        description=blueprint.description,
+        terminal_objectives_count=blueprint.terminal_objectives_count or 0,
+        enabling_objectives_count=blueprint.enabling_objectives_count or 0,
+    ))
+
 @router.get("/topics/{topic_id}/blueprints/{blueprint_id}/status", response_model=BlueprintStatusResponse)
 async def get_blueprint_status(
     topic_id: UUID,
     blueprint_id: UUID,
     db: AsyncSession = Depends(get_db),
 ):
-    """Get the current status of a blueprint generation process."""
+    """Get the current status of a blueprint generation process.
+
+    Clients waiting for a generation should use the status stream instead of polling.
+    """
     try:
-        # First verify that the topic exists
-        topic = await db.get(Topic, topic_id)
-        if not topic:
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail="Topic not found"
-            )
+        return await _read_blueprint_status(db, topic_id, blueprint_id)
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error in get_blueprint_status: {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=str(e)
+        )
 
-        # Then get the blueprint, ensuring it belongs to the topic
-        blueprint = await db.get(Blueprint, blueprint_id)
-        if not blueprint:
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail="Blueprint not found"
-            )
-            
-        if blueprint.topic_id != topic_id:
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail="Blueprint not found for this topic"
-            )
+def _status_message(current: BlueprintStatusResponse) -> str:
+    return f"event: status\ndata: {current.model_dump_json()}\n\n"
 
-        # Check for timeout if status is generating
-        if blueprint.status == "generating" and blueprint.generation_started_at:
-            time_elapsed = datetime.now(timezone.utc) - blueprint.generation_started_at
-            if time_elapsed.total_seconds() > 600:  # 10 minutes
-                blueprint.status = "error"
-                blueprint.description = "Blueprint generation timed out after 10 minutes"
-                await db.commit()
+async def _status_events(
+    request: Request,
+    subscription,
+    topic_id: UUID,
+    current: BlueprintStatusResponse,
+):
+    """Yield the current status, then every change, until the generation finishes.
 
-        return BlueprintStatusResponse(
-            id=blueprint.blueprint_id,
-            status=blueprint.status,
-            title=blueprint.title,
-            description=blueprint.description,
-            terminal_objectives_count=blueprint.terminal_objectives_count or 0,
-            enabling_objectives_count=blueprint.enabling_objectives_count or 0,
-        )
+    Changes arrive from the status hub. Between changes the stream sends a
+    keepalive, or the new queue position if it moved. If no change arrives
+    for the generation timeout, the status is read again so a lost
+    generation is failed as the status endpoint would.
+    """
+    loop = asyncio.get_running_loop()
+    try:
+        yield _status_message(current)
+        recheck_at = loop.time() + GENERATION_TIMEOUT_SECONDS
+        while current.status in IN_PROGRESS_STATUSES:
+            if await request.is_disconnected():
+                return
+            try:
+                event = await asyncio.wait_for(subscription.get(), timeout=STATUS_STREAM_REFRESH_SECONDS)
+            except asyncio.TimeoutError:
+                event = None
+            changed = None
+            if event is not None:
+                try:
+                    changed = _with_queue_position(BlueprintStatusResponse.model_validate(event))
+                    recheck_at = loop.time() + GENERATION_TIMEOUT_SECONDS
+                except ValidationError:
+                    logger.warning(f"Invalid status event for blueprint {current.id}, reading it instead")
+                    recheck_at = loop.time()
+            if changed is None and loop.time() >= recheck_at:
+                try:
+                    async with get_session_maker()() as db:
+                        changed = await _read_blueprint_status(db, topic_id, current.id)
+                except HTTPException:
+                    # The blueprint was deleted
+                    return
+                recheck_at = loop.time() + GENERATION_TIMEOUT_SECONDS
+            elif changed is None:
+                changed = _with_queue_position(current)
+            if changed == current:
+                yield ": keepalive\n\n"
+                continue
+            current = changed
+            yield _status_message(current)
+    finally:
+        subscription.close()
+
+@router.get("/topics/{topic_id}/blueprints/{blueprint_id}/status/stream")
+async def stream_blueprint_status(
+    topic_id: UUID,
+    blueprint_id: UUID,
+    request: Request,
+    current_user: User = Depends(get_current_user),
+):
+    """Stream a blueprint's status changes as Server-Sent Events.
 
+    Sends a ``status`` event with the current status, shaped like the status
+    endpoint's response, then one per change as it is committed. The stream
+    ends once the generation has completed or failed.
+    """
+    # Subscribe before reading, so a change committed in between is not missed
+    subscription = get_blueprint_status_hub().subscribe(blueprint_id)
+    try:
+        async with get_session_maker()() as db:
+            current = await _read_blueprint_status(db, topic_id, blueprint_id)
+    except HTTPException:
+        subscription.close()
+        raise
     except Exception as e:
-        logger.error(f"Error in get_blueprint_status: {str(e)}")
+        subscription.close()
+        logger.error(f"Error in stream_blueprint_status: {str(e)}")
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=str(e)
         )
 
-def generate_blueprint_background(
+    return StreamingResponse(
+        _status_events(request, subscription, topic_id, current),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+@router.get("/blueprint-generation/stats")
+async def get_generation_stats(current_user: User = Depends(get_current_user)):
+    """Queue depth and running count of this process's blueprint generation runner.
+
+    ``response_cache`` counts crew response cache hits in thread mode; in
+    process mode each crew worker process keeps its own cache.
+    """
+    return {**get_generation_runner().stats, "response_cache": response_cache_stats()}
+
+def _run_blueprint_crew(inputs: dict) -> BlueprintPydantic:
+    """Run the blueprint crew in the calling thread."""
+    logger.info("Initializing BlueprintCrew...")
+    return BlueprintCrew(inputs=inputs).run()
+
+def build_objective_rows(
+    blueprint_id: UUID,
+    terminal_objectives: List,
+) -> Tuple[List[dict], List[dict]]:
+    """Rows for a generated objective tree, with ids assigned up front.
+
+    Enabling objective rows reference their terminal objective by the
+    generated id, so both tables can be written with one INSERT each.
+
+    Returns:
+        Tuple[List[dict], List[dict]]: Terminal objective rows and enabling objective rows
+    """
+    terminal_rows = []
+    enabling_rows = []
+    for to in terminal_objectives:
+        terminal_objective_id = uuid4()
+        terminal_rows.append({
+            "terminal_objective_id": terminal_objective_id,
+            "blueprint_id": blueprint_id,
+            "title": to.title,
+            "number": to.number,
+            "description": to.description,
+            "cognitive_level": to.cognitive_level,
+            "topic_id": None,
+        })
+        for eo in to.enabling_objectives:
+            enabling_rows.append({
+                "enabling_objective_id": uuid4(),
+                "terminal_objective_id": terminal_objective_id,
+                "title": eo.title,
+                "number": eo.number,
+                "description": eo.description,
+                "cognitive_level": eo.cognitive_level,
+            })
+    return terminal_rows, enabling_rows
+
+async def run_blueprint_generation(
     blueprint_id: UUID,
     topic_title: str,
     topic_description: str,
-    current_user_id: UUID,
+    bypass_cache: bool = False,
 ) -> None:
-    """Background task to generate a blueprint using the BlueprintCrew."""
-    import traceback
-    import asyncio
-    from sqlalchemy.ext.asyncio import AsyncSession
-    from sqlalchemy.ext.asyncio import create_async_engine
-    from sqlalchemy.ext.asyncio import async_sessionmaker
-    from ..core.database import DATABASE_URL
-    from ..core.models import Base, Blueprint, TerminalObjective, EnablingObjective
-
-    # Create async engine and session
-    async_engine = create_async_engine(str(DATABASE_URL))
-    AsyncSessionLocal = async_sessionmaker(bind=async_engine)
-
-    async def _generate_blueprint():
+    """Generate a blueprint with the BlueprintCrew; run by the generation runner.
+
+    Sessions come from the application's session maker and are only held
+    while reading or writing, never while the crew runs.
+    """
+    session_maker = get_session_maker()
+    try:
+        logger.info(f"Starting blueprint generation for topic {topic_title}")
+
+        # The generation timeout counts from when the job starts, not from when it was queued
+        async with session_maker() as session:
+            blueprint = await session.get(Blueprint, blueprint_id)
+            if blueprint is None or blueprint.status != "queued":
+                logger.info(f"Blueprint {blueprint_id} is no longer queued, skipping generation")
+                return
+            blueprint.status = "generating"
+            blueprint.generation_started_at = datetime.now(timezone.utc)
+            event = _blueprint_event(blueprint)
+            await notify_status(session, event)
+            await session.commit()
+        publish_status(event)
+
+        # Initialize inputs for blueprint crew
+        inputs = {
+            'topic': topic_title,
+            'description': topic_description,
+            'blueprint_id': blueprint_id,
+            'topic_id': None,
+            'bypass_cache': bypass_cache
+        }
+        if use_process_pool():
+            # Run the crew in a warm worker process
+            logger.info("Starting BlueprintCrew execution in crew process pool...")
+            blueprint_crew_result = await get_crew_pool().run_blueprint(inputs)
+        else:
+            logger.info("Starting BlueprintCrew execution...")
+            blueprint_crew_result = await get_generation_runner().run_blocking(_run_blueprint_crew, inputs)
+        logger.info("BlueprintCrew execution completed")
+        logger.debug(f"BlueprintCrew result: {blueprint_crew_result}")
+
+        # Save the objective tree with one multi-row INSERT per table and
+        # the blueprint's counts in the same transaction
+        terminal_rows, enabling_rows = build_objective_rows(blueprint_id, blueprint_crew_result.terminal_objectives)
+        event = status_event(
+            blueprint_id,
+            "completed",
+            blueprint_crew_result.title,
+            blueprint_crew_result.description,
+            len(terminal_rows),
+            len(enabling_rows),
+        )
+        async with session_maker() as session:
+            if terminal_rows:
+                await session.execute(insert(TerminalObjective).values(terminal_rows))
+            if enabling_rows:
+                await session.execute(insert(EnablingObjective).values(enabling_rows))
+            await session.execute(
+                update(Blueprint)
+                .where(Blueprint.blueprint_id == blueprint_id)
+                .values(
+                    status="completed",
+                    title=blueprint_crew_result.title,
+                    description=blueprint_crew_result.description,
+                    terminal_objectives_count=len(terminal_rows),
+                    enabling_objectives_count=len(enabling_rows),
+                )
+            )
+            await notify_status(session, event)
+            await session.commit()
+        publish_status(event)
+        logger.info(f"Successfully saved blueprint {blueprint_id}")
+
+    except Exception as e:
+        error_trace = traceback.format_exc()
+        logger.error(f"Error in blueprint generation: {str(e)}")
+        logger.error(f"Traceback: {error_trace}")
         try:
-            logger.info(f"Starting background blueprint generation for topic {topic_title}")
-            
-            async with AsyncSessionLocal() as session:
-                try:
-                    # Update blueprint status to generating
-                    result = await session.execute(
-                        select(Blueprint).filter(Blueprint.blueprint_id == blueprint_id)
-                    )
-                    blueprint = result.scalar_one()
-                    blueprint.status = "generating"
-                    await session.commit()
-                    
-                    # Initialize inputs for blueprint crew
-                    inputs = {
-                        'topic': topic_title,
-                        'description': topic_description,
-                        'blueprint_id': blueprint_id,
-                        'topic_id': None
-                    }
-                    logger.info("Initializing BlueprintCrew...")
-                    blueprint_crew = BlueprintCrew(inputs=inputs)
-                    
-                    # Run the crew to generate blueprint
-                    logger.info("Starting BlueprintCrew execution...")
-                    blueprint_crew_result = blueprint_crew.run()
-                    logger.info("BlueprintCrew execution completed")
-                    logger.debug(f"BlueprintCrew result: {blueprint_crew_result}")
-
-                    # Parse and save the result
-                    result = await session.execute(
-                        select(Blueprint).filter(Blueprint.blueprint_id == blueprint_id)
-                    )
-                    blueprint = result.scalar_one()
-                    blueprint.status = "completed"
-                    blueprint.title = blueprint_crew_result.title
-                    blueprint.description = blueprint_crew_result.description
-                    blueprint.terminal_objectives_count = len(blueprint_crew_result.terminal_objectives)
-                    blueprint.enabling_objectives_count = sum(len(to.enabling_objectives) for to in blueprint_crew_result.terminal_objectives)
-                    
-                    # Save the terminal objectives
-                    for to in blueprint_crew_result.terminal_objectives:
-                        terminal_obj = TerminalObjective(
-                            blueprint_id=blueprint_id,
-                            title=to.title,
-                            number=to.number,
-                            description=to.description,
-                            cognitive_level=to.cognitive_level,
-                            topic_id=None,
-                            enabling_objectives=[]
-                        )
-                        session.add(terminal_obj)
-                        await session.flush()  # Get the ID
-                        
-                        # Save the enabling objectives
-                        for eo in to.enabling_objectives:
-                            enabling_obj = EnablingObjective(
-                                terminal_objective_id=terminal_obj.terminal_objective_id,
-                                title=eo.title,
-                                number=eo.number,
-                                description=eo.description,
-                                cognitive_level=eo.cognitive_level
-                            )
-                            session.add(enabling_obj)
-                    
-                    await session.commit()
-                    logger.info(f"Successfully saved blueprint {blueprint_id}")
-                    
-                except Exception as e:
-                    error_trace = traceback.format_exc()
-                    logger.error(f"Error in blueprint generation: {str(e)}")
-                    logger.error(f"Traceback: {error_trace}")
-                    try:
-                        result = await session.execute(
-                            select(Blueprint).filter(Blueprint.blueprint_id == blueprint_id)
-                        )
-                        blueprint = result.scalar_one()
-                        blueprint.status = "error"
-                        blueprint.description = f"Error generating blueprint: {str(e)}"
-                        blueprint.error_details = error_trace
-                        await session.commit()
-                    except Exception as db_error:
-                        logger.error(f"Failed to update blueprint error status: {str(db_error)}")
-                    raise
-                    
-        except Exception as e:
-            error_trace = traceback.format_exc()
-            logger.error(f"Critical error in generate_blueprint_background: {str(e)}")
-            logger.error(f"Traceback: {error_trace}")
-            # Try one last time to update the blueprint status
-            try:
-                async with AsyncSessionLocal() as session:
-                    result = await session.execute(
-                        select(Blueprint).filter(Blueprint.blueprint_id == blueprint_id)
-                    )
-                    blueprint = result.scalar_one()
-                    blueprint.status = "error"
-                    blueprint.description = f"Critical error in blueprint generation: {str(e)}"
-                    blueprint.error_details = error_trace
-                    await session.commit()
-            except Exception as final_e:
-                logger.error(f"Failed to update blueprint status after error: {str(final_e)}")
-
-    # Create event loop and run the async function
-    loop = asyncio.new_event_loop()
-    asyncio.set_event_loop(loop)
-    loop.run_until_complete(_generate_blueprint())
-    loop.close()
+            async with session_maker() as session:
+                blueprint = await session.get(Blueprint, blueprint_id)
+                blueprint.status = "error"
+                blueprint.description = f"Error generating blueprint: {str(e)}"
+                blueprint.error_details = error_trace
+                event = _blueprint_event(blueprint)
+                await notify_status(session, event)
+                await session.commit()
+            publish_status(event)
+        except Exception as db_error:
+            logger.error(f"Failed to update blueprint error status: {str(db_error)}")
+        raise
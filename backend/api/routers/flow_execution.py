@@ -2,13 +2,23 @@
 
 import logging
 from typing import List, Optional
-from fastapi import APIRouter, Depends, HTTPException, Header
+from fastapi import APIRouter, Depends, HTTPException, Header, Query
+from pydantic import UUID4
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
 from sqlalchemy.orm import joinedload
 
 from ..core.database import get_db
-from ..core.models import FlowExecution, FlowLog, User
+from ..core.models import FlowExecution, FlowExecutionStatus, FlowLog, User
+from ..flows.flow_wrapper import (
+    FlowBatch,
+    FlowBatchCreate,
+    FlowBatchProgress,
+    FlowExecutionPage,
+    FlowWrapper,
+    get_flow_wrapper
+)
+from ..flows.pagination import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE
 from ..auth import get_current_user
 from .schemas import (
     FlowExecutionCreate,
@@ -26,18 +36,49 @@ router = APIRouter(
     tags=["flow-executions"]
 )
 
-@router.get("/", response_model=List[FlowExecutionResponse])
+@router.get("/", response_model=FlowExecutionPage, response_model_exclude_unset=True)
 async def get_flow_executions(
+    status: Optional[FlowExecutionStatus] = None,
+    flow_name: Optional[str] = None,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
     current_user: User = Depends(get_current_user),
-    db: AsyncSession = Depends(get_db)
-) -> List[FlowExecution]:
-    """Get all flow executions for the current user"""
-    result = await db.execute(
-        select(FlowExecution)
-        .filter(FlowExecution.user_id == current_user.user_id)
-        .options(joinedload(FlowExecution.logs))
+    flow_wrapper: FlowWrapper = Depends(get_flow_wrapper)
+) -> FlowExecutionPage:
+    """Get one page of the current user's flow executions, newest first.
+
+    Only summary columns are loaded; fetch a single execution for its state and logs.
+    Pass the returned next_cursor to get the following page.
+    """
+    return await flow_wrapper.list_executions(
+        status=status,
+        flow_name=flow_name,
+        user_id=current_user.user_id,
+        limit=limit,
+        cursor=cursor
     )
-    return result.scalars().all()
+
+@router.post("/batch", response_model=FlowBatch, status_code=201)
+async def create_flow_batch(
+    batch_create: FlowBatchCreate,
+    current_user: User = Depends(get_current_user),
+    flow_wrapper: FlowWrapper = Depends(get_flow_wrapper)
+) -> FlowBatch:
+    """Create and queue one execution per initial state.
+
+    All executions are inserted in one transaction and queued together; poll
+    GET /flow-executions/batch/{batch_id} for aggregate progress.
+    """
+    return await flow_wrapper.create_batch(batch_create, current_user.user_id)
+
+@router.get("/batch/{batch_id}", response_model=FlowBatchProgress)
+async def get_flow_batch(
+    batch_id: UUID4,
+    current_user: User = Depends(get_current_user),
+    flow_wrapper: FlowWrapper = Depends(get_flow_wrapper)
+) -> FlowBatchProgress:
+    """Get execution counts per status for a batch"""
+    return await flow_wrapper.get_batch(batch_id, current_user.user_id)
 
 @router.post("/", response_model=FlowExecutionResponse, status_code=201)
 async def create_flow_execution(
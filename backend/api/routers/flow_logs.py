@@ -1,65 +1,234 @@
-from typing import AsyncGenerator
+import asyncio
 from fastapi import APIRouter, WebSocket, Depends, HTTPException, Query
+from fastapi.responses import StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, text
-from ..database import get_db
-from ..models import FlowLog, LogLevel, FlowExecution as DBFlowExecution
+from sqlalchemy import select, tuple_
+from ..core.database import get_db, get_session_maker
+from ..core.models import FlowLog, LogLevel, FlowExecution as DBFlowExecution, User
 from ..auth import get_current_user, verify_token
+from ..flows.log_archive import filter_archived_logs, iter_archived_logs, load_archive
+from ..flows.log_hub import LogSubscription, get_log_hub
+from ..flows.pagination import decode_cursor, encode_cursor
 import json
 import logging
 from datetime import datetime
+from itertools import islice
+from typing import AsyncGenerator, Optional, Set, Tuple
+from uuid import UUID
 from urllib.parse import unquote
 
 router = APIRouter()
 logger = logging.getLogger(__name__)
 
-async def get_logs(db: AsyncSession, execution_id: str) -> list[dict]:
-    """Get all logs for a flow execution."""
-    result = await db.execute(
-        select(FlowLog)
-        .where(FlowLog.execution_id == execution_id)
-        .order_by(FlowLog.timestamp)
-    )
-    logs = result.scalars().all()
-    return [log.to_dict() for log in logs]
+async def resolve_log_cursor(
+    db: AsyncSession,
+    execution_id: str,
+    cursor: Optional[str] = None,
+    after: Optional[str] = None
+) -> Optional[Tuple[datetime, UUID]]:
+    """Turn a resume point into a (timestamp, id) position.
+
+    Args:
+        cursor: The ``cursor`` of the last line the client has seen
+        after: The ``id`` of the last line the client has seen
+
+    Raises:
+        ValueError: If the cursor or id is malformed
+    """
+    if cursor:
+        return decode_cursor(cursor)
+    if after:
+        log_id = UUID(after)
+        result = await db.execute(
+            select(FlowLog.timestamp).where(FlowLog.id == log_id, FlowLog.execution_id == execution_id)
+        )
+        timestamp = result.scalar_one_or_none()
+        if timestamp is None:
+            archive = await load_archive(db, execution_id)
+            if archive is not None:
+                for line in iter_archived_logs(archive):
+                    if line["id"] == str(log_id):
+                        return decode_cursor(line["cursor"])
+        # Unknown ids replay the full history rather than skipping lines
+        return (timestamp, log_id) if timestamp is not None else None
+    return None
+
+# Levels from least to most severe, for minimum-level filters
+LEVEL_ORDER = [LogLevel.DEBUG, LogLevel.INFO, LogLevel.WARNING, LogLevel.ERROR]
+
+# Rows fetched per round trip when streaming an export
+EXPORT_FETCH_SIZE = 1000
+
+def level_values(min_level: Optional[LogLevel]) -> Optional[Set[str]]:
+    """Level values at or above a minimum level, or None for all levels."""
+    if min_level is None:
+        return None
+    return {level.value for level in LEVEL_ORDER[LEVEL_ORDER.index(min_level):]}
+
+def build_log_query(
+    execution_id: str,
+    position: Optional[Tuple[datetime, UUID]] = None,
+    min_level: Optional[LogLevel] = None,
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+    through: Optional[Tuple[datetime, UUID]] = None
+):
+    """Select an execution's logs in (timestamp, id) order with every filter in SQL.
+
+    Reads the (execution_id, timestamp, id) index, so resuming costs only the new lines.
+    """
+    stmt = select(FlowLog).where(FlowLog.execution_id == execution_id)
+    if position is not None:
+        stmt = stmt.where(tuple_(FlowLog.timestamp, FlowLog.id) > tuple_(*position))
+    if through is not None:
+        stmt = stmt.where(tuple_(FlowLog.timestamp, FlowLog.id) <= tuple_(*through))
+    if min_level is not None:
+        stmt = stmt.where(FlowLog.level.in_(LEVEL_ORDER[LEVEL_ORDER.index(min_level):]))
+    if since is not None:
+        stmt = stmt.where(FlowLog.timestamp >= since)
+    if until is not None:
+        stmt = stmt.where(FlowLog.timestamp < until)
+    return stmt.order_by(FlowLog.timestamp, FlowLog.id)
+
+def log_to_dict(log: FlowLog) -> dict:
+    return {**log.to_dict(), "cursor": encode_cursor(log.timestamp, log.id)}
+
+async def get_logs(
+    db: AsyncSession,
+    execution_id: str,
+    position: Optional[Tuple[datetime, UUID]] = None,
+    limit: Optional[int] = None,
+    min_level: Optional[LogLevel] = None,
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+    through: Optional[Tuple[datetime, UUID]] = None
+) -> list[dict]:
+    """Get the logs of a flow execution, optionally only those after a position
+    and up to the position ``through``.
+
+    Archived lines come first; they are older than any line still in flow_logs.
+    """
+    logs = []
+    archive = await load_archive(db, execution_id)
+    if archive is not None:
+        archived = filter_archived_logs(iter_archived_logs(archive), position, level_values(min_level), since, until, through)
+        logs = list(islice(archived, limit) if limit else archived)
+        if limit and len(logs) >= limit:
+            return logs
+    stmt = build_log_query(execution_id, position, min_level, since, until, through)
+    if limit:
+        stmt = stmt.limit(limit - len(logs))
+    result = await db.execute(stmt)
+    logs.extend(log_to_dict(log) for log in result.scalars().all())
+    return logs
+
+async def export_logs_ndjson(
+    execution_id: str,
+    position: Optional[Tuple[datetime, UUID]] = None,
+    limit: Optional[int] = None,
+    min_level: Optional[LogLevel] = None,
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None
+) -> AsyncGenerator[str, None]:
+    """Stream an execution's logs as NDJSON, live rows through a server-side cursor.
+
+    Runs in its own session because the response body is produced after the
+    request's dependencies have been torn down. Only one fetch of rows (or the
+    compressed archive) is held in memory at a time.
+    """
+    sent = 0
+    async with get_session_maker()() as db:
+        archive = await load_archive(db, execution_id)
+        if archive is not None:
+            archived = filter_archived_logs(iter_archived_logs(archive), position, level_values(min_level), since, until)
+            for chunk in iter(lambda: list(islice(archived, EXPORT_FETCH_SIZE)), []):
+                if limit:
+                    chunk = chunk[:limit - sent]
+                sent += len(chunk)
+                yield "".join(json.dumps(line, default=str) + "\n" for line in chunk)
+                if limit and sent >= limit:
+                    return
+        stmt = build_log_query(execution_id, position, min_level, since, until)
+        if limit:
+            stmt = stmt.limit(limit - sent)
+        result = await db.stream(stmt.execution_options(yield_per=EXPORT_FETCH_SIZE))
+        async for partition in result.scalars().partitions():
+            yield "".join(json.dumps(log_to_dict(log), default=str) + "\n" for log in partition)
+            # Rows of the sent partition are no longer needed
+            db.expunge_all()
+
+async def stream_logs(websocket: WebSocket, subscription: LogSubscription, sent_ids: set) -> None:
+    """Forward live log lines to the WebSocket until the client disconnects."""
+    receiver = asyncio.ensure_future(websocket.receive())
+    try:
+        while True:
+            getter = asyncio.ensure_future(subscription.get())
+            done, _ = await asyncio.wait({receiver, getter}, return_when=asyncio.FIRST_COMPLETED)
+            if getter in done:
+                log = getter.result()
+                # Lines stored while the history was loading arrive both ways
+                if log.get("id") not in sent_ids:
+                    await websocket.send_json(log)
+            else:
+                getter.cancel()
+            if receiver in done:
+                if receiver.result()["type"] == "websocket.disconnect":
+                    return
+                receiver = asyncio.ensure_future(websocket.receive())
+    finally:
+        receiver.cancel()
 
 @router.websocket("/api/flows/executions/{execution_id}/logs/ws")
 async def websocket_logs(
     websocket: WebSocket,
     execution_id: str,
     token: str = Query(...),
-    db: AsyncSession = Depends(get_db)
+    cursor: Optional[str] = Query(None, description="Cursor of the last line already received"),
+    after: Optional[str] = Query(None, description="Id of the last line already received")
 ):
-    """WebSocket endpoint for streaming flow execution logs."""
+    """WebSocket endpoint for streaming flow execution logs.
+
+    Database sessions are only held while authenticating and loading the
+    history; live lines come from the process-wide log notification hub.
+    When the execution is running in this process, recent history is
+    replayed from the hub's in-memory ring and only older lines are read
+    from the database.
+    Reconnecting clients pass the ``cursor`` (or ``id`` as ``after``) of the
+    last line they received and only get newer lines.
+    """
+    subscription = None
+    session_maker = get_session_maker()
     try:
         # Accept connection first to allow proper error responses
         await websocket.accept()
-        
+
         # Log token details for debugging
         logger.debug(f"Raw token: {token}")
         logger.debug(f"Token length: {len(token) if token else 0}")
-        
+
         # URL decode the token and remove Bearer prefix if present
         decoded_token = unquote(token)
         if decoded_token.startswith('Bearer '):
             decoded_token = decoded_token.replace('Bearer ', '')
-        
+
         logger.debug(f"Decoded token: {decoded_token}")
         logger.debug(f"Decoded token length: {len(decoded_token)}")
-        
+
         # Verify token
         try:
-            user_id = await verify_token(decoded_token)
-            if not user_id:
+            async with session_maker() as db:
+                user = await verify_token(decoded_token, db)
+            if not user:
                 logger.warning(f"Token verification failed for execution {execution_id}")
                 await websocket.send_text(json.dumps({
                     "error": "Invalid authentication token"
                 }))
                 await websocket.close(code=4001)
                 return
-                
+            user_id = user.user_id
+
             logger.info(f"WebSocket authenticated for user {user_id}, execution {execution_id}")
-            
+
         except Exception as e:
             logger.error(f"Token verification error: {str(e)}", exc_info=True)
             await websocket.send_text(json.dumps({
@@ -67,16 +236,17 @@ async def websocket_logs(
             }))
             await websocket.close(code=4001)
             return
-            
+
         # Verify execution belongs to user
         try:
-            stmt = select(DBFlowExecution).where(
-                DBFlowExecution.id == execution_id,
-                DBFlowExecution.user_id == user_id
-            )
-            result = await db.execute(stmt)
-            execution = result.scalar_one_or_none()
-            
+            async with session_maker() as db:
+                stmt = select(DBFlowExecution.id).where(
+                    DBFlowExecution.id == execution_id,
+                    DBFlowExecution.user_id == user_id
+                )
+                result = await db.execute(stmt)
+                execution = result.scalar_one_or_none()
+
             if not execution:
                 logger.warning(f"Execution {execution_id} not found or does not belong to user {user_id}")
                 await websocket.send_text(json.dumps({
@@ -91,14 +261,39 @@ async def websocket_logs(
             }))
             await websocket.close(code=4005)
             return
-            
-        # First send existing logs
+
+        try:
+            async with session_maker() as db:
+                position = await resolve_log_cursor(db, execution_id, cursor, after)
+        except ValueError as e:
+            await websocket.send_text(json.dumps({
+                "error": f"Invalid cursor: {str(e)}"
+            }))
+            await websocket.close(code=4000)
+            return
+
+        # Subscribe and snapshot the in-memory ring together, before loading
+        # history from the database, so no line falls between the three
+        hub = get_log_hub()
+        subscription = hub.subscribe(execution_id)
+        recent = hub.replay(execution_id, position)
+
+        # First send the lines logged since the client's last position
+        sent_ids = set()
         try:
-            logs = await get_logs(db, execution_id)
+            if recent is not None and position is not None and position >= recent[0]:
+                # Everything after the client's position is still in memory
+                logs = recent[1]
+            else:
+                async with session_maker() as db:
+                    logs = await get_logs(db, execution_id, position, through=recent[0] if recent else None)
+                if recent is not None:
+                    logs.extend(recent[1])
             if logs:
                 for log in logs:
                     await websocket.send_json(log)
-            else:
+                    sent_ids.add(log["id"])
+            elif position is None:
                 await websocket.send_json({
                     "level": "INFO",
                     "message": "No logs available yet",
@@ -112,28 +307,9 @@ async def websocket_logs(
                 "timestamp": str(datetime.utcnow())
             })
 
-        # Listen for new logs using PostgreSQL LISTEN/NOTIFY
-        async with db.connection() as conn:
-            await conn.execute(text(f"LISTEN flow_logs_{execution_id}"))
-            
-            while True:
-                try:
-                    msg = await conn.driver_connection.notifies.get()
-                    
-                    try:
-                        payload = json.loads(msg.payload)
-                        if payload["execution_id"] == execution_id:
-                            await websocket.send_json(payload["log"])
-                    except json.JSONDecodeError:
-                        logger.warning(f"Invalid JSON in notification: {msg.payload}")
-                        continue
-                    except KeyError:
-                        logger.warning(f"Missing required fields in notification: {msg.payload}")
-                        continue
-                except Exception as e:
-                    logger.error(f"Error processing notification: {str(e)}", exc_info=True)
-                    continue
-                
+        # Then forward new logs as the hub receives their notifications
+        await stream_logs(websocket, subscription, sent_ids)
+
     except Exception as e:
         logger.error(f"WebSocket error for execution {execution_id}: {str(e)}", exc_info=True)
         try:
@@ -145,6 +321,8 @@ async def websocket_logs(
         except:
             pass
     finally:
+        if subscription is not None:
+            subscription.close()
         try:
             await websocket.close()
         except:
@@ -153,8 +331,39 @@ async def websocket_logs(
 @router.get("/api/flows/executions/{execution_id}/logs")
 async def get_execution_logs(
     execution_id: str,
+    cursor: Optional[str] = Query(None, description="Only return lines after this cursor"),
+    after: Optional[str] = Query(None, description="Only return lines after the line with this id"),
+    limit: Optional[int] = Query(None, ge=1, le=10000),
+    level: Optional[LogLevel] = Query(None, description="Only return lines at this level or more severe"),
+    since: Optional[datetime] = Query(None, description="Only return lines logged at or after this time"),
+    until: Optional[datetime] = Query(None, description="Only return lines logged before this time"),
+    format: str = Query("json", pattern="^(json|ndjson)$", description="ndjson streams one line per log"),
     db: AsyncSession = Depends(get_db),
-    current_user = Depends(get_current_user)
+    current_user: User = Depends(get_current_user)
 ):
-    """Get all logs for a flow execution (REST fallback)."""
-    return await get_logs(db, execution_id)
+    """Get the logs of a flow execution (REST fallback and export).
+
+    Every line carries a ``cursor``; pass the last one back to fetch only newer lines.
+    With ``format=ndjson`` the lines are streamed from a server-side cursor, so
+    memory use does not grow with the size of the log.
+    """
+    result = await db.execute(
+        select(DBFlowExecution.id).where(
+            DBFlowExecution.id == execution_id,
+            DBFlowExecution.user_id == current_user.user_id
+        )
+    )
+    if result.scalar_one_or_none() is None:
+        raise HTTPException(status_code=404, detail="Execution not found")
+    try:
+        position = await resolve_log_cursor(db, execution_id, cursor, after)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    if format == "ndjson":
+        return StreamingResponse(
+            export_logs_ndjson(execution_id, position, limit, level, since, until),
+            media_type="application/x-ndjson",
+            headers={"Content-Disposition": f'attachment; filename="flow-{execution_id}-logs.ndjson"'}
+        )
+    return await get_logs(db, execution_id, position, limit, level, since, until)
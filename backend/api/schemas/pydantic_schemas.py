@@ -180,12 +180,14 @@ class BlueprintPydantic(BaseModel):
 class BlueprintStatusResponse(BaseModel):
     """Response model for blueprint status endpoint."""
     id: UUID4
-    status: str = Field(..., description="Current status of the blueprint (draft, generating, completed, error)")
+    status: str = Field(..., description="Current status of the blueprint (draft, queued, generating, completed, error)")
     title: str = Field(..., min_length=3, max_length=255)
     description: str = Field(..., min_length=10)
     terminal_objectives_count: int = Field(default=0)
     enabling_objectives_count: int = Field(default=0)
     error_details: Optional[str] = Field(None, description="Detailed error information if status is 'error'")
+    queue_position: Optional[int] = Field(None, description="Generations that start before this one, if status is 'queued'")
+    estimated_wait_seconds: Optional[float] = Field(None, description="Estimated seconds until the generation starts, if status is 'queued'")
     model_config = ConfigDict(from_attributes=True)
 
 class QuestionOption(BaseModel):
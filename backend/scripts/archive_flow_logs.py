@@ -0,0 +1,46 @@
+"""Archive the logs of finished flow executions into compressed blobs.
+
+Usage:
+    python scripts/archive_flow_logs.py [--older-than-days N] [--limit N]
+
+Defaults come from the QUIZMASTER_FLOW_LOG_ARCHIVE_* settings. Archived lines
+are still returned by the log API.
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+
+# Add parent directory to path so we can import from api
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from api.core.config import get_settings
+from api.core.database import get_engine
+from api.flows.log_archive import archive_cold_logs
+
+
+async def run(older_than_days: int, limit: int):
+    totals = {"executions": 0, "rows": 0}
+    while True:
+        stats = await archive_cold_logs(older_than_days, limit)
+        totals["executions"] += stats["executions"]
+        totals["rows"] += stats["rows"]
+        if stats["executions"] < limit:
+            break
+    print(f"Archived {totals['rows']} log lines of {totals['executions']} executions")
+    await get_engine().dispose()
+
+
+def main():
+    settings = get_settings()
+    parser = argparse.ArgumentParser(description="Archive cold flow logs")
+    parser.add_argument("--older-than-days", type=int, default=settings.flow_log_archive_after_days)
+    parser.add_argument("--limit", type=int, default=settings.flow_log_archive_batch_size,
+                        help="Executions archived per transaction batch")
+    args = parser.parse_args()
+    asyncio.run(run(args.older_than_days, args.limit))
+
+
+if __name__ == "__main__":
+    main()
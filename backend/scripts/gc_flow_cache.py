@@ -0,0 +1,36 @@
+"""Prune the on-disk flow result cache by age and total size.
+
+Usage:
+    python scripts/gc_flow_cache.py [--max-bytes N] [--max-age SECONDS]
+
+Defaults come from the QUIZMASTER_FLOW_CACHE_DISK_* settings.
+"""
+
+import argparse
+import os
+import sys
+
+# Add parent directory to path so we can import from api
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from api.core.config import get_settings
+from api.flows.disk_cache import FlowResultDiskStore
+
+
+def main():
+    settings = get_settings()
+    project_root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    parser = argparse.ArgumentParser(description="Prune the flow result cache")
+    parser.add_argument("--cache-dir", default=os.path.join(project_root, "cache", "flows"))
+    parser.add_argument("--max-bytes", type=int, default=settings.flow_cache_disk_max_bytes)
+    parser.add_argument("--max-age", type=int, default=settings.flow_cache_disk_max_age)
+    args = parser.parse_args()
+
+    store = FlowResultDiskStore(args.cache_dir)
+    stats = store.gc(max_bytes=args.max_bytes or None, max_age=args.max_age or None)
+    print(f"Removed {stats['removed']} files ({stats['removed_bytes']} bytes), "
+          f"{stats['entries']} entries ({stats['bytes']} bytes) remain")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,40 @@
+"""Create upcoming flow_logs partitions and drop expired ones.
+
+Usage:
+    python scripts/maintain_flow_log_partitions.py [--convert]
+
+--convert replaces an existing unpartitioned flow_logs table with a
+partitioned one first. It locks the table while the rows are copied.
+Partition interval and retention come from the QUIZMASTER_FLOW_LOG_* settings.
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+
+# Add parent directory to path so we can import from api
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from api.core.database import get_engine
+from api.core.log_partitions import convert_to_partitioned, maintain_partitions
+
+
+async def run(convert: bool):
+    async with get_engine().begin() as conn:
+        if convert:
+            await convert_to_partitioned(conn)
+        result = await maintain_partitions(conn)
+    print(f"Created {len(result['created'])} partitions, dropped {len(result['dropped'])}")
+    await get_engine().dispose()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Maintain flow_logs partitions")
+    parser.add_argument("--convert", action="store_true", help="Partition an existing unpartitioned flow_logs table")
+    args = parser.parse_args()
+    asyncio.run(run(args.convert))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,63 @@
+"""Run flow execution queue workers outside the API process.
+
+Usage:
+    python scripts/run_flow_worker.py --workers 4
+    python scripts/run_flow_worker.py api.flows.flow_wrapper:get_flow_wrapper --workers 4
+
+The target is a ``module:attribute`` path to the FlowWrapper whose flows are
+registered, or to a function returning it. It defaults to
+``get_flow_wrapper``, the process-wide wrapper the API uses. Importing the
+``api`` package imports ``api.main``, so flows registered there are
+registered in the worker too.
+"""
+
+import argparse
+import asyncio
+import importlib
+import logging
+import os
+import sys
+
+# Add parent directory to path so we can import from api
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from api.flows.execution_queue import FlowExecutionQueue
+from api.flows.flow_wrapper import FlowWrapper
+
+
+DEFAULT_TARGET = "api.flows.flow_wrapper:get_flow_wrapper"
+
+
+def load_flow_wrapper(target: str):
+    """Import the FlowWrapper referenced by ``module:attribute``, calling it if it is a factory."""
+    module_name, _, attribute = target.partition(":")
+    if not attribute:
+        raise ValueError(f"Expected 'module:attribute', got '{target}'")
+    module = importlib.import_module(module_name)
+    flow_wrapper = getattr(module, attribute)
+    if not isinstance(flow_wrapper, FlowWrapper) and callable(flow_wrapper):
+        flow_wrapper = flow_wrapper()
+    return flow_wrapper
+
+
+async def main():
+    parser = argparse.ArgumentParser(description="Run flow execution queue workers")
+    parser.add_argument(
+        "target",
+        nargs="?",
+        default=DEFAULT_TARGET,
+        help=f"module:attribute path to the FlowWrapper or a function returning it (default: {DEFAULT_TARGET})"
+    )
+    parser.add_argument("--workers", type=int, default=None, help="Number of worker tasks (defaults to settings)")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    queue = FlowExecutionQueue(load_flow_wrapper(args.target), worker_count=args.workers)
+    await queue.run_forever()
+
+
+if __name__ == "__main__":
+    try:
+        asyncio.run(main())
+    except KeyboardInterrupt:
+        pass
@@ -0,0 +1,70 @@
+import { NextResponse } from 'next/server';
+import { getServerSession } from 'next-auth';
+import { authOptions } from '@/app/api/auth/[...nextauth]/route';
+import { mockAuthConfig } from '@/app/api/auth/[...nextauth]/mock-provider';
+
+const authConfig = process.env.NODE_ENV === 'development' ? mockAuthConfig : authOptions;
+
+// Server-Sent Events must not be cached or buffered
+export const dynamic = 'force-dynamic';
+
+export async function GET(
+  request: Request,
+  { params }: { params: { topicId: string; blueprintId: string } }
+) {
+  try {
+    const session = await getServerSession(authConfig);
+    if (!session?.accessToken) {
+      return new NextResponse('Unauthorized', { status: 401 });
+    }
+
+    const backendUrl = process.env.BACKEND_URL;
+    if (!backendUrl) {
+      console.error('BACKEND_URL environment variable is not set');
+      return new NextResponse('Server configuration error', { status: 500 });
+    }
+
+    const response = await fetch(
+      `${backendUrl}/api/topics/${params.topicId}/blueprints/${params.blueprintId}/status/stream`,
+      {
+        headers: {
+          'Authorization': `Bearer ${session.accessToken}`,
+          'Accept': 'text/event-stream',
+        },
+        cache: 'no-store',
+        // Closing the browser's EventSource closes the backend stream
+        signal: request.signal,
+      }
+    );
+
+    if (!response.ok || !response.body) {
+      const errorText = await response.text();
+      console.error(`API error (${response.status}):`, errorText);
+      if (response.status === 404) {
+        return NextResponse.json(
+          { error: 'Blueprint not found' },
+          { status: 404 }
+        );
+      }
+      return NextResponse.json(
+        { error: 'Failed to stream blueprint status' },
+        { status: response.status }
+      );
+    }
+
+    // Pass the event stream through as it arrives
+    return new Response(response.body, {
+      headers: {
+        'Content-Type': 'text/event-stream',
+        'Cache-Control': 'no-cache',
+        'Connection': 'keep-alive',
+      },
+    });
+  } catch (error) {
+    console.error('Error streaming blueprint status:', error);
+    return NextResponse.json(
+      { error: 'Internal server error' },
+      { status: 500 }
+    );
+  }
+}
@@ -29,9 +29,11 @@ export async function POST(
     if (!response.ok) {
       const errorText = await response.text()
       console.error('Backend API error:', response.status, errorText)
+      // Keep Retry-After so the client knows when to retry a 429
+      const retryAfter = response.headers.get('Retry-After')
       return NextResponse.json(
         { error: 'Failed to generate blueprint' },
-        { status: response.status }
+        { status: response.status, headers: retryAfter ? { 'Retry-After': retryAfter } : undefined }
       )
     }
 
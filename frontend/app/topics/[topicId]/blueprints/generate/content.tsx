@@ -1,6 +1,6 @@
 'use client';
 
-import { useEffect, useState } from 'react';
+import { useEffect, useRef, useState } from 'react';
 import { useParams, useRouter } from 'next/navigation';
 import {
     Card,
@@ -17,9 +17,8 @@ import {
 import { BlueprintStatus } from '@/src/types/blueprint';
 import { useQueryClient } from '@tanstack/react-query';
 
-const POLL_INTERVAL = 5000; // 5 seconds
 const MAX_RETRIES = 100;
-const RETRY_DELAY = 5000; // Constant 5 second delay between retries
+const RETRY_DELAY = 5000; // Constant 5 second delay between reconnects
 
 const calculateProgress = (status: BlueprintStatus | null): number => {
     if (!status) return 0;
@@ -32,6 +31,7 @@ const calculateProgress = (status: BlueprintStatus | null): number => {
         case 'archived':
             return 0;
         case 'draft':
+        case 'queued':
             return 5;
         case 'generating':
             // Calculate progress based on objectives count
@@ -55,17 +55,18 @@ export function BlueprintGenerationContent({ initialBlueprintId }: BlueprintGene
     const [status, setStatus] = useState<BlueprintStatus | null>(null);
     const [isGenerating, setIsGenerating] = useState(false);
     const [blueprintId, setBlueprintId] = useState<string | null>(initialBlueprintId || null);
+    const eventSourceRef = useRef<EventSource | null>(null);
 
     const topicId = params.topicId as string;
 
     useEffect(() => {
         if (initialBlueprintId) {
-            console.log('🔄 Starting polling for existing blueprint:', initialBlueprintId);
+            console.log('🔄 Watching existing blueprint:', initialBlueprintId);
             setBlueprintId(initialBlueprintId);
             setIsGenerating(true);
         }
         return () => {
-            console.log('⏹️ Cleaning up - stopping polling');
+            console.log('⏹️ Cleaning up - closing status stream');
             setIsGenerating(false);
             setBlueprintId(null);
         };
@@ -73,9 +74,9 @@ export function BlueprintGenerationContent({ initialBlueprintId }: BlueprintGene
 
     useEffect(() => {
         if (isGenerating && blueprintId) {
-            console.log('🔄 Starting polling for blueprint:', blueprintId);
-            pollStatus(blueprintId, 0);
+            watchStatus(blueprintId);
         }
+        return () => stopWatching();
     }, [isGenerating, blueprintId]);
 
     const startGeneration = async () => {
@@ -87,6 +88,22 @@ export function BlueprintGenerationContent({ initialBlueprintId }: BlueprintGene
                 method: 'POST',
             });
 
+            if (response.status === 429) {
+                // Too many generations queued; the server says when to try again
+                const retryAfter = response.headers.get('Retry-After');
+                toast({
+                    title: 'Too Many Generations',
+                    description: retryAfter
+                        ? `Too many blueprint generations are queued. Please try again in about ${Math.ceil(Number(retryAfter) / 60)} minute(s).`
+                        : 'Too many blueprint generations are queued. Please try again later.',
+                    status: 'warning',
+                    duration: 5000,
+                    isClosable: true,
+                });
+                setIsGenerating(false);
+                return;
+            }
+
             if (!response.ok) {
                 throw new Error(`Failed to start blueprint generation: ${response.status}`);
             }
@@ -108,9 +125,9 @@ export function BlueprintGenerationContent({ initialBlueprintId }: BlueprintGene
                 console.log('🆕 Starting new generation process');
             }
             
-            setBlueprintId(data.id);
+            // Setting the id opens the status stream; the backend returns the blueprint's id as blueprint_id
+            setBlueprintId(data.blueprint_id ?? data.id);
             setStatus(data);
-            pollStatus(data.id);
         } catch (error) {
             console.error('❌ Generation error:', error);
             toast({
@@ -124,25 +141,23 @@ export function BlueprintGenerationContent({ initialBlueprintId }: BlueprintGene
         }
     };
 
-    const pollStatus = async (blueprintId: string, retryCount = 0) => {
-        if (!isGenerating || !blueprintId) {
-            console.log('⏹️ Polling stopped - generation inactive or no blueprint ID');
-            return;
-        }
+    const stopWatching = () => {
+        eventSourceRef.current?.close();
+        eventSourceRef.current = null;
+    };
 
-        try {
-            console.log(`📊 Polling status for blueprint: ${blueprintId} (attempt ${retryCount + 1})`);
-            const response = await fetch(`/api/topics/${topicId}/blueprints/${encodeURIComponent(blueprintId)}/status`, {
-                headers: {
-                    'Content-Type': 'application/json',
-                },
-            });
-            
-            if (!response.ok) {
-                throw new Error(`Failed to fetch blueprint status: ${response.status}`);
-            }
+    const watchStatus = (blueprintId: string, retryCount = 0) => {
+        stopWatching();
+        console.log(`📡 Watching status stream for blueprint: ${blueprintId} (attempt ${retryCount + 1})`);
+        const source = new EventSource(
+            `/api/topics/${topicId}/blueprints/${encodeURIComponent(blueprintId)}/status/stream`
+        );
+        eventSourceRef.current = source;
 
-            const data = await response.json();
+        // The server sends the current status first, then each change as it happens
+        source.addEventListener('status', (event) => {
+            retryCount = 0;
+            const data: BlueprintStatus = JSON.parse((event as MessageEvent).data);
             console.log('📈 Status update:', {
                 status: data.status,
                 terminal_objectives: data.terminal_objectives_count,
@@ -153,6 +168,7 @@ export function BlueprintGenerationContent({ initialBlueprintId }: BlueprintGene
 
             if (data.status === 'completed') {
                 console.log('✨ Generation completed successfully!');
+                stopWatching();
                 setIsGenerating(false);
                 toast({
                     title: 'Success',
@@ -163,29 +179,35 @@ export function BlueprintGenerationContent({ initialBlueprintId }: BlueprintGene
                 });
                 queryClient.invalidateQueries({ queryKey: ['blueprints', topicId] });
                 router.push(`/topics/${topicId}/blueprints/${blueprintId}`);
-            } else if (data.status === 'error' || data.error) {
-                console.log('❌ Generation failed:', data.error || 'Unknown error');
+            } else if (data.status === 'error') {
+                console.log('❌ Generation failed:', data.description);
+                stopWatching();
                 setIsGenerating(false);
                 toast({
                     title: 'Error',
-                    description: data.error || 'Blueprint generation failed',
+                    description: data.description || 'Blueprint generation failed',
                     status: 'error',
                     duration: 5000,
                     isClosable: true,
                 });
-            } else {
-                // Continue polling for non-terminal states
-                console.log(`⏳ Generation in progress (${data.status}), polling again in ${POLL_INTERVAL}ms`);
-                setTimeout(() => pollStatus(blueprintId, 0), POLL_INTERVAL);
             }
-        } catch (error) {
-            console.error('❌ Polling error:', error);
-            
-            // Implement retry logic for polling errors
+        });
+
+        source.onerror = () => {
+            // The browser reconnects dropped streams by itself; only a refused stream is closed
+            if (eventSourceRef.current !== source || source.readyState !== EventSource.CLOSED) {
+                return;
+            }
+            console.error('❌ Status stream closed');
             if (retryCount < MAX_RETRIES) {
-                console.log(`🔄 Retrying in ${RETRY_DELAY}ms (attempt ${retryCount + 1}/${MAX_RETRIES})`);
-                setTimeout(() => pollStatus(blueprintId, retryCount + 1), RETRY_DELAY);
+                console.log(`🔄 Reconnecting in ${RETRY_DELAY}ms (attempt ${retryCount + 1}/${MAX_RETRIES})`);
+                setTimeout(() => {
+                    if (eventSourceRef.current === source) {
+                        watchStatus(blueprintId, retryCount + 1);
+                    }
+                }, RETRY_DELAY);
             } else {
+                stopWatching();
                 setIsGenerating(false);
                 toast({
                     title: 'Error',
@@ -195,7 +217,7 @@ export function BlueprintGenerationContent({ initialBlueprintId }: BlueprintGene
                     isClosable: true,
                 });
             }
-        }
+        };
     };
 
     return (
@@ -221,6 +243,16 @@ export function BlueprintGenerationContent({ initialBlueprintId }: BlueprintGene
                                 <Text color="gray.600">
                                     {status?.description || 'Starting generation...'}
                                 </Text>
+                                {status?.status === 'queued' && status.queue_position != null && (
+                                    <Text fontSize="sm" color="gray.500">
+                                        {status.queue_position === 0
+                                            ? 'Next in queue'
+                                            : `${status.queue_position} generation(s) ahead in queue`}
+                                        {status.estimated_wait_seconds
+                                            ? `, starting in about ${Math.ceil(status.estimated_wait_seconds / 60)} minute(s)`
+                                            : ''}
+                                    </Text>
+                                )}
                             </VStack>
 
                             {status && status.terminal_objectives_count > 0 && (
@@ -11,10 +11,11 @@ export function useLogStream({ onError }: UseLogStreamOptions = {}) {
   const webSocketRef = useRef<WebSocket | null>(null);
   const reconnectTimeoutRef = useRef<NodeJS.Timeout>();
   const reconnectAttemptsRef = useRef(0);
+  const lastCursorRef = useRef<string | null>(null);
   const MAX_RECONNECT_ATTEMPTS = 5;
   const RECONNECT_DELAY = 1000; // 1 second
 
-  const startStream = useCallback(async (executionId: string) => {
+  const startStream = useCallback(async (executionId: string, resume: boolean = false) => {
     if (!session?.accessToken) {
       onError?.('Not authenticated');
       return;
@@ -26,8 +27,11 @@ export function useLogStream({ onError }: UseLogStreamOptions = {}) {
         webSocketRef.current.close();
       }
 
-      // Reset reconnect attempts
-      reconnectAttemptsRef.current = 0;
+      // Reset reconnect attempts and the resume position on a fresh start
+      if (!resume) {
+        reconnectAttemptsRef.current = 0;
+        lastCursorRef.current = null;
+      }
 
       // Create new WebSocket connection with token
       const apiUrl = process.env.NEXT_PUBLIC_API_URL?.replace(':3000', ':8000') || 'http://localhost:8000';
@@ -36,6 +40,10 @@ export function useLogStream({ onError }: UseLogStreamOptions = {}) {
       // Add token as query parameter - no need to URL encode since it's already properly formatted
       const url = new URL(wsUrl);
       url.searchParams.append('token', `Bearer ${session.accessToken}`);
+      // On reconnect only ask for lines after the last one received
+      if (resume && lastCursorRef.current) {
+        url.searchParams.append('cursor', lastCursorRef.current);
+      }
       
       console.log('Connecting to WebSocket...', url.toString());
       const ws = new WebSocket(url.toString());
@@ -43,7 +51,9 @@ export function useLogStream({ onError }: UseLogStreamOptions = {}) {
 
       ws.onopen = () => {
         console.log('WebSocket connected');
-        setLogs(''); // Clear logs on new connection
+        if (!resume) {
+          setLogs(''); // Clear logs on new connection
+        }
       };
 
       ws.onmessage = (event) => {
@@ -53,6 +63,9 @@ export function useLogStream({ onError }: UseLogStreamOptions = {}) {
             onError?.(log.error);
             return;
           }
+          if (log.cursor) {
+            lastCursorRef.current = log.cursor;
+          }
           
           setLogs(prev => {
             // Format log message based on level and timestamp
@@ -86,6 +99,10 @@ export function useLogStream({ onError }: UseLogStreamOptions = {}) {
           case 4005:
             onError?.('Error verifying flow execution');
             return;
+          case 4000:
+            // Invalid resume cursor: start over with the full history
+            startStream(executionId);
+            return;
           case 1000:
             console.log('WebSocket closed normally');
             return;
@@ -95,7 +112,7 @@ export function useLogStream({ onError }: UseLogStreamOptions = {}) {
               console.log(`Reconnecting... Attempt ${reconnectAttemptsRef.current + 1}/${MAX_RECONNECT_ATTEMPTS}`);
               reconnectTimeoutRef.current = setTimeout(() => {
                 reconnectAttemptsRef.current++;
-                startStream(executionId);
+                startStream(executionId, true);
               }, RECONNECT_DELAY);
             } else {
               onError?.('Maximum reconnection attempts reached');
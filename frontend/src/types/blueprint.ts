@@ -1,10 +1,12 @@
 export interface BlueprintStatus {
     id: string;
-    status: 'draft' | 'generating' | 'completed' | 'error' | 'published' | 'archived';
+    status: 'draft' | 'queued' | 'generating' | 'completed' | 'error' | 'published' | 'archived';
     title: string;
     description: string;
     terminal_objectives_count: number;
     enabling_objectives_count: number;
+    queue_position?: number | null;
+    estimated_wait_seconds?: number | null;
 }
 
 export interface Blueprint {
@@ -116,9 +116,9 @@ async def test_db():
 @pytest.fixture
 async def test_session(test_db) -> AsyncGenerator:
     """Create a new database session for a test."""
-    from api.core.database import async_session_maker
+    from api.core.database import get_session_maker
     
-    async with async_session_maker() as session:
+    async with get_session_maker()() as session:
         yield session
         await session.rollback()
         
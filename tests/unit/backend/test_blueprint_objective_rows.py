@@ -0,0 +1,67 @@
+"""
+Test Name: test_blueprint_objective_rows
+Description: Unit tests for building the rows of a generated objective tree for bulk INSERT
+
+Environment:
+    - Conda Environment: quiz_master_backend
+    - Working Directory: tests/unit/backend
+    - Required Services: None
+
+Setup:
+    1. No setup required
+
+Execution:
+    pytest tests/unit/backend/test_blueprint_objective_rows.py
+
+Expected Results:
+    All objective row tests pass
+"""
+
+import os
+import sys
+import uuid
+
+# Add the backend directory to the Python path
+sys.path.append(os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))), "backend"))
+
+from api.routers.blueprint_generation import build_objective_rows
+from api.schemas.pydantic_schemas import EnablingObjectivePydantic, TerminalObjectivePydantic
+
+
+def make_terminal_objectives(terminal_count, enabling_count):
+    return [
+        TerminalObjectivePydantic(
+            title=f"Terminal {t}",
+            number=t,
+            description="A terminal objective description",
+            cognitive_level="UNDERSTAND",
+            enabling_objectives=[
+                EnablingObjectivePydantic(
+                    title=f"Enabling {t}.{e}",
+                    number=f"{t}.{e}",
+                    description="An enabling objective description",
+                    cognitive_level="REMEMBER",
+                )
+                for e in range(1, enabling_count + 1)
+            ],
+        )
+        for t in range(1, terminal_count + 1)
+    ]
+
+
+def test_rows_link_enabling_objectives_to_generated_terminal_ids():
+    blueprint_id = uuid.uuid4()
+
+    terminal_rows, enabling_rows = build_objective_rows(blueprint_id, make_terminal_objectives(10, 8))
+
+    assert len(terminal_rows) == 10
+    assert len(enabling_rows) == 80
+    assert all(row["blueprint_id"] == blueprint_id for row in terminal_rows)
+    terminal_ids = [row["terminal_objective_id"] for row in terminal_rows]
+    assert len(set(terminal_ids)) == 10
+    assert [row["terminal_objective_id"] for row in enabling_rows[:8]] == [terminal_ids[0]] * 8
+    assert enabling_rows[-1]["number"] == "10.8"
+
+
+def test_empty_blueprint_has_no_rows():
+    assert build_objective_rows(uuid.uuid4(), []) == ([], [])
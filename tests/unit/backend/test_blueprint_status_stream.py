@@ -0,0 +1,100 @@
+"""
+Test Name: test_blueprint_status_stream
+Description: Unit tests for blueprint status push notifications (event shape, hub fan-out, origin filtering)
+
+Environment:
+    - Conda Environment: quiz_master_backend
+    - Working Directory: tests/unit/backend
+    - Required Services: None
+
+Setup:
+    1. No setup required
+
+Execution:
+    pytest tests/unit/backend/test_blueprint_status_stream.py
+
+Expected Results:
+    All blueprint status stream tests pass
+"""
+
+import asyncio
+import json
+import os
+import sys
+from uuid import uuid4
+
+# Add the backend directory to the Python path
+sys.path.append(os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))), "backend"))
+
+from api.crews.blueprint_status import (
+    MAX_DESCRIPTION_CHARS,
+    BlueprintStatusHub,
+    status_event,
+)
+from api.flows.log_hub import PROCESS_ID
+
+
+def make_hub():
+    hub = BlueprintStatusHub(dsn="postgresql://unused")
+    # Keep the listener from connecting
+    hub.start = lambda: None
+    return hub
+
+
+def test_status_event_matches_status_response_and_fits_a_notification():
+    """Events carry the status response fields, with long descriptions cut to fit NOTIFY."""
+    blueprint_id = uuid4()
+    event = status_event(blueprint_id, "error", "Blueprint", "x" * 10000, None, 2)
+
+    assert event["id"] == str(blueprint_id)
+    assert event["status"] == "error"
+    assert len(event["description"]) == MAX_DESCRIPTION_CHARS
+    assert event["terminal_objectives_count"] == 0
+    assert event["enabling_objectives_count"] == 2
+    assert len(json.dumps(event).encode("utf-8")) < 8000
+
+
+def test_notifications_reach_streams_of_their_blueprint():
+    """A notification from another process is delivered to that blueprint's subscribers only."""
+    async def run():
+        hub = make_hub()
+        watched = str(uuid4())
+        subscription = hub.subscribe(watched)
+        other = hub.subscribe(str(uuid4()))
+        event = status_event(watched, "generating", "Blueprint", "Generating objectives")
+
+        hub._on_notification(None, 0, "blueprint_status", json.dumps({"origin": "another-process", "event": event}))
+
+        assert await asyncio.wait_for(subscription.get(), timeout=1) == event
+        assert other._queue.empty()
+        subscription.close()
+        other.close()
+        assert hub.stats["subscribers"] == 0
+
+    asyncio.run(run())
+
+
+def test_own_notifications_are_skipped():
+    """Changes made in this process were already published locally and are not delivered twice."""
+    async def run():
+        hub = make_hub()
+        blueprint_id = str(uuid4())
+        subscription = hub.subscribe(blueprint_id)
+        event = status_event(blueprint_id, "completed", "Blueprint", "All objectives saved", 3, 9)
+
+        hub.publish(blueprint_id, event)
+        hub._on_notification(None, 0, "blueprint_status", json.dumps({"origin": PROCESS_ID, "event": event}))
+
+        assert await subscription.get() == event
+        assert subscription._queue.empty()
+        assert hub.notifications == 1
+
+    asyncio.run(run())
+
+
+def test_invalid_notifications_are_ignored():
+    """Malformed payloads are logged and dropped."""
+    hub = make_hub()
+    hub._on_notification(None, 0, "blueprint_status", "not json")
+    hub._on_notification(None, 0, "blueprint_status", json.dumps({"origin": "x"}))
+    assert hub.notifications == 2
@@ -0,0 +1,104 @@
+"""
+Test Name: test_checkpoint
+Description: Unit tests for saving and replaying flow step outputs in execution checkpoints
+
+Environment:
+    - Conda Environment: quiz_master_backend
+    - Working Directory: tests/unit/backend
+    - Required Services: None
+
+Setup:
+    1. No setup required
+
+Execution:
+    pytest tests/unit/backend/test_checkpoint.py
+
+Expected Results:
+    All checkpoint tests pass
+"""
+
+import asyncio
+import json
+import os
+import sys
+from uuid import uuid4
+
+import pytest
+from pydantic import BaseModel
+
+# Add the backend directory to the Python path
+sys.path.append(os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))), "backend"))
+
+from crewai.crews.crew_output import CrewOutput
+from crewai.tasks.task_output import TaskOutput
+
+from api.flows.checkpoint import MODEL_KEY, FlowCheckpointer, decode_output, encode_output
+
+
+class Outline(BaseModel):
+    title: str
+    chapters: list
+
+
+class FakeFlow:
+    """Stands in for a crewai Flow with the private attributes the checkpointer wraps."""
+
+    def __init__(self):
+        self.state = {}
+        self._method_outputs = []
+
+    async def _execute_method(self, method_name, method, *args, **kwargs):
+        raise AssertionError(f"{method_name} should have been replayed")
+
+
+def round_trip(value):
+    return decode_output(json.loads(json.dumps(encode_output(value))))
+
+
+def test_pydantic_outputs_are_replayed_as_models():
+    outline = Outline(title="Flows", chapters=["one", "two"])
+
+    restored = round_trip({"outline": outline, "count": 2})
+
+    assert restored == {"outline": outline, "count": 2}
+    assert isinstance(restored["outline"], Outline)
+
+
+def test_crew_outputs_keep_nested_models():
+    """CrewOutput types its pydantic field as BaseModel, which model_dump would empty."""
+    outline = Outline(title="Flows", chapters=["one"])
+    task = TaskOutput(description="outline", raw="raw", agent="writer", pydantic=outline)
+    output = CrewOutput(raw="raw", pydantic=outline, tasks_output=[task], token_usage={"total_tokens": 3})
+
+    restored = round_trip(output)
+
+    assert isinstance(restored, CrewOutput)
+    assert restored.pydantic == outline
+    assert restored.tasks_output[0].pydantic == outline
+    assert restored.token_usage.total_tokens == 3
+
+
+def test_unknown_models_are_replayed_as_plain_json():
+    saved = {MODEL_KEY: "api.flows.missing_module:Outline", "fields": {"title": "Flows"}}
+
+    assert decode_output(saved) == {"title": "Flows"}
+
+
+def test_replayed_step_returns_the_rebuilt_output():
+    outline = Outline(title="Flows", chapters=[])
+    checkpointer = FlowCheckpointer(uuid4(), {"completed": {"generate_outline": encode_output(outline)}})
+    flow = FakeFlow()
+    checkpointer.attach(flow)
+
+    result = asyncio.run(flow._execute_method("generate_outline", None))
+
+    assert isinstance(result, Outline) and result == outline
+    assert flow._method_outputs == [outline]
+
+
+def test_attach_rejects_flows_without_the_wrapped_internals():
+    flow = FakeFlow()
+    del flow._method_outputs
+
+    with pytest.raises(RuntimeError, match="0.86.0"):
+        FlowCheckpointer(uuid4()).attach(flow)
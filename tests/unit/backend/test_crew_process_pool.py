@@ -0,0 +1,62 @@
+"""
+Test Name: test_crew_process_pool
+Description: Unit tests for the warm crew process pool (kickoffs run in reused worker processes, outputs are serialized back)
+
+Environment:
+    - Conda Environment: quiz_master_backend
+    - Working Directory: tests/unit/backend
+    - Required Services: None
+
+Setup:
+    1. No setup required
+
+Execution:
+    pytest tests/unit/backend/test_crew_process_pool.py
+
+Expected Results:
+    All crew process pool tests pass
+"""
+
+import asyncio
+import os
+import sys
+from types import SimpleNamespace
+
+import pytest
+
+# Add the backend directory to the Python path
+sys.path.append(os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))), "backend"))
+
+from api.crews.process_pool import CrewProcessPool
+
+
+class EchoCrew:
+    """Stands in for a CrewBase class; its kickoff reports the process it ran in."""
+
+    def crew(self):
+        return self
+
+    def kickoff(self, inputs):
+        return SimpleNamespace(raw=inputs["topic"].upper(), json_dict={"pid": os.getpid()}, pydantic=None)
+
+
+@pytest.mark.slow
+def test_kickoffs_run_in_warm_reused_worker_processes():
+    """Kickoffs leave the API process, reuse the same warm worker and return plain outputs."""
+    pool = CrewProcessPool(max_workers=1)
+
+    async def run():
+        pool.warm()
+        first = await pool.kickoff(f"{__name__}:EchoCrew", {"topic": "photosynthesis"})
+        second = await pool.kickoff(f"{__name__}:EchoCrew", {"topic": "osmosis"})
+        return first, second
+
+    try:
+        first, second = asyncio.run(run())
+    finally:
+        pool.shutdown()
+
+    assert first == {"raw": "PHOTOSYNTHESIS", "json_dict": {"pid": first["json_dict"]["pid"]}, "pydantic": None}
+    assert second["raw"] == "OSMOSIS"
+    assert first["json_dict"]["pid"] != os.getpid()
+    assert first["json_dict"]["pid"] == second["json_dict"]["pid"]
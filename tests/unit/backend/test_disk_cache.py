@@ -0,0 +1,112 @@
+"""
+Test Name: test_disk_cache
+Description: Unit tests for the sharded, compressed, atomically written flow result store
+
+Environment:
+    - Conda Environment: quiz_master_backend
+    - Working Directory: tests/unit/backend
+    - Required Services: None
+
+Setup:
+    1. No setup required
+
+Execution:
+    pytest tests/unit/backend/test_disk_cache.py
+
+Expected Results:
+    All disk store tests pass
+"""
+
+import gzip
+import json
+import os
+import sys
+import time
+
+# Add the backend directory to the Python path
+sys.path.append(os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))), "backend"))
+
+from api.flows.disk_cache import FlowResultDiskStore
+
+CACHE_KEY = "f089e3ffb5268632a1ca93fa878bf8f87ba6ddad0c4d94ccced7281ce78a3322"
+ENTRY = {"raw_output": "A poem", "state_dict": {"poem": "A poem"}, "created_at": "2025-01-06T02:28:36"}
+
+
+def test_save_writes_sharded_compact_gzip(tmp_path):
+    """Entries land in hash-prefix shards as gzip-compressed compact JSON."""
+    store = FlowResultDiskStore(str(tmp_path))
+    store.save(CACHE_KEY, ENTRY)
+
+    path = tmp_path / "f0" / "89" / f"{CACHE_KEY}.json.gz"
+    assert path.exists()
+    raw = gzip.decompress(path.read_bytes())
+    assert b"\n" not in raw
+    assert json.loads(raw) == ENTRY
+    # No temp files are left behind
+    assert os.listdir(path.parent) == [path.name]
+
+
+def test_load_round_trip(tmp_path):
+    """Entries read back identically along with their uncompressed size."""
+    store = FlowResultDiskStore(str(tmp_path))
+    store.save(CACHE_KEY, ENTRY)
+    data, size = store.load(CACHE_KEY)
+    assert data == ENTRY
+    assert size == len(json.dumps(ENTRY, separators=(",", ":")))
+
+
+def test_legacy_entry_is_not_read(tmp_path):
+    """Flat entries of the old format have unversioned keys and are never served."""
+    (tmp_path / f"{CACHE_KEY}.json").write_text(json.dumps(ENTRY, indent=2))
+    store = FlowResultDiskStore(str(tmp_path))
+
+    assert not store.exists(CACHE_KEY)
+    assert store.load(CACHE_KEY) is None
+
+
+def test_saved_entries_respect_the_umask(tmp_path):
+    """Entries get the umask's permissions rather than mkstemp's owner-only mode."""
+    store = FlowResultDiskStore(str(tmp_path))
+    store.save(CACHE_KEY, ENTRY)
+
+    umask = os.umask(0)
+    os.umask(umask)
+    assert os.stat(store.path_for(CACHE_KEY)).st_mode & 0o777 == 0o666 & ~umask
+
+
+def test_gc_prunes_by_age_and_size(tmp_path):
+    """GC removes expired entries first, then the oldest until under the size bound."""
+    store = FlowResultDiskStore(str(tmp_path))
+    keys = [f"{i:02d}" + CACHE_KEY[2:] for i in range(4)]
+    now = time.time()
+    for age, key in zip((1000, 300, 200, 100), keys):
+        store.save(key, ENTRY)
+        os.utime(store.path_for(key), (now - age, now - age))
+
+    entry_size = os.path.getsize(store.path_for(keys[0]))
+    stats = store.gc(max_bytes=entry_size * 2, max_age=500)
+
+    assert stats["removed"] == 2
+    assert not store.exists(keys[0])  # expired
+    assert not store.exists(keys[1])  # oldest remaining, over the size bound
+    assert store.exists(keys[2])
+    assert store.exists(keys[3])
+
+
+def test_evict_variants_keeps_only_current_version(tmp_path):
+    """Entries for the same request under other flow versions are removed."""
+    store = FlowResultDiskStore(str(tmp_path))
+    current_key = f"{CACHE_KEY}-aaaaaaaaaaaa"
+    old_key = f"{CACHE_KEY}-bbbbbbbbbbbb"
+    other_key = f"{CACHE_KEY[:4]}{'0' * 60}-bbbbbbbbbbbb"
+    for key in (current_key, old_key, other_key):
+        store.save(key, ENTRY)
+    (tmp_path / f"{CACHE_KEY}.json").write_text(json.dumps(ENTRY))
+
+    removed = store.evict_variants(current_key, CACHE_KEY)
+
+    assert removed == 2
+    assert store.exists(current_key)
+    assert not store.exists(old_key)
+    assert store.exists(other_key)
+    assert not (tmp_path / f"{CACHE_KEY}.json").exists()
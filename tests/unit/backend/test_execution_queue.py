@@ -0,0 +1,252 @@
+"""
+Test Name: test_execution_queue
+Description: Unit tests for the flow execution queue (claim query, per-flow limit under concurrent claims, stale heartbeat requeue, cancellation watch, bounded shutdown)
+
+Environment:
+    - Conda Environment: quiz_master_backend
+    - Working Directory: tests/unit/backend
+    - Required Services: None
+
+Setup:
+    1. No setup required
+
+Execution:
+    pytest tests/unit/backend/test_execution_queue.py
+
+Expected Results:
+    All execution queue tests pass
+"""
+
+import asyncio
+import os
+import sys
+from datetime import datetime
+from types import SimpleNamespace
+from uuid import uuid4
+
+from sqlalchemy.dialects import postgresql
+
+# Add the backend directory to the Python path
+sys.path.append(os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))), "backend"))
+
+from api.core.models import FlowExecutionStatus
+from api.flows import execution_queue
+from api.flows.execution_queue import (
+    FlowExecutionQueue,
+    claim_candidate_query,
+    claimed_release_statement,
+    stale_requeue_statement,
+)
+
+
+def compile_sql(stmt) -> str:
+    return str(stmt.compile(dialect=postgresql.dialect(), compile_kwargs={"literal_binds": True}))
+
+
+class FakeResult:
+    def __init__(self, value):
+        self.value = value
+        self.rowcount = value if isinstance(value, int) else 0
+
+    def all(self):
+        return self.value
+
+    def one_or_none(self):
+        return self.value
+
+    def scalar_one(self):
+        return self.value
+
+    def scalar_one_or_none(self):
+        return self.value
+
+
+class FakeSession:
+    """Returns scripted results in order and records the statements executed."""
+
+    def __init__(self, results):
+        self.results = list(results)
+        self.statements = []
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    def begin(self):
+        return self
+
+    async def execute(self, stmt):
+        self.statements.append(stmt)
+        return FakeResult(self.results.pop(0))
+
+    async def commit(self):
+        pass
+
+
+def make_queue(monkeypatch, session, limits=None):
+    monkeypatch.setattr(execution_queue, "get_session_maker", lambda: lambda: session)
+    return FlowExecutionQueue(
+        flow_wrapper=None,
+        worker_count=0,
+        concurrency_limits=limits or {"book_flow": 1},
+        default_limit=4,
+        poll_interval=1,
+        stale_after=30,
+    )
+
+
+def make_candidate(flow_name="book_flow"):
+    return SimpleNamespace(id=uuid4(), flow_name=flow_name, status=FlowExecutionStatus.PENDING, worker_id=None)
+
+
+def test_claim_query_skips_locked_rows_and_saturated_flows():
+    """The candidate is the oldest queued row of a flow with capacity, locked without waiting."""
+    sql = compile_sql(claim_candidate_query({"book_flow"}))
+    assert "FOR UPDATE SKIP LOCKED" in sql
+    assert "NOT IN ('book_flow')" in sql
+    assert "queued_at IS NOT NULL" in sql
+    assert "ORDER BY flow_executions.queued_at" in sql
+
+
+def test_claim_takes_flow_lock_before_counting_and_claims_with_capacity(monkeypatch):
+    """The flow's RUNNING rows are counted under its advisory lock, then the row is claimed."""
+    candidate = make_candidate()
+    # running counts per flow, candidate, advisory lock, running count of the flow
+    session = FakeSession([[], candidate, None, 0])
+    queue = make_queue(monkeypatch, session)
+
+    claimed = asyncio.run(queue._claim_next("host:1:0"))
+
+    assert claimed == candidate.id
+    assert candidate.status == FlowExecutionStatus.RUNNING
+    assert candidate.worker_id == "host:1:0"
+    lock_sql, count_sql = (compile_sql(stmt) for stmt in session.statements[2:4])
+    assert "pg_advisory_xact_lock(hashtext('flow_execution_queue'), hashtext('book_flow'))" in lock_sql
+    assert "count(*)" in count_sql and "flow_name = 'book_flow'" in count_sql
+
+
+def test_claim_skips_flow_filled_by_a_concurrent_worker(monkeypatch):
+    """A flow that reached its limit while the lock was awaited is not claimed past its limit."""
+    candidate = make_candidate()
+    # counts read before the other worker's claim committed, then the recount under the lock sees it
+    session = FakeSession([[], candidate, None, 1, None])
+    queue = make_queue(monkeypatch, session)
+
+    assert asyncio.run(queue._claim_next("host:1:1")) is None
+    assert candidate.status == FlowExecutionStatus.PENDING
+    assert "NOT IN ('book_flow')" in compile_sql(session.statements[-1])
+
+
+def test_stale_requeue_statement_requeues_rows_without_recent_heartbeat():
+    """Queued RUNNING rows whose heartbeat is older than the cutoff go back to PENDING."""
+    sql = compile_sql(stale_requeue_statement(datetime(2026, 1, 1, 12, 0, 0)))
+    assert "status='PENDING'" in sql.replace(" ", "")
+    assert "heartbeat_at < '2026-01-01 12:00:00'" in sql
+    assert "status = 'RUNNING'" in sql
+    assert "worker_id=NULL" in sql.replace(" ", "")
+
+
+def test_stale_requeue_runs_at_most_every_third_of_the_stale_period(monkeypatch):
+    """Workers reap stale rows on their first pass and then only after stale_after / 3 seconds."""
+    session = FakeSession([2])
+    queue = make_queue(monkeypatch, session)
+
+    async def run():
+        await queue._requeue_stale()
+        await queue._requeue_stale()
+
+    asyncio.run(run())
+
+    assert len(session.statements) == 1
+    assert "heartbeat_at <" in compile_sql(session.statements[0])
+
+
+def watch_until_cancelled(queue, session, worker_id="host:1:0"):
+    """Run the watch of a never-ending execution and return the statuses left unread when it cancelled."""
+    queue._cancel_poll_interval = 0
+
+    async def run():
+        task = asyncio.ensure_future(asyncio.sleep(3600))
+        await asyncio.wait_for(queue._watch(uuid4(), worker_id, task), timeout=1)
+        await asyncio.sleep(0)
+        assert task.cancelled()
+
+    asyncio.run(run())
+    return session.results
+
+
+def test_watch_leaves_paused_executions_to_the_step_boundary(monkeypatch):
+    """Pausing does not cancel the step in progress; stopping (marked FAILED) does."""
+    session = FakeSession([
+        SimpleNamespace(status=FlowExecutionStatus.PAUSED, worker_id="host:1:0"),
+        SimpleNamespace(status=FlowExecutionStatus.PAUSED, worker_id="host:1:0"),
+        SimpleNamespace(status=FlowExecutionStatus.FAILED, worker_id="host:1:0"),
+    ])
+    queue = make_queue(monkeypatch, session)
+
+    assert watch_until_cancelled(queue, session) == []
+
+
+def test_watch_cancels_executions_reassigned_to_another_worker(monkeypatch):
+    """An execution requeued as stale or claimed by another worker is cancelled here."""
+    session = FakeSession([
+        SimpleNamespace(status=FlowExecutionStatus.RUNNING, worker_id="host:1:0"),
+        SimpleNamespace(status=FlowExecutionStatus.PENDING, worker_id=None),
+        SimpleNamespace(status=FlowExecutionStatus.RUNNING, worker_id="host:1:0"),
+    ])
+    queue = make_queue(monkeypatch, session)
+
+    assert len(watch_until_cancelled(queue, session)) == 1
+
+
+def test_claimed_release_statement_requeues_rows_of_the_given_workers():
+    """Rows claimed by this process's workers go back to PENDING without a worker."""
+    sql = compile_sql(claimed_release_statement(["host:1:0", "host:1:1"]))
+    assert "worker_id IN ('host:1:0', 'host:1:1')" in sql
+    assert "status = 'RUNNING'" in sql
+    assert "status='PENDING'" in sql.replace(" ", "")
+    assert "worker_id=NULL" in sql.replace(" ", "")
+
+
+def test_stop_does_not_wait_on_executions_that_ignore_cancellation(monkeypatch):
+    """After the shutdown timeout, busy workers are cancelled and their claimed rows are requeued."""
+    session = FakeSession([1])
+    execution_id = uuid4()
+
+    async def run_execution(execution_id):
+        try:
+            await asyncio.sleep(3600)
+        except asyncio.CancelledError:
+            # A flow blocked in user code does not stop when asked
+            await asyncio.sleep(3600)
+
+    queue = make_queue(monkeypatch, session)
+    queue._flow_wrapper = SimpleNamespace(run_execution=run_execution)
+    queue._worker_count = 1
+    claims = [execution_id]
+
+    async def claim_next(worker_id):
+        return claims.pop() if claims else None
+
+    async def no_op(*args):
+        pass
+
+    monkeypatch.setattr(queue, "_claim_next", claim_next)
+    monkeypatch.setattr(queue, "_requeue_stale", no_op)
+    monkeypatch.setattr(queue, "_watch", no_op)
+
+    async def run():
+        await queue.start()
+        while execution_id not in queue.running:
+            await asyncio.sleep(0)
+        worker_id = queue.running[execution_id]
+        await asyncio.wait_for(queue.stop(timeout=0.05), timeout=1)
+        return worker_id
+
+    worker_id = asyncio.run(run())
+
+    assert queue.running == {}
+    assert len(session.statements) == 1
+    assert f"worker_id IN ('{worker_id}')" in compile_sql(session.statements[0])
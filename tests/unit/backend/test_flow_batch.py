@@ -0,0 +1,173 @@
+"""
+Test Name: test_flow_batch
+Description: Unit tests for flow execution batches (chunked conflict-tolerant inserts, single-flight within and across batches, progress aggregation)
+
+Environment:
+    - Conda Environment: quiz_master_backend
+    - Working Directory: tests/unit/backend
+    - Required Services: None
+
+Setup:
+    1. No setup required
+
+Execution:
+    pytest tests/unit/backend/test_flow_batch.py
+
+Expected Results:
+    All flow batch tests pass
+"""
+
+import asyncio
+import os
+import sys
+from uuid import uuid4
+
+import pytest
+from fastapi import HTTPException
+from sqlalchemy.dialects import postgresql
+
+# Add the backend directory to the Python path
+sys.path.append(os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))), "backend"))
+
+from api.flows import flow_wrapper
+from api.flows.flow_wrapper import FlowBatchCreate, FlowBatchProgress, FlowWrapper
+
+USER_ID = uuid4()
+
+
+def compile_sql(stmt) -> str:
+    return str(stmt.compile(dialect=postgresql.dialect()))
+
+
+def inserted_rows(stmt):
+    """The rows of a multi-row INSERT, keyed by column name."""
+    return [{column.name: value for column, value in row.items()} for row in stmt._multi_values[0]]
+
+
+class FakeResult:
+    def __init__(self, value):
+        self.value = value
+
+    def all(self):
+        return self.value
+
+    def scalars(self):
+        return self
+
+
+class FakeSession:
+    """Answers in-flight lookups with scripted leaders; conflict-tolerant inserts report the ids they kept."""
+
+    def __init__(self, in_flight, conflicting=()):
+        self.in_flight = list(in_flight)
+        self.conflicting = set(conflicting)
+        self.statements = []
+        self.rolled_back = False
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    async def execute(self, stmt):
+        self.statements.append(stmt)
+        if stmt.is_select:
+            return FakeResult(self.in_flight.pop(0))
+        rows = inserted_rows(stmt)
+        return FakeResult([row["id"] for row in rows if row["cache_key"] not in self.conflicting])
+
+    async def commit(self):
+        pass
+
+    async def rollback(self):
+        self.rolled_back = True
+
+    @property
+    def inserts(self):
+        return [stmt for stmt in self.statements if stmt.is_insert]
+
+
+def make_wrapper(monkeypatch, session, chunk=2):
+    monkeypatch.setattr(flow_wrapper, "get_session_maker", lambda: lambda: session)
+    monkeypatch.setattr(flow_wrapper, "BATCH_INSERT_CHUNK", chunk)
+    wrapper = FlowWrapper(enable_caching=False)
+    # Memory cache only, without a cache directory on disk
+    wrapper._enable_caching = True
+    wrapper._flows["book_flow"] = object
+    wrapper._flow_versions["book_flow"] = "v1"
+    return wrapper
+
+
+def create(wrapper, states):
+    return asyncio.run(wrapper.create_batch(FlowBatchCreate(flow_name="book_flow", initial_states=states), USER_ID))
+
+
+def test_batch_inserts_in_chunks_and_reports_progress(monkeypatch):
+    """Leaders go in conflict-tolerant chunks, followers after; cache hits are counted as finished."""
+    states = [{"topic": "a"}, {"topic": "b"}, {"topic": "a"}, {"topic": "c"}, {"topic": "d"}]
+    running_b = uuid4()
+    session = FakeSession(in_flight=[])
+    wrapper = make_wrapper(monkeypatch, session)
+    key = lambda state: wrapper._generate_cache_key("book_flow", state)
+    session.in_flight = [[(key({"topic": "b"}), running_b)]]
+    wrapper._cache.set(key({"topic": "d"}), {"state_dict": {"topic": "d", "book": "cached"}})
+
+    batch = create(wrapper, states)
+
+    leader_inserts, follower_insert = session.inserts[:2], session.inserts[2]
+    assert [len(inserted_rows(stmt)) for stmt in leader_inserts] == [2, 1]
+    for stmt in leader_inserts:
+        assert "ON CONFLICT DO NOTHING RETURNING flow_executions.id" in compile_sql(stmt)
+    followers = {row["cache_key"]: row["leader_id"] for row in inserted_rows(follower_insert)}
+    # b attaches to the execution already running, the second a to the batch's own a
+    assert followers == {key({"topic": "b"}): running_b, key({"topic": "a"}): batch.execution_ids[0]}
+
+    assert batch.total == 5
+    assert batch.counts == {"pending": 4, "completed": 1}
+    assert batch.finished == 1
+    assert batch.progress == pytest.approx(0.2)
+    assert not batch.done
+
+
+def test_leaders_lost_to_a_concurrent_request_attach_to_its_execution(monkeypatch):
+    """Rows skipped by ON CONFLICT DO NOTHING are re-inserted as followers of the winner."""
+    session = FakeSession(in_flight=[[]])
+    wrapper = make_wrapper(monkeypatch, session)
+    key_a = wrapper._generate_cache_key("book_flow", {"topic": "a"})
+    winner = uuid4()
+    session.conflicting = {key_a}
+    session.in_flight.append([(key_a, winner)])
+
+    batch = create(wrapper, [{"topic": "a"}, {"topic": "b"}])
+
+    follower_rows = inserted_rows(session.inserts[-1])
+    assert [(row["cache_key"], row["leader_id"], row["queued_at"]) for row in follower_rows] == [(key_a, winner, None)]
+    assert batch.counts == {"pending": 2}
+
+
+def test_lost_leader_that_already_finished_is_a_conflict(monkeypatch):
+    """If the concurrent winner cannot be found any more, the batch is rolled back with a 409."""
+    session = FakeSession(in_flight=[[], []])
+    wrapper = make_wrapper(monkeypatch, session)
+    session.conflicting = {wrapper._generate_cache_key("book_flow", {"topic": "a"})}
+
+    with pytest.raises(HTTPException) as excinfo:
+        create(wrapper, [{"topic": "a"}])
+
+    assert excinfo.value.status_code == 409
+    assert session.rolled_back
+
+
+def test_progress_of_finished_and_empty_batches():
+    batch_id = uuid4()
+
+    finished = FlowBatchProgress.from_counts(batch_id, {"completed": 3, "failed": 1})
+    assert (finished.total, finished.finished, finished.progress, finished.done) == (4, 4, 1.0, True)
+
+    running = FlowBatchProgress.from_counts(batch_id, {"running": 2, "pending": 1, "failed": 1})
+    assert running.progress == pytest.approx(0.25)
+    assert not running.done
+
+    empty = FlowBatchProgress.from_counts(batch_id, {})
+    assert (empty.total, empty.progress, empty.done) == (0, 1.0, True)
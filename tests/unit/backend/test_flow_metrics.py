@@ -0,0 +1,107 @@
+"""
+Test Name: test_flow_metrics
+Description: Unit tests for per-step timing and LLM usage recording of flow executions
+
+Environment:
+    - Conda Environment: quiz_master_backend
+    - Working Directory: tests/unit/backend
+    - Required Services: None
+
+Setup:
+    1. No setup required
+
+Execution:
+    pytest tests/unit/backend/test_flow_metrics.py
+
+Expected Results:
+    All flow metrics tests pass
+"""
+
+import asyncio
+import os
+import sys
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+
+import pytest
+
+# Add the backend directory to the Python path
+sys.path.append(os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))), "backend"))
+
+from api.flows.metrics import FlowMetricsRecorder, current_step
+
+
+class FakeFlow:
+    """Minimal stand-in exposing the step execution hook of a CrewAI flow."""
+
+    async def _execute_method(self, method_name, method, *args, **kwargs):
+        if asyncio.iscoroutinefunction(method):
+            return await method(*args, **kwargs)
+        return method(*args, **kwargs)
+
+
+def fake_llm_call(prompt_tokens, completion_tokens):
+    current_step().record_call(SimpleNamespace(prompt_tokens=prompt_tokens, completion_tokens=completion_tokens))
+
+
+def test_llm_usage_is_attributed_to_the_running_step():
+    """Calls made while a step runs, including in a worker thread, count against that step."""
+    flow = FakeFlow()
+    recorder = FlowMetricsRecorder()
+    recorder.attach(flow)
+
+    def outline():
+        fake_llm_call(100, 20)
+        fake_llm_call(50, 10)
+        return "outline"
+
+    async def chapters():
+        await asyncio.to_thread(fake_llm_call, 300, 200)
+        current_step().record_failure()
+        return "chapters"
+
+    async def run():
+        await flow._execute_method("outline", outline)
+        await flow._execute_method("chapters", chapters)
+
+    asyncio.run(run())
+    metrics = recorder.to_dict()
+
+    outline_step, chapters_step = metrics["steps"]
+    assert outline_step["name"] == "outline"
+    assert (outline_step["llm_calls"], outline_step["prompt_tokens"], outline_step["completion_tokens"]) == (2, 150, 30)
+    assert (chapters_step["llm_calls"], chapters_step["retries"]) == (1, 1)
+    assert metrics["totals"]["prompt_tokens"] == 450
+    assert metrics["totals"]["completion_tokens"] == 230
+    assert current_step() is None
+
+
+def test_failed_step_is_recorded_with_error():
+    """A step that raises is still timed and carries the error type."""
+    flow = FakeFlow()
+    recorder = FlowMetricsRecorder()
+    recorder.attach(flow)
+
+    def broken():
+        raise ValueError("boom")
+
+    with pytest.raises(ValueError):
+        asyncio.run(flow._execute_method("broken", broken))
+
+    step = recorder.to_dict()["steps"][0]
+    assert step["error"] == "ValueError"
+    assert step["ended_at"] is not None
+
+
+def test_runs_accumulate_across_resumes():
+    """A resumed execution keeps earlier runs' steps and sums queue waits."""
+    started = datetime(2024, 1, 1, 12, 0, 0)
+    first = FlowMetricsRecorder()
+    first.start_run(started - timedelta(seconds=5), started)
+
+    second = FlowMetricsRecorder(first.to_dict())
+    second.start_run(started, started + timedelta(seconds=2))
+    metrics = second.to_dict()
+
+    assert [run["run"] for run in metrics["runs"]] == [0, 1]
+    assert metrics["totals"]["queue_wait_seconds"] == 7.0
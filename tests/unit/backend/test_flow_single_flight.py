@@ -0,0 +1,160 @@
+"""
+Test Name: test_flow_single_flight
+Description: Unit tests for single-flight flow executions (attaching to an in-flight leader, resume and retry on a cache key collision)
+
+Environment:
+    - Conda Environment: quiz_master_backend
+    - Working Directory: tests/unit/backend
+    - Required Services: None
+
+Setup:
+    1. No setup required
+
+Execution:
+    pytest tests/unit/backend/test_flow_single_flight.py
+
+Expected Results:
+    All single-flight tests pass
+"""
+
+import asyncio
+import os
+import sys
+from datetime import datetime
+from uuid import uuid4
+
+import pytest
+from fastapi import HTTPException
+from sqlalchemy.exc import IntegrityError
+
+# Add the backend directory to the Python path
+sys.path.append(os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))), "backend"))
+
+from api.core.models import FlowExecution as DBFlowExecution, FlowExecutionStatus
+from api.flows.flow_wrapper import FlowWrapper
+
+
+class FakeResult:
+    def __init__(self, value):
+        self.value = value
+
+    def scalar_one_or_none(self):
+        return self.value
+
+
+class FakeSession:
+    """Returns scripted lookup results in order; the first commits raise IntegrityError as scripted."""
+
+    def __init__(self, results, failing_commits=0):
+        self.results = list(results)
+        self.failing_commits = failing_commits
+        self.added = []
+        self.commits = 0
+        self.rollbacks = 0
+
+    async def execute(self, stmt):
+        return FakeResult(self.results.pop(0))
+
+    def add(self, row):
+        self.added.append(row)
+
+    async def commit(self):
+        if self.failing_commits:
+            self.failing_commits -= 1
+            raise IntegrityError("INSERT", {}, Exception("uq_flow_executions_in_flight_cache_key"))
+        self.commits += 1
+
+    async def rollback(self):
+        self.rollbacks += 1
+
+    async def refresh(self, row):
+        pass
+
+
+def make_execution(status=FlowExecutionStatus.PENDING, user_id=None, **kwargs):
+    return DBFlowExecution(
+        id=uuid4(),
+        flow_name="book_flow",
+        user_id=user_id or uuid4(),
+        status=status,
+        cache_key="book_flow:abc",
+        created_at=datetime(2026, 1, 1),
+        **kwargs
+    )
+
+
+def test_identical_request_from_another_user_attaches_to_the_leader():
+    """A second user's identical request becomes a follower of the in-flight leader."""
+    leader = make_execution(status=FlowExecutionStatus.RUNNING)
+    session = FakeSession([leader])
+    execution = make_execution()
+
+    result = asyncio.run(FlowWrapper(enable_caching=False)._add_single_flight(session, execution))
+
+    assert result is execution
+    assert execution.leader_id == leader.id
+    assert session.added == [execution]
+
+
+def test_insert_racing_another_leader_attaches_after_the_collision():
+    """A leader inserted concurrently by another process makes the insert fail, then the request attaches."""
+    leader = make_execution()
+    # no leader yet, insert collides, the retry finds the other process's leader
+    session = FakeSession([None, leader], failing_commits=1)
+    execution = make_execution()
+
+    result = asyncio.run(FlowWrapper(enable_caching=False)._add_single_flight(session, execution))
+
+    assert session.rollbacks == 1
+    assert result.leader_id == leader.id
+
+
+def test_identical_request_from_the_same_user_shares_the_leader():
+    """The same user's identical request returns the in-flight row itself."""
+    user_id = uuid4()
+    leader = make_execution(status=FlowExecutionStatus.RUNNING, user_id=user_id)
+    session = FakeSession([leader])
+
+    result = asyncio.run(FlowWrapper(enable_caching=False)._add_single_flight(session, make_execution(user_id=user_id)))
+
+    assert result is leader
+    assert session.added == []
+
+
+def test_resume_on_collision_attaches_to_the_in_flight_leader():
+    """Requeueing a paused leader whose cache key is already in flight attaches it instead of failing."""
+    leader = make_execution(status=FlowExecutionStatus.RUNNING)
+    paused = make_execution(status=FlowExecutionStatus.PAUSED, error="paused")
+    session = FakeSession([leader], failing_commits=1)
+
+    result = asyncio.run(FlowWrapper(enable_caching=False)._requeue(session, paused))
+
+    assert session.rollbacks == 1
+    assert paused.leader_id == leader.id
+    assert paused.status == FlowExecutionStatus.PENDING
+    assert paused.queued_at is None
+    assert paused.error is None
+    assert result.leader_id == leader.id
+
+
+def test_requeue_without_collision_queues_the_execution():
+    """Without an identical execution in flight the execution goes back to the queue as a leader."""
+    failed = make_execution(status=FlowExecutionStatus.FAILED, error="boom")
+    session = FakeSession([])
+
+    result = asyncio.run(FlowWrapper(enable_caching=False)._requeue(session, failed))
+
+    assert result.leader_id is None
+    assert failed.status == FlowExecutionStatus.PENDING
+    assert failed.queued_at is not None
+
+
+def test_requeue_collision_with_a_finished_leader_is_a_conflict():
+    """If the colliding leader finishes before it can be found, the caller is asked to retry."""
+    paused = make_execution(status=FlowExecutionStatus.PAUSED)
+    session = FakeSession([None], failing_commits=1)
+
+    with pytest.raises(HTTPException) as excinfo:
+        asyncio.run(FlowWrapper(enable_caching=False)._requeue(session, paused))
+
+    assert excinfo.value.status_code == 409
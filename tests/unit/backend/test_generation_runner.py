@@ -0,0 +1,194 @@
+"""
+Test Name: test_generation_runner
+Description: Unit tests for the blueprint generation runner (concurrency caps, fair per-user dequeuing, admission limits across processes, queue positions)
+
+Environment:
+    - Conda Environment: quiz_master_backend
+    - Working Directory: tests/unit/backend
+    - Required Services: None
+
+Setup:
+    1. No setup required
+
+Execution:
+    pytest tests/unit/backend/test_generation_runner.py
+
+Expected Results:
+    All generation runner tests pass
+"""
+
+import asyncio
+import os
+import sys
+import threading
+from datetime import datetime
+
+import pytest
+from sqlalchemy.dialects import postgresql
+
+# Add the backend directory to the Python path
+sys.path.append(os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))), "backend"))
+
+from api.crews.generation_runner import GenerationRejected, GenerationRunner, stored_jobs_query
+
+
+class FakeResult:
+    def __init__(self, value):
+        self.value = value
+
+    def scalar_one(self):
+        return self.value
+
+
+class FakeSession:
+    """Returns scripted results in order and records the statements executed."""
+
+    def __init__(self, results):
+        self.results = list(results)
+        self.statements = []
+
+    async def execute(self, stmt):
+        self.statements.append(stmt)
+        return FakeResult(self.results.pop(0))
+
+
+def compile_sql(stmt) -> str:
+    return str(stmt.compile(dialect=postgresql.dialect(), compile_kwargs={"literal_binds": True}))
+
+
+def test_runner_caps_running_jobs_and_reports_queue():
+    async def run():
+        runner = GenerationRunner(max_running=2, max_running_per_user=2, max_queued_per_user=10)
+        release = asyncio.Event()
+        started = []
+
+        def job(name):
+            async def go():
+                started.append(name)
+                await release.wait()
+            return go
+
+        for name in "abcd":
+            runner.submit(name, job(name))
+        await asyncio.sleep(0.01)
+
+        assert started == ["a", "b"]
+        assert runner.stats["running"] == 2
+        assert runner.stats["queued"] == 2
+        assert runner.position("d") == 1
+        assert runner.is_running("a")
+
+        release.set()
+        await asyncio.sleep(0.01)
+        assert runner.stats["completed"] == 4
+        await runner.stop()
+
+    asyncio.run(run())
+
+
+def test_failed_job_does_not_stop_the_runner():
+    async def run():
+        runner = GenerationRunner(max_running=1)
+        done = asyncio.Event()
+
+        async def broken():
+            raise RuntimeError("crew failed")
+
+        async def ok():
+            done.set()
+
+        runner.submit("broken", broken)
+        runner.submit("ok", ok)
+        await asyncio.wait_for(done.wait(), 1)
+
+        assert runner.stats["failed"] == 1
+        await runner.stop()
+
+    asyncio.run(run())
+
+
+def test_blocking_calls_run_on_the_runner_threads():
+    async def run():
+        runner = GenerationRunner(max_running=1)
+        name = await runner.run_blocking(lambda: threading.current_thread().name)
+
+        assert name.startswith("blueprint-generation")
+        await runner.stop()
+
+    asyncio.run(run())
+
+
+def test_users_take_turns_and_limits_are_enforced():
+    async def run():
+        runner = GenerationRunner(max_running=1, max_running_per_user=1, max_queued=10, max_queued_per_user=3)
+        release = asyncio.Event()
+        started = []
+
+        def job(name):
+            async def go():
+                started.append(name)
+                await release.wait()
+            return go
+
+        for name in ("a1", "a2", "a3"):
+            runner.submit(name, job(name), user_id="alice")
+        runner.submit("b1", job("b1"), user_id="bob")
+        await asyncio.sleep(0.01)
+
+        # alice's first job runs; bob's job is next despite being submitted last
+        assert started == ["a1"]
+        assert runner.position("b1") == 0
+        assert runner.position("a3") == 2
+        with pytest.raises(GenerationRejected) as rejected:
+            runner.submit("a4", job("a4"), user_id="alice")
+        assert rejected.value.retry_after >= 1
+
+        release.set()
+        await asyncio.sleep(0.01)
+        assert started == ["a1", "b1", "a2", "a3"]
+        await runner.stop()
+
+    asyncio.run(run())
+
+
+def test_wait_estimate_grows_with_queue_position():
+    runner = GenerationRunner(max_running=2)
+    runner._average_seconds = 60.0
+
+    assert runner.estimated_wait(0) == 0
+    assert runner.estimated_wait(3) == 60.0
+
+
+def test_stored_job_counts_cover_all_processes():
+    """The user's queued and generating blueprints are counted, the queue counts queued ones only."""
+    since = datetime(2026, 1, 1, 12, 0, 0)
+    user_sql = compile_sql(stored_jobs_query(since, "7d1a4b1e-0000-4000-8000-000000000001"))
+    queue_sql = compile_sql(stored_jobs_query(since))
+
+    assert "status IN ('queued', 'generating')" in user_sql
+    assert "created_by = '7d1a4b1e-0000-4000-8000-000000000001'" in user_sql
+    assert "generation_started_at >= '2026-01-01 12:00:00'" in user_sql
+    assert "status IN ('queued')" in queue_sql
+    assert "created_by" not in queue_sql
+
+
+def test_stored_admission_rejects_jobs_queued_by_other_processes():
+    """Jobs another process queued count toward the user's limit, checked under the admission lock."""
+    runner = GenerationRunner(max_queued=10, max_queued_per_user=3)
+    # advisory lock, then three jobs of the user stored by other processes
+    session = FakeSession([None, 3])
+
+    with pytest.raises(GenerationRejected):
+        asyncio.run(runner.check_stored_admission(session, "alice", datetime(2026, 1, 1)))
+
+    assert "pg_advisory_xact_lock(hashtext('blueprint_generation_admission'))" in compile_sql(session.statements[0])
+    assert runner.rejected == 1
+
+
+def test_stored_admission_rejects_when_the_shared_queue_is_full():
+    """The queue cap counts queued blueprints of every process."""
+    runner = GenerationRunner(max_queued=10, max_queued_per_user=3)
+
+    with pytest.raises(GenerationRejected):
+        asyncio.run(runner.check_stored_admission(FakeSession([None, 0, 10]), "alice", datetime(2026, 1, 1)))
+    asyncio.run(runner.check_stored_admission(FakeSession([None, 2, 9]), "alice", datetime(2026, 1, 1)))
@@ -0,0 +1,190 @@
+"""
+Test Name: test_log_archive
+Description: Unit tests for compressing and appending archived flow logs, filtering them like live log queries and archive retention
+
+Environment:
+    - Conda Environment: quiz_master_backend
+    - Working Directory: tests/unit/backend
+    - Required Services: None
+
+Setup:
+    1. No setup required
+
+Execution:
+    pytest tests/unit/backend/test_log_archive.py
+
+Expected Results:
+    All log archive tests pass
+"""
+
+import asyncio
+import os
+import sys
+from datetime import datetime, timedelta, timezone
+from uuid import UUID, uuid4
+
+# Add the backend directory to the Python path
+sys.path.append(os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))), "backend"))
+
+from sqlalchemy.dialects import postgresql
+
+from api.core.models import FlowLog, LogLevel
+from api.flows import log_archive
+from api.flows.log_archive import (
+    archive_execution_logs,
+    archived_line,
+    compress_logs,
+    drop_expired_archives,
+    expired_archives_statement,
+    filter_archived_logs,
+    iter_archived_logs,
+)
+
+START = datetime(2024, 5, 1, 12, 0, tzinfo=timezone.utc)
+
+
+def make_lines(levels):
+    return [
+        {
+            "id": str(uuid4()),
+            "timestamp": (START + timedelta(seconds=i)).isoformat(),
+            "level": level,
+            "message": f"line {i}",
+            "metadata": {"step": i},
+        }
+        for i, level in enumerate(levels)
+    ]
+
+
+def test_archive_round_trip_is_lossless_and_smaller():
+    lines = make_lines(["info"] * 200)
+
+    data, count, size = compress_logs(lines)
+
+    assert list(iter_archived_logs(data)) == lines
+    assert count == 200
+    assert len(data) < size
+
+
+def test_filters_match_live_query_semantics():
+    lines = make_lines(["debug", "info", "warning", "error", "info"])
+    position = (datetime.fromisoformat(lines[0]["timestamp"]), UUID(lines[0]["id"]))
+
+    filtered = filter_archived_logs(
+        lines,
+        position=position,
+        levels={"info", "warning", "error"},
+        since=START + timedelta(seconds=2),
+        until=START + timedelta(seconds=4),
+    )
+
+    assert [line["message"] for line in filtered] == ["line 2", "line 3"]
+
+
+def test_naive_filter_times_are_read_as_utc():
+    lines = make_lines(["info", "info"])
+
+    filtered = filter_archived_logs(lines, since=(START + timedelta(seconds=1)).replace(tzinfo=None))
+
+    assert [line["message"] for line in filtered] == ["line 1"]
+
+
+class FakeSession:
+    def __init__(self, rowcount):
+        self.rowcount = rowcount
+        self.statements = []
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    async def execute(self, stmt):
+        self.statements.append(stmt)
+        return type("Result", (), {"rowcount": self.rowcount})()
+
+    async def commit(self):
+        pass
+
+
+def test_archives_past_retention_are_deleted_by_their_newest_line():
+    sql = str(expired_archives_statement(START).compile(
+        dialect=postgresql.dialect(), compile_kwargs={"literal_binds": True}
+    ))
+
+    assert sql.startswith("DELETE FROM flow_log_archives")
+    assert "last_timestamp < '2024-05-01 12:00:00+00:00'" in sql
+
+
+def test_archive_retention_follows_log_retention(monkeypatch):
+    session = FakeSession(rowcount=4)
+    monkeypatch.setattr(log_archive, "get_session_maker", lambda: lambda: session)
+
+    assert asyncio.run(drop_expired_archives(retention_days=90)) == 4
+    assert len(session.statements) == 1
+    # Keeping logs forever keeps archives forever
+    assert asyncio.run(drop_expired_archives(retention_days=0)) == 0
+    assert len(session.statements) == 1
+
+
+class StreamingSession(FakeSession):
+    """Streams log rows and records the statements executed."""
+
+    def __init__(self, logs):
+        super().__init__(rowcount=0)
+        self.logs = logs
+        self.streamed = None
+
+    async def stream_scalars(self, stmt):
+        self.streamed = stmt
+
+        async def rows():
+            for log in self.logs:
+                yield log
+
+        return rows()
+
+
+def make_logs(first, count):
+    execution_id = uuid4()
+    return [
+        FlowLog(
+            id=uuid4(),
+            execution_id=execution_id,
+            timestamp=START + timedelta(seconds=first + i),
+            level=LogLevel.INFO,
+            message=f"line {first + i}",
+        )
+        for i in range(count)
+    ]
+
+
+def test_archiving_appends_a_gzip_member_and_adds_to_the_totals():
+    """New rows are streamed into a member appended in SQL; the earlier blob is never read back."""
+    earlier, later = make_logs(0, 3), make_logs(3, 2)
+    previous, _, _ = compress_logs(archived_line(log) for log in earlier)
+    session = StreamingSession(later)
+
+    assert asyncio.run(archive_execution_logs(session, uuid4())) == 2
+
+    assert session.streamed.get_execution_options()["yield_per"] == log_archive.ARCHIVE_FETCH_SIZE
+    upsert, delete = session.statements
+    member = upsert.compile(dialect=postgresql.dialect()).params["data"]
+    # Readers see the earlier and appended members as one stream of lines
+    assert [line["message"] for line in iter_archived_logs(previous + member)] == [
+        f"line {i}" for i in range(5)
+    ]
+    sql = str(upsert.compile(dialect=postgresql.dialect()))
+    assert "data = (flow_log_archives.data || excluded.data)" in sql
+    assert "line_count = (flow_log_archives.line_count + excluded.line_count)" in sql
+    assert "uncompressed_bytes = (flow_log_archives.uncompressed_bytes + excluded.uncompressed_bytes)" in sql
+    assert "first_timestamp = coalesce(flow_log_archives.first_timestamp, excluded.first_timestamp)" in sql
+    assert str(delete).startswith("DELETE FROM flow_logs")
+
+
+def test_archiving_without_rows_writes_nothing():
+    session = StreamingSession([])
+
+    assert asyncio.run(archive_execution_logs(session, uuid4())) == 0
+    assert session.statements == []
@@ -0,0 +1,149 @@
+"""
+Test Name: test_log_bridge
+Description: Unit tests for the thread-safe bridge from stdlib logging into flow execution logs
+
+Environment:
+    - Conda Environment: quiz_master_backend
+    - Working Directory: tests/unit/backend
+    - Required Services: None
+
+Setup:
+    1. No setup required
+
+Execution:
+    pytest tests/unit/backend/test_log_bridge.py
+
+Expected Results:
+    All log bridge tests pass
+"""
+
+import asyncio
+import logging
+import os
+import sys
+import threading
+
+import pytest
+
+# Add the backend directory to the Python path
+sys.path.append(os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))), "backend"))
+
+from api.core.models import LogLevel
+from api.flows import log_bridge
+from api.flows.log_bridge import DatabaseLogHandler, LogBridge, bind_log_bridge, install_log_bridge, unbind_log_bridge
+
+
+class RecordingLogger:
+    """Stands in for a DatabaseLogger and records the thread of each call."""
+
+    def __init__(self):
+        self.lines = []
+        self.threads = set()
+
+    def log(self, level, msg, metadata=None):
+        self.lines.append((level, msg, metadata))
+        self.threads.add(threading.get_ident())
+
+
+def test_records_from_threads_reach_the_logger_on_its_loop():
+    async def run():
+        db_logger = RecordingLogger()
+        bridge = LogBridge(db_logger, maxsize=1000)
+
+        def worker(n):
+            for i in range(50):
+                bridge.submit(LogLevel.INFO, f"{n}-{i}", {})
+
+        threads = [threading.Thread(target=worker, args=(n,)) for n in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        await asyncio.sleep(0)
+
+        assert len(db_logger.lines) == 200
+        assert db_logger.threads == {threading.get_ident()}
+
+    asyncio.run(run())
+
+
+def test_bridge_drops_oldest_records_when_full():
+    async def run():
+        db_logger = RecordingLogger()
+        bridge = LogBridge(db_logger, maxsize=2)
+        for i in range(3):
+            bridge.submit(LogLevel.INFO, str(i), {})
+        bridge.flush()
+
+        assert [msg for _, msg, _ in db_logger.lines] == ["1", "2"]
+        assert bridge.dropped == 1
+
+    asyncio.run(run())
+
+
+def test_handler_routes_records_of_the_bound_context_only():
+    async def run():
+        db_logger = RecordingLogger()
+        bridge = LogBridge(db_logger)
+        source = logging.getLogger("test_log_bridge.crew")
+        source.propagate = False
+        source.setLevel(logging.DEBUG)
+        source.addHandler(DatabaseLogHandler())
+
+        source.warning("before the run")
+        token = bind_log_bridge(bridge)
+        try:
+            await asyncio.to_thread(source.warning, "from a crew thread")
+        finally:
+            unbind_log_bridge(token)
+        source.warning("after the run")
+        bridge.flush()
+
+        assert db_logger.lines == [
+            (LogLevel.WARNING, "from a crew thread", {"logger": "test_log_bridge.crew", "thread": db_logger.lines[0][2]["thread"]})
+        ]
+
+    asyncio.run(run())
+
+
+def test_installing_the_bridge_leaves_logger_levels_alone(monkeypatch):
+    """Capture only adds a handler; it does not make crewai or app loggers more verbose process-wide."""
+    monkeypatch.setattr(log_bridge, "_handler", None)
+    crewai_logger = logging.getLogger("crewai")
+    monkeypatch.setattr(crewai_logger, "level", logging.WARNING)
+
+    install_log_bridge()
+    handler = log_bridge._handler
+    try:
+        assert handler in crewai_logger.handlers
+        assert crewai_logger.level == logging.WARNING
+        assert handler.level == logging.INFO
+    finally:
+        for name in ("crewai", "api.crews", log_bridge.VERBOSE_LOGGER):
+            logging.getLogger(name).removeHandler(handler)
+
+
+def test_printer_is_restored_once_no_run_is_bound(monkeypatch):
+    """CrewAI's Printer.print is only wrapped while a run is bound and comes back unchanged afterwards."""
+    printer_module = pytest.importorskip("crewai.utilities.printer")
+    Printer = printer_module.Printer
+    original = Printer.print
+    monkeypatch.setattr(log_bridge, "_handler", None)
+    db_logger = RecordingLogger()
+    bridge = LogBridge(db_logger, asyncio.new_event_loop())
+
+    first = bind_log_bridge(bridge)
+    second = bind_log_bridge(bridge)
+    try:
+        assert Printer.print is not original
+        unbind_log_bridge(second)
+        assert Printer.print is not original
+    finally:
+        unbind_log_bridge(first)
+        bridge._loop.close()
+        handler = log_bridge._handler
+        for name in ("crewai", "api.crews", log_bridge.VERBOSE_LOGGER):
+            logging.getLogger(name).removeHandler(handler)
+
+    assert Printer.print is original
+    assert log_bridge._verbose_runs == 0
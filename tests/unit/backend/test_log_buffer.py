@@ -0,0 +1,99 @@
+"""
+Test Name: test_log_buffer
+Description: Unit tests for the bounded flow log buffer (overflow policies, DEBUG sampling, drop accounting)
+
+Environment:
+    - Conda Environment: quiz_master_backend
+    - Working Directory: tests/unit/backend
+    - Required Services: None
+
+Setup:
+    1. No setup required
+
+Execution:
+    pytest tests/unit/backend/test_log_buffer.py
+
+Expected Results:
+    All log buffer tests pass
+"""
+
+import asyncio
+import os
+import random
+import sys
+
+import pytest
+
+# Add the backend directory to the Python path
+sys.path.append(os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))), "backend"))
+
+from api.flows.log_buffer import LogBuffer
+
+
+def entry(level, message):
+    return {"level": level, "message": message, "log_metadata": None}
+
+
+def drain(buffer):
+    lines = []
+    while not buffer.empty():
+        lines.append(buffer.get_nowait())
+    return lines
+
+
+def test_drop_debug_evicts_queued_debug_before_other_levels():
+    """When full, queued DEBUG lines make room for more important lines."""
+    buffer = LogBuffer(maxsize=2, policy="drop_debug")
+    buffer.put_nowait(entry("debug", "d1"))
+    buffer.put_nowait(entry("info", "i1"))
+
+    assert buffer.put_nowait(entry("error", "e1"))
+    assert not buffer.put_nowait(entry("debug", "d2"))
+
+    assert [line["message"] for line in drain(buffer)] == ["i1", "e1"]
+    assert buffer.stats["dropped"] == 2
+
+
+def test_coalesce_merges_repeated_lines():
+    """Repeats of the newest line are merged and counted instead of dropped."""
+    buffer = LogBuffer(maxsize=1, policy="coalesce")
+    for _ in range(3):
+        buffer.put_nowait(entry("info", "retrying"))
+
+    (line,) = drain(buffer)
+    assert line["log_metadata"] == {"repeated": 3}
+    assert buffer.stats["coalesced"] == 2
+    assert buffer.stats["dropped"] == 0
+
+
+def test_block_policy_waits_for_space():
+    """Async producers wait under the block policy instead of losing lines."""
+    async def run():
+        buffer = LogBuffer(maxsize=1, policy="block")
+        await buffer.put(entry("info", "first"))
+        producer = asyncio.create_task(buffer.put(entry("info", "second")))
+        await asyncio.sleep(0)
+        assert not producer.done()
+
+        assert (await buffer.get())["message"] == "first"
+        await producer
+        assert (await buffer.get())["message"] == "second"
+        assert buffer.stats["dropped"] == 0
+
+    asyncio.run(run())
+
+
+def test_debug_sampling_counts_skipped_lines():
+    """Sampled-out DEBUG lines are counted; other levels are never sampled."""
+    buffer = LogBuffer(maxsize=1000, debug_sample_rate=0.0, rng=random.Random(0))
+    for i in range(10):
+        buffer.put_nowait(entry("debug", f"d{i}"))
+    buffer.put_nowait(entry("warning", "w"))
+
+    assert buffer.qsize() == 1
+    assert buffer.stats["sampled_out"] == 10
+
+
+def test_unknown_policy_is_rejected():
+    with pytest.raises(ValueError):
+        LogBuffer(maxsize=1, policy="spill_to_disk")
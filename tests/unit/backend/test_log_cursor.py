@@ -0,0 +1,109 @@
+"""
+Test Name: test_log_cursor
+Description: Unit tests for resuming flow log streams from a cursor (cursor round trip through the log query, resuming from a line id)
+
+Environment:
+    - Conda Environment: quiz_master_backend
+    - Working Directory: tests/unit/backend
+    - Required Services: None
+
+Setup:
+    1. No setup required
+
+Execution:
+    pytest tests/unit/backend/test_log_cursor.py
+
+Expected Results:
+    All log cursor tests pass
+"""
+
+import asyncio
+import os
+import sys
+from datetime import datetime, timezone
+from uuid import uuid4
+
+from sqlalchemy.dialects import postgresql
+
+# Add the backend directory to the Python path
+sys.path.append(os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))), "backend"))
+
+from api.core.models import FlowLog, LogLevel
+from api.flows.log_archive import compress_logs
+from api.flows.pagination import decode_cursor
+from api.routers.flow_logs import build_log_query, log_to_dict, resolve_log_cursor
+
+EXECUTION_ID = "6f1c2b7e-0000-4000-8000-000000000001"
+
+
+def compile_sql(stmt) -> str:
+    return str(stmt.compile(dialect=postgresql.dialect(), compile_kwargs={"literal_binds": True}))
+
+
+def make_log(timestamp):
+    return FlowLog(
+        id=uuid4(),
+        execution_id=EXECUTION_ID,
+        timestamp=timestamp,
+        level=LogLevel.INFO,
+        message="step finished"
+    )
+
+
+class FakeResult:
+    def __init__(self, value):
+        self.value = value
+
+    def scalar_one_or_none(self):
+        return self.value
+
+
+class FakeSession:
+    """Answers the live timestamp lookup, then the archive lookup."""
+
+    def __init__(self, results):
+        self.results = list(results)
+
+    async def execute(self, stmt):
+        return FakeResult(self.results.pop(0))
+
+
+def test_cursor_of_a_line_resumes_strictly_after_it():
+    """A line's cursor decodes to its (timestamp, id), and the query resumes after exactly that line."""
+    log = make_log(datetime(2025, 3, 4, 10, 30, 15, 123456, tzinfo=timezone.utc))
+    line = log_to_dict(log)
+
+    position = decode_cursor(line["cursor"])
+    sql = compile_sql(build_log_query(EXECUTION_ID, position, min_level=LogLevel.WARNING))
+
+    assert position == (log.timestamp, log.id)
+    assert f"(flow_logs.timestamp, flow_logs.id) > ('2025-03-04 10:30:15.123456+00:00', '{log.id}')" in sql
+    assert "flow_logs.level IN ('WARNING', 'ERROR')" in sql
+    assert sql.endswith("ORDER BY flow_logs.timestamp, flow_logs.id")
+
+
+def test_lines_logged_in_the_same_instant_are_ordered_by_id():
+    """Ties on timestamp are broken by id, so a cursor never skips or repeats a line."""
+    timestamp = datetime(2025, 3, 4, 10, 30, tzinfo=timezone.utc)
+    first, second = sorted((make_log(timestamp), make_log(timestamp)), key=lambda log: log.id)
+
+    assert decode_cursor(log_to_dict(first)["cursor"]) < decode_cursor(log_to_dict(second)["cursor"])
+
+
+def test_resume_from_a_line_id_finds_archived_lines():
+    """A client resuming by line id gets the cursor of that line even after it was archived."""
+    log = make_log(datetime(2025, 3, 4, 10, 30, tzinfo=timezone.utc))
+    archive, _, _ = compress_logs([log_to_dict(log)])
+    # not in flow_logs any more, then the archive blob
+    db = FakeSession([None, archive])
+
+    position = asyncio.run(resolve_log_cursor(db, EXECUTION_ID, after=str(log.id)))
+
+    assert position == (log.timestamp, log.id)
+
+
+def test_unknown_line_id_replays_the_full_history():
+    """An id that is nowhere to be found replays everything rather than skipping lines."""
+    db = FakeSession([None, None])
+
+    assert asyncio.run(resolve_log_cursor(db, EXECUTION_ID, after=str(uuid4()))) is None
@@ -0,0 +1,149 @@
+"""
+Test Name: test_log_export
+Description: Unit tests for the streaming NDJSON log export (archived then live lines in cursor order, resuming, limits)
+
+Environment:
+    - Conda Environment: quiz_master_backend
+    - Working Directory: tests/unit/backend
+    - Required Services: None
+
+Setup:
+    1. No setup required
+
+Execution:
+    pytest tests/unit/backend/test_log_export.py
+
+Expected Results:
+    All log export tests pass
+"""
+
+import asyncio
+import json
+import os
+import sys
+from datetime import datetime, timedelta, timezone
+from uuid import uuid4
+
+# Add the backend directory to the Python path
+sys.path.append(os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))), "backend"))
+
+from api.core.models import FlowLog, LogLevel
+from api.flows.log_archive import compress_logs
+from api.flows.pagination import decode_cursor
+from api.routers import flow_logs
+from api.routers.flow_logs import export_logs_ndjson, log_to_dict
+
+EXECUTION_ID = "6f1c2b7e-0000-4000-8000-000000000002"
+START = datetime(2025, 3, 4, 10, 0, tzinfo=timezone.utc)
+
+
+def make_logs(first, count):
+    return [
+        FlowLog(
+            id=uuid4(),
+            execution_id=EXECUTION_ID,
+            timestamp=START + timedelta(seconds=first + i),
+            level=LogLevel.INFO,
+            message=f"line {first + i}"
+        )
+        for i in range(count)
+    ]
+
+
+class FakeResult:
+    def __init__(self, value):
+        self.value = value
+
+    def scalar_one_or_none(self):
+        return self.value
+
+
+class FakeStream:
+    """A server-side cursor yielding the live rows in fetches of ``size``."""
+
+    def __init__(self, rows, size):
+        self.rows = rows
+        self.size = size
+
+    def scalars(self):
+        return self
+
+    async def partitions(self):
+        for start in range(0, len(self.rows), self.size):
+            yield self.rows[start:start + self.size]
+
+
+class FakeSession:
+    def __init__(self, archive, live, fetch_size=2):
+        self.archive = archive
+        self.live = live
+        self.fetch_size = fetch_size
+        self.streamed = []
+        self.expunged = 0
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    async def execute(self, stmt):
+        return FakeResult(self.archive)
+
+    async def stream(self, stmt):
+        self.streamed.append(stmt)
+        return FakeStream(self.live, self.fetch_size)
+
+    def expunge_all(self):
+        self.expunged += 1
+
+
+def export(monkeypatch, session, **kwargs):
+    monkeypatch.setattr(flow_logs, "get_session_maker", lambda: lambda: session)
+
+    async def run():
+        return [chunk async for chunk in export_logs_ndjson(EXECUTION_ID, **kwargs)]
+
+    return asyncio.run(run())
+
+
+def parse(chunks):
+    return [json.loads(raw) for raw in "".join(chunks).splitlines()]
+
+
+def test_export_streams_archived_then_live_lines_in_cursor_order(monkeypatch):
+    archived = make_logs(0, 3)
+    live = make_logs(3, 5)
+    archive, _, _ = compress_logs([log_to_dict(log) for log in archived])
+    session = FakeSession(archive, live)
+
+    lines = parse(export(monkeypatch, session))
+
+    assert [line["message"] for line in lines] == [f"line {i}" for i in range(8)]
+    cursors = [decode_cursor(line["cursor"]) for line in lines]
+    assert cursors == sorted(cursors)
+    # Live rows arrive one fetch at a time and are released after being sent
+    assert session.expunged == 3
+
+
+def test_export_resumes_after_a_cursor_and_stops_at_the_limit(monkeypatch):
+    archived = make_logs(0, 3)
+    archive, _, _ = compress_logs([log_to_dict(log) for log in archived])
+    position = (archived[0].timestamp, archived[0].id)
+    session = FakeSession(archive, make_logs(3, 1))
+
+    lines = parse(export(monkeypatch, session, position=position, limit=3))
+
+    assert [line["message"] for line in lines] == ["line 1", "line 2", "line 3"]
+    # Only the lines still missing from the limit are asked of the live table
+    assert session.streamed[0]._limit_clause.value == 1
+
+
+def test_export_of_archived_lines_only_does_not_query_live_rows(monkeypatch):
+    archive, _, _ = compress_logs([log_to_dict(log) for log in make_logs(0, 4)])
+    session = FakeSession(archive, [])
+
+    lines = parse(export(monkeypatch, session, limit=2))
+
+    assert [line["message"] for line in lines] == ["line 0", "line 1"]
+    assert session.streamed == []
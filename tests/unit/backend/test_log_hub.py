@@ -0,0 +1,159 @@
+"""
+Test Name: test_log_hub
+Description: Unit tests for the flow log notification hub (fan-out to every viewer of an execution, slow viewers, unsubscribing, oversized lines)
+
+Environment:
+    - Conda Environment: quiz_master_backend
+    - Working Directory: tests/unit/backend
+    - Required Services: None
+
+Setup:
+    1. No setup required
+
+Execution:
+    pytest tests/unit/backend/test_log_hub.py
+
+Expected Results:
+    All log hub tests pass
+"""
+
+import asyncio
+import json
+import os
+import sys
+from datetime import datetime, timezone
+from uuid import uuid4
+
+# Add the backend directory to the Python path
+sys.path.append(os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))), "backend"))
+
+from api.core.models import FlowLog, LogLevel
+from api.flows import log_hub
+from api.flows.db_logger import MAX_NOTIFY_BYTES, DatabaseLogger
+from api.flows.log_hub import LogNotificationHub
+
+
+def make_hub(queue_size=10):
+    hub = LogNotificationHub(dsn="postgresql://unused", subscriber_queue_size=queue_size, ring_size=0)
+    # Keep the listener from connecting
+    hub.start = lambda: None
+    return hub
+
+
+def notify(hub, execution_id, message):
+    payload = {"origin": "another-process", "execution_id": execution_id, "log": {"message": message}}
+    hub._on_notification(None, 0, "flow_logs", json.dumps(payload))
+
+
+def test_one_notification_reaches_every_viewer_of_the_execution():
+    async def run():
+        hub = make_hub()
+        viewers = [hub.subscribe("exec-1") for _ in range(3)]
+        other = hub.subscribe("exec-2")
+
+        notify(hub, "exec-1", "step started")
+
+        for viewer in viewers:
+            assert await asyncio.wait_for(viewer.get(), timeout=1) == {"message": "step started"}
+        assert other._queue.empty()
+        assert hub.stats["executions"] == 2
+        assert hub.stats["subscribers"] == 4
+
+    asyncio.run(run())
+
+
+def test_slow_viewer_drops_its_oldest_lines_without_blocking_others():
+    async def run():
+        hub = make_hub(queue_size=2)
+        slow = hub.subscribe("exec-1")
+        fast = hub.subscribe("exec-1")
+
+        received = []
+        for i in range(3):
+            notify(hub, "exec-1", f"line {i}")
+            received.append((await fast.get())["message"])
+
+        assert received == ["line 0", "line 1", "line 2"]
+        assert [(await slow.get())["message"] for _ in range(2)] == ["line 1", "line 2"]
+        assert slow.lagged == 1
+        assert hub.stats["lagged"] == 1
+
+    asyncio.run(run())
+
+
+def test_closed_viewers_stop_receiving_lines():
+    async def run():
+        hub = make_hub()
+        viewer = hub.subscribe("exec-1")
+        viewer.close()
+
+        notify(hub, "exec-1", "after close")
+
+        assert viewer._queue.empty()
+        assert hub.stats["subscribers"] == 0
+        assert hub.publish("exec-1", {"message": "direct"}) == 0
+
+    asyncio.run(run())
+
+
+class FakeSession:
+    """Holds stored log rows by primary key."""
+
+    def __init__(self, rows):
+        self.rows = {(row.id, row.timestamp): row for row in rows}
+        self.lookups = []
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    async def get(self, model, key):
+        self.lookups.append(key)
+        return self.rows.get(key)
+
+
+def stored_line(message):
+    """A stored log row and its notification as sent by the logger of another process."""
+    row = FlowLog(
+        id=uuid4(),
+        execution_id="exec-1",
+        timestamp=datetime(2025, 3, 4, 10, 0, tzinfo=timezone.utc),
+        level=LogLevel.INFO,
+        message=message
+    )
+    entry = {
+        "id": row.id,
+        "execution_id": row.execution_id,
+        "timestamp": row.timestamp,
+        "level": row.level,
+        "message": row.message,
+        "log_metadata": None
+    }
+    notification = json.loads(DatabaseLogger._notification(entry))
+    notification["origin"] = "another-process"
+    return row, json.dumps(notification)
+
+
+def test_viewers_in_other_processes_receive_oversized_lines_in_full(monkeypatch):
+    """A line truncated to fit NOTIFY is read back from the database before delivery, in order."""
+    async def run():
+        row, payload = stored_line("x" * (MAX_NOTIFY_BYTES * 2))
+        assert len(payload) < MAX_NOTIFY_BYTES and json.loads(payload)["log"]["truncated"]
+        session = FakeSession([row])
+        monkeypatch.setattr(log_hub, "get_session_maker", lambda: lambda: session)
+        hub = make_hub()
+        viewer = hub.subscribe("exec-1")
+
+        hub._on_notification(None, 0, "flow_logs", payload)
+        notify(hub, "exec-1", "next line")
+
+        full = await asyncio.wait_for(viewer.get(), timeout=1)
+        assert full["message"] == row.message
+        assert "truncated" not in full
+        assert full["cursor"] == json.loads(payload)["log"]["cursor"]
+        assert await asyncio.wait_for(viewer.get(), timeout=1) == {"message": "next line"}
+        assert session.lookups == [(row.id, row.timestamp)]
+
+    asyncio.run(run())
@@ -0,0 +1,152 @@
+"""
+Test Name: test_log_partitions
+Description: Unit tests for flow_logs partition planning and retention
+
+Environment:
+    - Conda Environment: quiz_master_backend
+    - Working Directory: tests/unit/backend
+    - Required Services: None
+
+Setup:
+    1. No setup required
+
+Execution:
+    pytest tests/unit/backend/test_log_partitions.py
+
+Expected Results:
+    All log partition tests pass
+"""
+
+import asyncio
+import os
+import sys
+from datetime import date
+from types import SimpleNamespace
+
+import pytest
+
+# Add the backend directory to the Python path
+sys.path.append(os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))), "backend"))
+
+from api.core import log_partitions
+from api.core.log_partitions import (
+    ensure_partitions,
+    expired_partitions,
+    parse_partition_name,
+    partition_name,
+    planned_partitions,
+)
+
+
+class FakeResult:
+    def __init__(self, value):
+        self.value = value
+
+    def all(self):
+        return [(name,) for name in self.value]
+
+    def scalar_one(self):
+        return self.value
+
+
+class FakeSavepoint:
+    def __init__(self, conn):
+        self.conn = conn
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, *exc):
+        self.conn.savepoints.append("rollback" if exc_type else "release")
+        return False
+
+
+class FakeConnection:
+    """Records SQL; answers partition listings and default partition row counts, and fails scripted creates."""
+
+    def __init__(self, partitions, stranded=None, failing=()):
+        self.partitions = partitions
+        self.stranded = stranded or {}
+        self.failing = failing
+        self.sql = []
+        self.savepoints = []
+
+    def begin_nested(self):
+        return FakeSavepoint(self)
+
+    async def execute(self, statement, params=None):
+        sql = str(statement)
+        self.sql.append(sql)
+        if "pg_inherits" in sql:
+            return FakeResult(self.partitions)
+        if sql.startswith("SELECT count(*)"):
+            return FakeResult(next((rows for day, rows in self.stranded.items() if f"'{day} " in sql), 0))
+        if any(f"{name} PARTITION OF" in sql for name in self.failing):
+            raise RuntimeError("relation is locked")
+        return FakeResult(None)
+
+
+def ensure(monkeypatch, conn, today=date(2025, 1, 6)):
+    settings = SimpleNamespace(flow_log_partition_interval="day", flow_log_partitions_ahead=1)
+    monkeypatch.setattr(log_partitions, "get_settings", lambda: settings)
+    return asyncio.run(ensure_partitions(conn, today=today))
+
+
+def test_daily_partitions_cover_today_and_days_ahead():
+    planned = planned_partitions(date(2024, 12, 30), "day", ahead=2)
+
+    assert [name for name, _, _ in planned] == [
+        "flow_logs_p20241230", "flow_logs_p20241231", "flow_logs_p20250101"
+    ]
+    assert planned[-1][2] == date(2025, 1, 2)
+
+
+def test_weekly_partitions_start_on_monday_and_reach_back_to_since():
+    planned = planned_partitions(date(2024, 5, 16), "week", ahead=1, since=date(2024, 5, 8))
+
+    assert [(start, end) for _, start, end in planned] == [
+        (date(2024, 5, 6), date(2024, 5, 13)),
+        (date(2024, 5, 13), date(2024, 5, 20)),
+        (date(2024, 5, 20), date(2024, 5, 27)),
+    ]
+
+
+def test_only_partitions_entirely_past_retention_expire():
+    names = [partition_name(date(2024, 5, day)) for day in (1, 2, 3)] + ["flow_logs_default"]
+
+    assert expired_partitions(names, "day", retention_days=7, today=date(2024, 5, 10)) == [
+        "flow_logs_p20240501", "flow_logs_p20240502"
+    ]
+
+
+def test_partition_names_round_trip():
+    assert parse_partition_name(partition_name(date(2024, 2, 29))) == date(2024, 2, 29)
+    assert parse_partition_name("flow_logs_default") is None
+
+
+def test_unknown_interval_is_rejected():
+    with pytest.raises(ValueError):
+        planned_partitions(date(2024, 1, 1), "month", ahead=1)
+
+
+def test_rows_stranded_in_the_default_partition_move_to_the_new_partition(monkeypatch):
+    """The default is detached, its rows of the new range moved, and attached again."""
+    conn = FakeConnection(["flow_logs_default"], stranded={"2025-01-06": 12})
+
+    assert ensure(monkeypatch, conn) == ["flow_logs_p20250106", "flow_logs_p20250107"]
+
+    moved = conn.sql[conn.sql.index("ALTER TABLE flow_logs DETACH PARTITION flow_logs_default"):][:5]
+    assert moved[1].startswith("CREATE TABLE flow_logs_p20250106 PARTITION OF flow_logs")
+    assert moved[2].startswith("INSERT INTO flow_logs_p20250106") and "FROM flow_logs_default" in moved[2]
+    assert moved[3].startswith("DELETE FROM flow_logs_default")
+    assert moved[4] == "ALTER TABLE flow_logs ATTACH PARTITION flow_logs_default DEFAULT"
+    # The next partition had no stranded rows and is created in place
+    assert conn.sql.count("ALTER TABLE flow_logs DETACH PARTITION flow_logs_default") == 1
+
+
+def test_a_failing_partition_does_not_abort_the_others(monkeypatch):
+    """Each partition is created in its own savepoint; a failure is rolled back and skipped."""
+    conn = FakeConnection(["flow_logs_default"], failing=("flow_logs_p20250106",))
+
+    assert ensure(monkeypatch, conn) == ["flow_logs_p20250107"]
+    assert conn.savepoints == ["rollback", "release"]
@@ -0,0 +1,134 @@
+"""
+Test Name: test_log_ring
+Description: Unit tests for the in-memory ring of recent flow log lines kept by the log hub and what the flow logger records in it
+
+Environment:
+    - Conda Environment: quiz_master_backend
+    - Working Directory: tests/unit/backend
+    - Required Services: None
+
+Setup:
+    1. No setup required
+
+Execution:
+    pytest tests/unit/backend/test_log_ring.py
+
+Expected Results:
+    All log ring tests pass
+"""
+
+import json
+import os
+import sys
+from datetime import datetime, timedelta, timezone
+from uuid import uuid4
+
+# Add the backend directory to the Python path
+sys.path.append(os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))), "backend"))
+
+from api.core.models import LogLevel
+from api.flows.db_logger import DatabaseLogger
+from api.flows.log_buffer import LogBuffer
+from api.flows.log_hub import PROCESS_ID, LogNotificationHub, LogRing
+
+
+def make_lines(count):
+    start = datetime.now(timezone.utc) + timedelta(seconds=1)
+    lines = []
+    for i in range(count):
+        position = (start + timedelta(milliseconds=i), uuid4())
+        lines.append((position, {"id": str(position[1]), "message": f"line {i}"}))
+    return lines
+
+
+def test_ring_keeps_unwritten_lines_beyond_its_size():
+    ring = LogRing(maxsize=2)
+    lines = make_lines(4)
+    for position, line in lines:
+        ring.append(position, line)
+    assert len(ring) == 4
+
+    ring.mark_persisted(lines[1][0])
+
+    assert len(ring) == 2
+    assert ring.floor == lines[1][0]
+    assert [line["message"] for line in ring.after(None)] == ["line 2", "line 3"]
+
+
+def test_replay_returns_lines_after_position():
+    hub = LogNotificationHub(dsn="postgresql://unused", subscriber_queue_size=10, ring_size=10)
+    hub.open_ring("exec-1")
+    lines = make_lines(3)
+    for position, line in lines:
+        hub.record("exec-1", position, line)
+
+    floor, recent = hub.replay("exec-1", lines[0][0])
+
+    assert floor < lines[0][0]
+    assert [line["message"] for line in recent] == ["line 1", "line 2"]
+    assert hub.replay("exec-2") is None
+
+
+def test_own_notifications_are_not_delivered_twice():
+    hub = LogNotificationHub(dsn="postgresql://unused", subscriber_queue_size=10, ring_size=10)
+    subscription = hub._subscribers.setdefault("exec-1", set())
+    delivered = []
+
+    class Recorder:
+        execution_id = "exec-1"
+        lagged = 0
+
+        def deliver(self, log):
+            delivered.append(log)
+
+    subscription.add(Recorder())
+    log = {"id": "1", "message": "hello"}
+    hub._on_notification(None, 0, "flow_logs", json.dumps({"execution_id": "exec-1", "origin": PROCESS_ID, "log": log}))
+    hub._on_notification(None, 0, "flow_logs", json.dumps({"execution_id": "exec-1", "origin": "other", "log": log}))
+
+    assert delivered == [log]
+
+
+def make_logger(policy, maxsize=2, debug_sample_rate=1.0):
+    """A flow logger recording into a ring of its own hub, with a small buffer and no writer."""
+    db_logger = DatabaseLogger("flow", "exec-1")
+    db_logger._hub = LogNotificationHub(dsn="postgresql://unused", subscriber_queue_size=10, ring_size=10)
+    db_logger._hub.open_ring("exec-1")
+    db_logger._log_queue = LogBuffer(maxsize, policy=policy, debug_sample_rate=debug_sample_rate,
+                                     on_evict=db_logger._evicted)
+    return db_logger
+
+
+def replayed(db_logger):
+    return [(line["message"], line["metadata"]) for line in db_logger._hub.replay("exec-1")[1]]
+
+
+def queued(db_logger):
+    entries = db_logger._log_queue._entries
+    return [(entry["message"], entry["log_metadata"]) for entry in entries]
+
+
+def test_coalesced_repeats_update_the_recorded_line():
+    """A repeat merged into the queued line is not pushed again; the ring shows the repeat count."""
+    db_logger = make_logger("coalesce")
+    db_logger.info("start")
+    db_logger.info("retrying")
+    db_logger.info("retrying")
+    db_logger.info("retrying")
+
+    assert queued(db_logger) == [("start", None), ("retrying", {"repeated": 3})]
+    assert replayed(db_logger) == queued(db_logger)
+
+
+def test_lines_dropped_by_the_buffer_are_not_replayed():
+    """Evicted and sampled-out lines never reach the ring, matching what will be stored."""
+    db_logger = make_logger("drop_debug", debug_sample_rate=0.0)
+    db_logger.debug("sampled out")
+    db_logger.log(LogLevel.DEBUG, "sampled out too")
+    db_logger._log_queue._debug_sample_rate = 1.0
+    db_logger.debug("evicted")
+    db_logger.info("kept")
+    db_logger.warning("also kept")
+
+    assert queued(db_logger) == [("kept", None), ("also kept", None)]
+    assert replayed(db_logger) == queued(db_logger)
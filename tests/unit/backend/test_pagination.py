@@ -0,0 +1,126 @@
+"""
+Test Name: test_pagination
+Description: Unit tests for keyset pagination cursors of flow execution listings
+
+Environment:
+    - Conda Environment: quiz_master_backend
+    - Working Directory: tests/unit/backend
+    - Required Services: None
+
+Setup:
+    1. No setup required
+
+Execution:
+    pytest tests/unit/backend/test_pagination.py
+
+Expected Results:
+    All pagination tests pass
+"""
+
+import asyncio
+import os
+import sys
+import uuid
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+
+import pytest
+
+# Add the backend directory to the Python path
+sys.path.append(os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))), "backend"))
+
+from api.core.models import FlowExecution as DBFlowExecution, FlowExecutionStatus
+from api.flows import flow_wrapper
+from api.flows.flow_wrapper import FlowWrapper
+from api.flows.pagination import (
+    MAX_PAGE_SIZE,
+    clamp_page_size,
+    decode_cursor,
+    encode_cursor,
+    split_page,
+)
+
+
+def test_cursor_round_trip():
+    """A cursor decodes back to the row position it was built from."""
+    created_at = datetime(2024, 5, 1, 12, 30, 15, 123456, tzinfo=timezone.utc)
+    execution_id = uuid.uuid4()
+
+    assert decode_cursor(encode_cursor(created_at, execution_id)) == (created_at, execution_id)
+
+
+def test_invalid_cursor_raises_value_error():
+    """Garbage cursors are rejected instead of silently restarting from the first page."""
+    with pytest.raises(ValueError):
+        decode_cursor("not-a-cursor")
+
+
+def test_split_page_returns_cursor_of_last_row_only_when_more_rows_exist():
+    """The extra fetched row signals a next page; the cursor points at the last returned row."""
+    now = datetime.now(timezone.utc)
+    rows = [SimpleNamespace(id=uuid.uuid4(), created_at=now - timedelta(seconds=i)) for i in range(3)]
+
+    page, next_cursor = split_page(rows, 2)
+    assert page == rows[:2]
+    assert decode_cursor(next_cursor) == (rows[1].created_at, rows[1].id)
+
+    page, next_cursor = split_page(rows[:2], 2)
+    assert page == rows[:2]
+    assert next_cursor is None
+
+
+def test_page_size_is_clamped():
+    """Page sizes fall back to the default and never exceed the maximum."""
+    assert clamp_page_size(None) > 0
+    assert clamp_page_size(10_000) == MAX_PAGE_SIZE
+    assert clamp_page_size(-5) == 1
+
+
+class FakeResult:
+    def __init__(self, rows):
+        self.rows = rows
+
+    def scalars(self):
+        return self
+
+    def all(self):
+        return self.rows
+
+
+class FakeSession:
+    def __init__(self, rows):
+        self.rows = rows
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    async def execute(self, stmt):
+        return FakeResult(self.rows)
+
+
+def test_listing_returns_summary_items_and_next_cursor(monkeypatch):
+    """The listing endpoint's page holds summary fields only, with a cursor when more rows exist."""
+    start = datetime(2025, 1, 1, tzinfo=timezone.utc)
+    rows = [
+        DBFlowExecution(
+            id=uuid.uuid4(),
+            flow_name="book_flow",
+            status=FlowExecutionStatus.COMPLETED,
+            created_at=start - timedelta(minutes=i),
+            updated_at=start,
+        )
+        for i in range(3)
+    ]
+    monkeypatch.setattr(flow_wrapper, "get_session_maker", lambda: lambda: FakeSession(rows))
+
+    page = asyncio.run(FlowWrapper(enable_caching=False).list_executions(user_id=uuid.uuid4(), limit=2))
+
+    assert [item.id for item in page.items] == [row.id for row in rows[:2]]
+    assert page.next_cursor == encode_cursor(rows[1].created_at, rows[1].id)
+    # The endpoint excludes unset fields, so list items carry no state, error or metrics
+    item = page.model_dump(exclude_unset=True)["items"][0]
+    assert item["updated_at"] == start
+    assert not {"state", "error", "metrics", "completed_steps"} & set(item)
@@ -0,0 +1,74 @@
+"""
+Test Name: test_response_cache
+Description: Unit tests for the content-addressed crew response cache (key derivation, settings, stats)
+
+Environment:
+    - Conda Environment: quiz_master_backend
+    - Working Directory: tests/unit/backend
+    - Required Services: None
+
+Setup:
+    1. No setup required
+
+Execution:
+    pytest tests/unit/backend/test_response_cache.py
+
+Expected Results:
+    All response cache tests pass
+"""
+
+import os
+import sys
+from types import SimpleNamespace
+
+# Add the backend directory to the Python path
+sys.path.append(os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))), "backend"))
+
+from api.crews import response_cache
+from api.crews.response_cache import get_response_cache, response_cache_key, response_cache_stats
+
+PARTS = ("goal", "backstory", "description", "expected output", "gpt-4o")
+
+
+def test_key_is_stable_for_identical_prompts():
+    """The same rendered prompt and model always hash to the same key."""
+    assert response_cache_key(*PARTS) == response_cache_key(*PARTS)
+    assert len(response_cache_key(*PARTS)) == 64
+
+
+def test_key_changes_with_every_part():
+    """Changing any prompt part or the model gives a different key."""
+    base = response_cache_key(*PARTS)
+    for index in range(len(PARTS)):
+        changed = list(PARTS)
+        changed[index] = changed[index] + " changed"
+        assert response_cache_key(*changed) != base
+
+
+def test_key_does_not_confuse_boundaries_between_parts():
+    """Text moved from one part into the next is a different request."""
+    assert response_cache_key("ab", "c", "d", "e", None) != response_cache_key("a", "bc", "d", "e", None)
+
+
+def test_cache_hits_are_counted(monkeypatch):
+    """Lookups through the process-wide cache show up in its stats."""
+    monkeypatch.setattr(response_cache, "_cache", None)
+    cache = get_response_cache()
+    key = response_cache_key(*PARTS)
+    assert cache.get(key) is None
+    cache.set(key, {"title": "Cached blueprint"})
+    assert cache.get(key) == {"title": "Cached blueprint"}
+
+    stats = response_cache_stats()
+    assert stats["enabled"] is True
+    assert stats["hits"] == 1
+    assert stats["misses"] == 1
+    assert stats["entries"] == 1
+
+
+def test_cache_can_be_disabled(monkeypatch):
+    """A zero byte bound turns the cache off."""
+    disabled = SimpleNamespace(crew_response_cache_bytes=0, crew_response_cache_ttl=0)
+    monkeypatch.setattr(response_cache, "get_settings", lambda: disabled)
+    assert get_response_cache() is None
+    assert response_cache_stats() == {"enabled": False}
@@ -0,0 +1,72 @@
+"""
+Test Name: test_result_cache
+Description: Unit tests for the in-memory flow result cache tier (LRU, byte bound, TTL, counters)
+
+Environment:
+    - Conda Environment: quiz_master_backend
+    - Working Directory: tests/unit/backend
+    - Required Services: None
+
+Setup:
+    1. No setup required
+
+Execution:
+    pytest tests/unit/backend/test_result_cache.py
+
+Expected Results:
+    All cache behaviour tests pass
+"""
+
+import os
+import sys
+import time
+
+# Add the backend directory to the Python path
+sys.path.append(os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))), "backend"))
+
+from api.flows.result_cache import ResultMemoryCache
+
+
+def test_hit_and_miss_counters():
+    """Lookups are counted as hits or misses."""
+    cache = ResultMemoryCache(max_bytes=1024)
+    assert cache.get("missing") is None
+    cache.set("key", {"state_dict": {"poem": "hello"}})
+    assert cache.get("key") == {"state_dict": {"poem": "hello"}}
+    assert cache.stats["hits"] == 1
+    assert cache.stats["misses"] == 1
+
+
+def test_evicts_least_recently_used_within_byte_bound():
+    """Entries are evicted oldest-use first once the byte bound is exceeded."""
+    cache = ResultMemoryCache(max_bytes=100)
+    cache.set("a", {"v": 1}, size=40)
+    cache.set("b", {"v": 2}, size=40)
+    cache.get("a")  # "b" is now least recently used
+    cache.set("c", {"v": 3}, size=40)
+
+    assert "a" in cache
+    assert "b" not in cache
+    assert "c" in cache
+    assert cache.stats["bytes"] == 80
+    assert cache.stats["evictions"] == 1
+
+
+def test_oversized_value_is_not_cached():
+    """A single value larger than the bound does not flush the cache."""
+    cache = ResultMemoryCache(max_bytes=100)
+    cache.set("small", {"v": 1}, size=10)
+    cache.set("huge", {"v": 2}, size=1000)
+
+    assert "small" in cache
+    assert "huge" not in cache
+
+
+def test_entries_expire_after_ttl():
+    """Entries older than the TTL are treated as misses."""
+    cache = ResultMemoryCache(max_bytes=1024, ttl=0.05)
+    cache.set("key", {"v": 1})
+    time.sleep(0.1)
+
+    assert cache.get("key") is None
+    assert cache.stats["entries"] == 0